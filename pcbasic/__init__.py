@@ -14,5 +14,5 @@ import os
 __path__ = [os.path.abspath(e) for e in __path__]
 
 from .metadata import VERSION as __version__
-from .basic import Session
+from .basic import Session, SessionPool
 from .main import run, main
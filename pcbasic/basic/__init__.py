@@ -8,5 +8,7 @@ This file is released under the GNU GPL version 3 or later.
 from .api import Session
 from ..metadata import VERSION as __version__
 from .debug import DebugSession
+from .batch import Converter, convert_files
+from .pool import SessionPool
 from .base.error import *
 from .base import signals, scancode, eascii
@@ -80,10 +80,12 @@ class Session(object):
         """Execute a BASIC statement."""
         self.start()
         with self._impl.io_streams.activate():
-            for cmd in command.splitlines():
-                if isinstance(cmd, unicode):
-                    cmd = self._impl.codepage.str_from_unicode(cmd)
-                self._impl.execute(cmd)
+            # program lines are written to the bytecode in bulk
+            with self._impl.program.store_batch():
+                for cmd in command.splitlines():
+                    if isinstance(cmd, unicode):
+                        cmd = self._impl.codepage.str_from_unicode(cmd)
+                    self._impl.execute(cmd)
 
     def evaluate(self, expression):
         """Evaluate a BASIC expression."""
@@ -108,6 +110,11 @@ class Session(object):
             name = name.encode('ascii')
         return self._impl.get_variable(name)
 
+    def set_timer(self, callback, interval):
+        """Call a function every interval seconds while the session runs; None to stop."""
+        self.start()
+        self._impl.queues.set_timer(callback, interval)
+
     def interact(self):
         """Interactive interpreter session."""
         self.start()
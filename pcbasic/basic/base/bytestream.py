@@ -36,3 +36,11 @@ class ByteStream(BytesIO):
         self._pos = newpos
         # this is necessary for python2, where bytes(memoryview) gives a 'string representation'
         return bytes(bytearray(b))
+
+    def write(self, b):
+        """Write to bytestream; fill up the buffer before failing if b does not fit."""
+        room = max(0, len(self._buffer) - self._pos)
+        if len(b) > room:
+            BytesIO.write(self, b[:room])
+            raise ValueError("can't modify size of memoryview")
+        return BytesIO.write(self, b)
@@ -61,12 +61,18 @@ VIDEO_FILL_INTERVAL = 19
 # put rect
 VIDEO_PUT_RECT = 20
 VIDEO_FILL_RECT = 21
+# fill list of scanline intervals
+VIDEO_FILL_SPANS = 22
 # copy page
 VIDEO_COPY_PAGE = 28
 # set caption message
 VIDEO_SET_CAPTION = 29
 # clipboard copy reply
 VIDEO_SET_CLIPBOARD_TEXT = 30
+# list of video signals sent as one
+VIDEO_BATCH = 31
+# put a run of characters in one attribute
+VIDEO_PUT_TEXT = 32
 
 # input queue signals
 # quit interpreter
@@ -0,0 +1,147 @@
+"""
+PC-BASIC - batch.py
+Batch conversion of program files
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import io
+import multiprocessing
+
+from .base import error
+from .base import tokens as tk
+from .base import codestream
+from .devices.devicebase import MAGIC_TO_TYPE
+from .devices.diskfiles import BinaryFile, TextFile, Locks
+from .devices.disk import CodecReader, CodecWriter
+from .codepage import Codepage
+from . import memory
+from . import values
+from . import converter
+from . import program
+
+
+class Converter(object):
+    """Convert program files between ascii, tokenised and protected formats."""
+
+    def __init__(
+            self, syntax=u'advanced', codepage=None, box_protect=True,
+            utf8=False, soft_linefeed=False, hide_listing=None, hide_protected=False,
+            max_memory=65534, reserved_memory=3429, max_reclen=128, max_files=3, double=False
+        ):
+        """Set up the program buffer and converters, without a screen or devices."""
+        # the memory layout determines the line pointers in tokenised programs
+        self._memory = memory.DataSegment(
+            max_memory, reserved_memory, max_reclen, max_files, double
+        )
+        self._values = self._memory.values
+        # number overflows in the program text are reported, as on LOAD
+        self._messages = _MessageLog()
+        self._values.set_handler(values.FloatErrorHandler(self._messages))
+        token_keyword = tk.TokenKeywordDict(syntax)
+        tokeniser = converter.Tokeniser(self._values, token_keyword)
+        lister = converter.Lister(self._values, token_keyword)
+        bytecode = codestream.TokenisedStream(self._memory.code_start)
+        self._program = program.Program(
+            tokeniser, lister, hide_listing, hide_protected,
+            False, self._memory, bytecode, False
+        )
+        self._memory.set_buffers(self._program)
+        self._codepage = Codepage(codepage, box_protect) if utf8 else None
+        self._universal = not soft_linefeed
+        self._locks = Locks()
+
+    def convert(self, in_name, out_name, mode):
+        """Convert a program file to (A)scii, (B)ytecode or (P)rotected mode; return messages."""
+        self._messages.clear()
+        # start from empty code memory, as in a new session
+        self._program.erase()
+        self._program.bytecode.truncate()
+        load_error = None
+        with self._open(in_name, b'I') as infile:
+            try:
+                self._program.load(infile)
+            except error.BASICError as e:
+                # as in a session, the lines loaded so far are kept and get saved
+                load_error = e
+        with self._open(out_name, b'O', mode) as outfile:
+            self._program.save(outfile)
+        if load_error:
+            raise load_error
+        return self._messages.lines
+
+    def _open(self, name, mode, filetype=None):
+        """Open a program file; detect the file type when reading."""
+        fhandle = io.open(name, 'rb' if mode == b'I' else 'wb')
+        try:
+            if mode == b'I':
+                first = fhandle.read(1)
+                fhandle.seek(0)
+                filetype = MAGIC_TO_TYPE.get(first, b'A')
+                if filetype not in b'ABP':
+                    raise error.BASICError(error.BAD_FILE_MODE)
+            if filetype == b'A':
+                if self._codepage and mode == b'I':
+                    fhandle = CodecReader(fhandle, self._codepage, 'utf-8-sig')
+                elif self._codepage:
+                    fhandle = CodecWriter(fhandle, self._codepage, 'utf-8-sig')
+                return TextFile(fhandle, filetype, 0, mode, self._locks, self._universal)
+            return BinaryFile(fhandle, filetype, 0, mode, 0, 0, 0, self._locks)
+        except:
+            fhandle.close()
+            raise
+
+
+class _MessageLog(object):
+    """Collect messages that a session would print on the screen."""
+
+    def __init__(self):
+        """Initialise the log."""
+        self.lines = []
+
+    def clear(self):
+        """Clear the log."""
+        self.lines = []
+
+    def write_line(self, s=b''):
+        """Record a message."""
+        self.lines.append(s)
+
+
+###############################################################################
+# process pool
+
+# converter for the current worker process
+_converter = None
+
+def _init_worker(converter_params):
+    """Set up the converter in a worker process."""
+    global _converter
+    _converter = Converter(**converter_params)
+
+def _convert_one(job):
+    """Convert a single file in a worker process; return file names and status."""
+    in_name, out_name, mode = job
+    try:
+        messages = _converter.convert(in_name, out_name, mode)
+    except error.BASICError as e:
+        return in_name, out_name, False, [e.message]
+    except EnvironmentError as e:
+        return in_name, out_name, False, [bytes(e.strerror or e)]
+    return in_name, out_name, True, messages
+
+def convert_files(jobs, processes=None, **converter_params):
+    """\
+        Convert program files through a process pool.
+        jobs: iterable of (input name, output name, mode) tuples
+        Yields (input name, output name, success, messages) as files complete.
+    """
+    pool = multiprocessing.Pool(processes, _init_worker, (converter_params,))
+    try:
+        for result in pool.imap_unordered(_convert_one, jobs):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
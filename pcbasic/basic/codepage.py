@@ -183,6 +183,9 @@ box_right_unicode = [u'\u2500', u'\u2550']
 class Converter(object):
     """Buffered converter to Unicode - supports DBCS and box-drawing protection."""
 
+    # state at the start of a string: empty buffer, no box drawing
+    CLEAN_STATE = (b'', -1, b'')
+
     def __init__(self, codepage, preserve=b'', box_protect=None):
         """Initialise with empty buffer."""
         self._cp = codepage
@@ -207,6 +210,14 @@ class Converter(object):
                 unistr += self._flush()
             return unistr
 
+    def get_state(self):
+        """Get the buffer and box-drawing state, to resume from later."""
+        return self._buf, self._bset, self._last
+
+    def set_state(self, state):
+        """Resume from a state obtained with get_state."""
+        self._buf, self._bset, self._last = state
+
     def to_unicode(self, s, flush=False):
         """Process codepage string, returning unicode string when ready."""
         return u''.join(
@@ -8,8 +8,10 @@ This file is released under the GNU GPL version 3 or later.
 
 import string
 import struct
+import re
 import io
 
+from ..base import error
 from ..base import tokens as tk
 from ..base import codestream
 from .. import values
@@ -18,6 +20,25 @@ from .. import values
 # bytes constants
 DIGITS = string.digits
 LETTERS = string.ascii_letters
+BLANKS = codestream.CodeStream.blanks
+# set for quick lookup
+NAME_CHARS = frozenset(tk.NAME_CHARS)
+# first characters of decimal numbers and jump numbers
+NUMBER_START = DIGITS + b'.'
+
+# runs of characters that the tokeniser passes or skips as a whole
+_BLANK_RUN = re.compile(b'[ \t\n]*')
+_NAME_RUN = re.compile(b'[A-Za-z0-9.]*')
+# rest of the line after REM
+_REM_RUN = re.compile(b'[^\r\0]*')
+# DATA up to the end of the statement or a string literal
+_DATA_RUN = re.compile(b'[^\r\0:"]*')
+# string literal; the closing quote is optional
+_STRING = re.compile(b'"[^"\r\0]*"?')
+# line number of up to four digits, not followed by more digits or blanks
+_LINE_NUMBER = re.compile(b'[0-9]{1,4}(?![0-9 \t\n])')
+# decimal integer that is not followed by anything that would extend the number
+_INTEGER = re.compile(b'[0-9]+(?![0-9 \t\n.EeDd!#%\x1c\x1d\x1f])')
 
 
 class PlainTextStream(codestream.CodeStream):
@@ -25,35 +46,6 @@ class PlainTextStream(codestream.CodeStream):
 
     end_line = (b'\0', b'\r')
 
-    def read_line_number(self):
-        """Read a line or jump number, return as int."""
-        word = bytearray()
-        ndigits, nblanks = 0, 0
-        # don't read more than 5 digits
-        while (ndigits < 5):
-            c = self.peek()
-            if not c:
-                break
-            elif c in DIGITS:
-                word += self.read(1)
-                nblanks = 0
-                ndigits += 1
-                if int(word) > 6552:
-                    # note: anything >= 65530 is illegal in GW-BASIC
-                    # in loading an ASCII file, GWBASIC would interpret these as
-                    # '6553 1' etcetera, generating a syntax error on load.
-                    break
-            elif c in self.blanks:
-                self.read(1)
-                nblanks += 1
-            else:
-                break
-        # don't claim trailing w/s
-        self.seek(-nblanks, 1)
-        if word:
-            return int(word)
-        return None
-
 
 class Tokeniser(object):
     """BASIC tokeniser."""
@@ -72,18 +64,48 @@ class Tokeniser(object):
         """Initialise tokeniser."""
         self._values = values
         self._keyword_to_token = keyword_dict.to_token
+        # all beginnings of keywords, to tell names from keywords without reading them twice
+        self._keyword_prefixes = set(
+            _kw[:_i] for _kw in self._keyword_to_token for _i in range(1, len(_kw)+1)
+        )
+        # tokens for integer literals already seen
+        self._integer_tokens = {}
+
+    def tokenise_file(self, ins):
+        """\
+            Convert all lines of a plain-text program file to tokenised form.
+            ins: text file object with a read_line method
+            Yields the tokenised lines.
+        """
+        while True:
+            line, cr = ins.read_line()
+            if not line and not cr:
+                # end of file
+                break
+            elif cr is None:
+                # line > 255 chars
+                raise error.BASICError(error.LINE_BUFFER_OVERFLOW)
+            yield self.tokenise_line(line)
 
     def tokenise_line(self, line):
         """Convert an ascii program line to tokenised form."""
-        ins = PlainTextStream(line)
         outs = codestream.TokenisedStream()
+        outs.write(self._tokenise(bytes(line)))
+        outs.seek(0)
+        return outs
+
+    def _tokenise(self, line):
+        """Convert an ascii program line to a tokenised string."""
         # skip whitespace at start of line
-        d = ins.skip_blank()
-        if d == b'':
+        pos = _BLANK_RUN.match(line).end()
+        if pos == len(line):
             # empty line at EOF
-            return outs
+            return b''
+        out = []
+        # keywords are matched case-insensitively
+        upper = line.upper()
         # read the line number
-        self._tokenise_line_number(ins, outs)
+        pos = self._tokenise_line_number(line, pos, out)
         # expect line number
         allow_jumpnum = False
         # expect number (6553 6 -> the 6 is encoded as \x17)
@@ -91,62 +113,59 @@ class Tokeniser(object):
         # flag for SPC( or TAB( as numbers can follow the closing bracket
         spc_or_tab = False
         # parse through elements of line
-        while True:
-            # peek next character
-            c = ins.peek()
-            # anything after NUL is ignored till EOL
-            if c == b'\0':
-                ins.read(1)
-                ins.read_to((b'', b'\r'))
-                break
-            # end of line
-            elif c in (b'', b'\r'):
+        length = len(line)
+        while pos < length:
+            c = line[pos]
+            # end of line; anything after NUL is ignored till EOL
+            if c in b'\0\r':
                 break
             # handle whitespace
-            elif c in ins.blanks:
-                ins.read(1)
-                outs.write(c)
+            elif c in BLANKS:
+                end = _BLANK_RUN.match(line, pos).end()
+                out.append(line[pos:end])
+                pos = end
             # handle string literals
-            elif ins.peek() == b'"':
-                outs.write(ins.read_string())
+            elif c == b'"':
+                end = _STRING.match(line, pos).end()
+                out.append(line[pos:end])
+                pos = end
             # handle jump numbers
-            elif allow_number and allow_jumpnum and c in DIGITS + b'.':
-                self._tokenise_jump_number(ins, outs)
+            elif allow_number and allow_jumpnum and c in NUMBER_START:
+                pos = self._tokenise_jump_number(line, pos, out)
             # handle numbers
             # numbers following var names with no operator or token in between
             # should not be parsed, eg OPTION BASE 1
             # note we don't include leading signs, encoded as unary operators
             # number starting with & are always parsed
-            elif c in (b'&', ) or (
-                    allow_number and not allow_jumpnum and c in DIGITS + b'.'
+            elif c == b'&' or (
+                    allow_number and not allow_jumpnum and c in NUMBER_START
                 ):
-                outs.write(self.tokenise_number(ins))
+                pos = self._tokenise_number(line, pos, out)
             # operator keywords ('+', '-', '=', '/', '\\', '^', '*', '<', '>'):
             elif c in self._ascii_operators:
-                ins.read(1)
+                pos += 1
                 # operators don't affect line number mode - can do line number
                 # arithmetic and RENUM will do the strangest things
                 # this allows for 'LIST 100-200' etc.
-                outs.write(self._keyword_to_token[c])
+                out.append(self._keyword_to_token[c])
                 allow_number = True
             # special case ' -> :REM'
             elif c == b"'":
-                ins.read(1)
-                outs.write(b':' + tk.REM + tk.O_REM)
-                self._tokenise_rem(ins, outs)
+                out.append(b':' + tk.REM + tk.O_REM)
+                pos = self._tokenise_rem(line, pos+1, out)
             # special case ? -> PRINT
             elif c == b'?':
-                ins.read(1)
-                outs.write(tk.PRINT)
+                pos += 1
+                out.append(tk.PRINT)
                 allow_number = True
             # keywords & variable names
             elif c in LETTERS:
-                word = self._tokenise_word(ins, outs)
+                word, pos = self._tokenise_word(line, upper, pos, out)
                 # handle non-parsing modes
                 if word in (tk.KW_REM, b"'"):
-                    self._tokenise_rem(ins, outs)
+                    pos = self._tokenise_rem(line, pos, out)
                 elif word == tk.KW_DATA:
-                    self._tokenise_data(ins, outs)
+                    pos = self._tokenise_data(line, pos, out)
                 else:
                     allow_jumpnum = (word in self._linenum_words)
                     # numbers can follow tokenised keywords
@@ -155,7 +174,7 @@ class Tokeniser(object):
                     if word in (tk.KW_SPC, tk.KW_TAB):
                         spc_or_tab = True
             else:
-                ins.read(1)
+                pos += 1
                 if c in (b',', b'#', b';'):
                     # can separate numbers as well as jumpnums
                     allow_number = True
@@ -168,27 +187,31 @@ class Tokeniser(object):
                     allow_jumpnum, allow_number = False, False
                 # replace all other nonprinting chars by spaces;
                 # HOUSE 0x7f is allowed.
-                outs.write(c if ord(c) >= 32 and ord(c) <= 127 else b' ')
-        outs.seek(0)
-        return outs
+                out.append(c if ord(c) >= 32 and ord(c) <= 127 else b' ')
+        return b''.join(out)
 
-    def _tokenise_rem(self, ins, outs):
+    def _tokenise_rem(self, line, pos, out):
         """Pass anything after REM as is till EOL."""
-        outs.write(ins.read_to((b'', b'\r', b'\0')))
+        end = _REM_RUN.match(line, pos).end()
+        out.append(line[pos:end])
+        return end
 
-    def _tokenise_data(self, ins, outs):
+    def _tokenise_data(self, line, pos, out):
         """Pass DATA as is, till end of statement, except for literals."""
         while True:
-            outs.write(ins.read_to((b'', b'\r', b'\0', b':', b'"')))
-            if ins.peek() == b'"':
-                # string literal in DATA
-                outs.write(ins.read_string())
-            else:
-                break
+            end = _DATA_RUN.match(line, pos).end()
+            out.append(line[pos:end])
+            pos = end
+            if line[pos:pos+1] != b'"':
+                return pos
+            # string literal in DATA
+            end = _STRING.match(line, pos).end()
+            out.append(line[pos:end])
+            pos = end
 
-    def _tokenise_line_number(self, ins, outs):
+    def _tokenise_line_number(self, line, pos, out):
         """Convert an ascii line number to tokenised start-of-line."""
-        linenum = ins.read_line_number()
+        linenum, pos = _read_line_number(line, pos)
         if linenum is not None:
             # NUL terminates last line and fills up the first char in the buffer
             # (that would be the magic number when written to file)
@@ -196,76 +219,100 @@ class Tokeniser(object):
             # starts with a NUL
             # next two bytes are for internal use and at this point
             # can be anything nonzero; we use this.
-            outs.write(b'\x00\xC0\xDE' + struct.pack('<H', linenum))
+            out.append(b'\x00\xC0\xDE' + struct.pack('<H', linenum))
             # ignore single whitespace after line number, if any,
             # unless line number is zero (as does GW)
-            if ins.peek() == b' ' and linenum != 0:
-                ins.read(1)
+            if line[pos:pos+1] == b' ' and linenum != 0:
+                pos += 1
         else:
             # direct line; internally, we need an anchor for the program pointer,
             # so we encode a ':'
-            outs.write(b':')
+            out.append(b':')
+        return pos
 
-    def _tokenise_jump_number(self, ins, outs):
+    def _tokenise_jump_number(self, line, pos, out):
         """Convert an ascii line number pointer to tokenised form."""
-        linum = ins.read_line_number()
+        linum, end = _read_line_number(line, pos)
         if linum is not None:
-            outs.write(tk.T_UINT + struct.pack('<H', linum))
-        elif ins.peek() == b'.':
-            ins.read(1)
-            outs.write(b'.')
+            out.append(tk.T_UINT + struct.pack('<H', linum))
+            return end
+        elif line[pos:pos+1] == b'.':
+            out.append(b'.')
+            return pos + 1
+        return pos
+
+    def _tokenise_number(self, line, pos, out):
+        """Convert a numeric literal to tokenised form."""
+        match = _INTEGER.match(line, pos)
+        if match:
+            # plain integers are by far the most common; short ones can't overflow
+            word = match.group()
+            try:
+                out.append(self._integer_tokens[word])
+            except KeyError:
+                token = self._values.from_repr(word, allow_nonnum=False).to_token()
+                if len(word) <= 5:
+                    self._integer_tokens[word] = token
+                out.append(token)
+            return match.end()
+        ins = PlainTextStream(line)
+        ins.seek(pos)
+        out.append(self.tokenise_number(ins))
+        return ins.tell()
 
-    def _tokenise_word(self, ins, outs):
+    def _tokenise_word(self, line, upper, pos, out):
         """Convert a keyword to tokenised form."""
-        word = b''
+        start = pos
         while True:
-            c = ins.read(1)
-            word += c.upper()
+            c = line[pos:pos+1]
+            pos += len(c)
+            word = upper[start:pos]
+            if c in NAME_CHARS and word not in self._keyword_prefixes:
+                # no keyword starts like this; the name runs to the first non-name character
+                end = _NAME_RUN.match(line, pos).end()
+                word = upper[start:end]
+                out.append(word)
+                return word, end
             # special cases 'GO     TO' -> 'GOTO', 'GO SUB' -> 'GOSUB'
             if word == b'GO':
-                pos = ins.tell()
+                go_end = pos
                 # GO SUB allows 1 space
-                if ins.peek(4).upper() == b' SUB':
+                if upper[pos:pos+4] == b' SUB':
                     word = tk.KW_GOSUB
-                    ins.read(4)
+                    pos += 4
                 else:
                     # GOTO allows any number of spaces
-                    nxt = ins.skip_blank()
-                    if ins.read(2).upper() == b'TO':
+                    to_start = _BLANK_RUN.match(line, pos).end()
+                    if upper[to_start:to_start+2] == b'TO':
                         word = tk.KW_GOTO
-                    else:
-                        ins.seek(pos)
+                        pos = to_start + 2
                 if word in (tk.KW_GOTO, tk.KW_GOSUB):
-                    nxt = ins.peek()
-                    if nxt in tk.NAME_CHARS:
-                        ins.seek(pos)
+                    if line[pos:pos+1] in NAME_CHARS:
+                        pos = go_end
                         word = b'GO'
             if word in self._keyword_to_token:
                 # ignore if part of a longer name, except FN, SPC(, TAB(, USR
                 if word not in (tk.KW_FN, tk.KW_SPC, tk.KW_TAB, tk.KW_USR):
-                    nxt = ins.peek()
-                    if nxt in tk.NAME_CHARS:
+                    if line[pos:pos+1] in NAME_CHARS:
                         continue
                 token = self._keyword_to_token[word]
                 # handle special case ELSE -> :ELSE
                 if word == tk.KW_ELSE:
-                    outs.write(b':' + token)
+                    out.append(b':' + token)
                 # handle special case WHILE -> WHILE+
                 elif word == tk.KW_WHILE:
-                    outs.write(token + tk.O_PLUS)
+                    out.append(token + tk.O_PLUS)
                 else:
-                    outs.write(token)
-                break
+                    out.append(token)
+                return word, pos
             # allowed names: letter + (letters, numbers, .)
             elif not c:
-                outs.write(word)
-                break
-            elif c not in tk.NAME_CHARS:
+                out.append(word)
+                return word, pos
+            elif c not in NAME_CHARS:
                 word = word[:-1]
-                ins.seek(-1, 1)
-                outs.write(word)
-                break
-        return word
+                out.append(word)
+                return word, pos - 1
 
     def tokenise_number(self, ins):
         """Convert Python-string number representation to number token."""
@@ -284,3 +331,34 @@ class Tokeniser(object):
             # note GW passes signs separately as a token
             # and only stores positive numbers in the program
             return self._values.from_repr(word, allow_nonnum=False).to_token()
+
+
+def _read_line_number(line, pos):
+    """Read a line or jump number from a string; return as int (or None) and new position."""
+    match = _LINE_NUMBER.match(line, pos)
+    if match:
+        return int(match.group()), match.end()
+    word = b''
+    # position after the last digit; don't claim trailing w/s
+    end = pos
+    ndigits = 0
+    # don't read more than 5 digits
+    while ndigits < 5 and pos < len(line):
+        c = line[pos]
+        if c in DIGITS:
+            word += c
+            pos += 1
+            end = pos
+            ndigits += 1
+            if int(word) > 6552:
+                # note: anything >= 65530 is illegal in GW-BASIC
+                # in loading an ASCII file, GWBASIC would interpret these as
+                # '6553 1' etcetera, generating a syntax error on load.
+                break
+        elif c in BLANKS:
+            pos += 1
+        else:
+            break
+    if word:
+        return int(word), end
+    return None, end
@@ -217,6 +217,14 @@ class RawFile(object):
 # TAB x09 is not whitespace for input#. NUL \x00 and LF \x0a are.
 INPUT_WHITESPACE = b' \0\n'
 
+# nonprinting characters including tabs are not counted for WIDTH
+NONPRINTING = bytes(bytearray(range(32)))
+
+
+def printable_length(s):
+    """Number of characters in s that advance the column."""
+    return len(s.translate(None, NONPRINTING))
+
 
 class DeviceSettings(object):
     """Device-level width and column settings."""
@@ -239,6 +247,9 @@ class TextFileBase(RawFile):
 
     # for INPUT# - numbers read from file can be separated by spaces too
     soft_sep = b' '
+    # minimum number of bytes to read ahead from the underlying stream
+    # streams that block or can change under us are read no further than requested
+    read_chunk = 1
 
     def __init__(self, fhandle, filetype, mode):
         """Setup the basic properties of the file."""
@@ -246,19 +257,28 @@ class TextFileBase(RawFile):
         # width=255 means line wrap
         self.width = 255
         self.col = 1
-        # allow first char to be specified (e.g. already read)
-        self._readahead = []
+        # readahead buffer and position of the next unread byte in it
+        self._buffer, self._bufpos = b'', 0
         self._current, self._previous = b'', b''
 
     # readable files
 
-    def peek(self, num):
-        """Return next num characters to be read; never returns more, fewer only at EOF."""
-        to_read = num - len(self._readahead)
+    def _fill(self, num):
+        """Make sure num bytes are buffered, unless at end of file."""
+        to_read = num - (len(self._buffer) - self._bufpos)
         if to_read > 0:
             with safe_io():
-                self._readahead.extend(list(self._fhandle.read(to_read)))
-        return b''.join(self._readahead[:num])
+                chunk = self._fhandle.read(max(to_read, self.read_chunk))
+            self._buffer, self._bufpos = self._buffer[self._bufpos:] + chunk, 0
+
+    def _buffered(self):
+        """Number of bytes read ahead from the stream but not yet consumed."""
+        return len(self._buffer) - self._bufpos
+
+    def peek(self, num):
+        """Return next num characters to be read; never returns more, fewer only at EOF."""
+        self._fill(num)
+        return self._buffer[self._bufpos:self._bufpos+num]
 
     def read(self, num):
         """Read num characters."""
@@ -268,7 +288,7 @@ class TextFileBase(RawFile):
         if b'\x1A' in output:
             output = output[:output.index(b'\x1A')]
         # drop read chars from buffer
-        self._readahead = self._readahead[len(output):]
+        self._bufpos += len(output)
         if len(output) <= 1:
             self._previous = self._current
         else:
@@ -308,33 +328,27 @@ class TextFileBase(RawFile):
         """Write the string s to the file, taking care of width settings."""
         assert isinstance(s, bytes)
         # only break lines at the start of a new string. width 255 means unlimited width
-        s_width = 0
-        newline = False
         # find width of first line in s
-        for c in s:
-            if c in (b'\r', b'\n'):
-                newline = True
-                break
-            if c >= b' ':
-                # nonprinting characters including tabs are not counted for WIDTH
-                s_width += 1
+        first_line = s
+        for sep in (b'\r', b'\n'):
+            end = first_line.find(sep)
+            if end >= 0:
+                first_line = first_line[:end]
+        newline = len(first_line) < len(s)
+        s_width = printable_length(first_line)
         if (can_break and self.width != 255 and self.col != 1 and
                 self.col-1 + s_width > self.width and not newline):
             self.write_line()
             self.col = 1
-        for c in s:
-            # don't replace CR or LF with CRLF when writing to files
-            if c == b'\r':
-                self._fhandle.write(c)
-                self.col = 1
-            else:
-                self._fhandle.write(c)
-                # nonprinting characters including tabs are not counted for WIDTH
-                if c >= b' ':
-                    self.col += 1
-                    # col-1 is a byte that wraps
-                    if self.col == 257:
-                        self.col = 1
+        # don't replace CR or LF with CRLF when writing to files
+        self._fhandle.write(s)
+        # CR returns to the first column
+        last_cr = s.rfind(b'\r')
+        if last_cr >= 0:
+            self.col = 1
+            s = s[last_cr+1:]
+        # col-1 is a byte that wraps
+        self.col = (self.col - 1 + printable_length(s)) % 256 + 1
 
     def write_line(self, s=''):
         """Write string and follow with device-standard line break."""
@@ -527,6 +541,7 @@ class KYBDFile(TextFileBase, RealTimeInputMixin):
         TextFileBase.__init__(self, nullstream(), filetype=b'D', mode=b'I')
         # buffer for the separator character that broke the last INPUT# field
         # to be attached to the next
+        self._readahead = []
         self._keyboard = keyboard
         # screen needed for width settings on KYBD: master file
         self._display = display
@@ -15,10 +15,12 @@ import io
 import sys
 import errno
 import string
+import time
 import random
 import ntpath
 import logging
 import codecs
+from collections import OrderedDict
 
 from ..base import error
 from ..codepage import CONTROL
@@ -97,6 +99,13 @@ ALLOWABLE_CHARS = set(string.ascii_letters + string.digits + b" !#$%&'()-@^_`{}~
 # posix access modes for BASIC modes INPUT, OUTPUT, RANDOM, APPEND
 ACCESS_MODES = {b'I': 'rb', b'O': 'wb', b'R': 'r+b', b'A': 'ab'}
 
+# don't trust a directory index built within this many seconds of the directory's last change
+# as further changes may not show in its modification time
+INDEX_SETTLE_TIME = 2.
+# maximum number of directory indexes and wildcard masks kept in the caches
+INDEX_CACHE_SIZE = 64
+MASK_CACHE_SIZE = 64
+
 
 ##############################################################################
 # exception handling
@@ -181,11 +190,34 @@ def dos_to_native_name(native_path, dosname, isdir):
     if istype(native_path, uni_name, isdir):
         return uni_name
     # otherwise try in lexicographic order
+    for f in _get_dos_name_index(native_path).get(dosname, ()):
+        if istype(native_path, f, isdir):
+            return f
+    return None
+
+# cache of DOS name indexes by native directory path: (modification time, index)
+# least recently used directories are dropped first
+_dos_name_indexes = OrderedDict()
+
+def _get_dos_name_index(native_path):
+    """Map normalised DOS names to native names in a directory, in lexicographic order."""
+    try:
+        mtime = os.stat(native_path).st_mtime
+    except EnvironmentError:
+        # report no match if the directory can't be read
+        return {}
+    try:
+        index_mtime, index = _dos_name_indexes.pop(native_path)
+        if index_mtime == mtime:
+            _dos_name_indexes[native_path] = index_mtime, index
+            return index
+    except KeyError:
+        pass
     try:
         all_names = os.listdir(native_path)
     except EnvironmentError:
-        # report no match if listdir fails
-        return None
+        return {}
+    index = {}
     for f in sorted(all_names):
         # we won't match non-ascii anyway
         try:
@@ -194,25 +226,37 @@ def dos_to_native_name(native_path, dosname, isdir):
             continue
         # don't match long names or non-legal dos names
         if dos_is_legal_name(ascii_name):
-            try_name = dos_normalise_name(ascii_name)
-            if try_name == dosname and istype(native_path, f, isdir):
-                return f
-    return None
+            index.setdefault(dos_normalise_name(ascii_name), []).append(f)
+    if time.time() - mtime > INDEX_SETTLE_TIME:
+        if len(_dos_name_indexes) >= INDEX_CACHE_SIZE:
+            _dos_name_indexes.popitem(last=False)
+        _dos_name_indexes[native_path] = mtime, index
+    return index
+
+# compiled regular expressions for DOS wildcard masks, least recently used dropped first
+_mask_regexps = OrderedDict()
 
 def dos_name_matches(name, mask):
     """Whether native name element matches DOS wildcard mask."""
-    # convert wildcard mask to regexp
-    regexp = b'\\A'
-    for c in mask.upper():
-        if c == b'?':
-            regexp += b'.'
-        elif c == b'*':
-            # we won't need to match newlines, so dot is fine
-            regexp += b'.*'
-        else:
-            regexp += re.escape(c)
-    regexp += b'\\Z'
-    cregexp = re.compile(regexp)
+    mask = mask.upper()
+    try:
+        cregexp = _mask_regexps.pop(mask)
+    except KeyError:
+        # convert wildcard mask to regexp
+        regexp = b'\\A'
+        for c in mask:
+            if c == b'?':
+                regexp += b'.'
+            elif c == b'*':
+                # we won't need to match newlines, so dot is fine
+                regexp += b'.*'
+            else:
+                regexp += re.escape(c)
+        regexp += b'\\Z'
+        cregexp = re.compile(regexp)
+        if len(_mask_regexps) >= MASK_CACHE_SIZE:
+            _mask_regexps.popitem(last=False)
+    _mask_regexps[mask] = cregexp
     return cregexp.match(name.upper()) is not None
 
 
@@ -224,7 +268,7 @@ class DiskDevice(object):
 
     allowed_modes = b'IOR'
 
-    def __init__(self, letter, path, dos_cwd, codepage, utf8, universal):
+    def __init__(self, letter, path, dos_cwd, codepage, utf8, universal, native_locks=False):
         """Initialise a disk device."""
         # DOS drive letter
         self.letter = letter
@@ -245,7 +289,7 @@ class DiskDevice(object):
                     dos_cwd, letter
                 )
         # locks are drive-specific
-        self._locks = Locks()
+        self._locks = Locks(native_locks)
         # text file settings
         self._utf8 = utf8
         self._universal = universal
@@ -358,6 +402,9 @@ class DiskDevice(object):
                 except IOError:
                     pass
                 f.close()
+            if mode == b'R' and self._locks.native:
+                # other processes must see records as soon as they are unlocked
+                return io.open(native_name, ACCESS_MODES[mode], buffering=0)
             return io.open(native_name, ACCESS_MODES[mode])
         except EnvironmentError as e:
             handle_oserror(e)
@@ -500,8 +547,9 @@ class DiskDevice(object):
     def _get_dirs_files(self, native_path):
         """Get native filenames for native path."""
         all_names = safe(os.listdir, native_path)
-        dirs = [n for n in all_names if os.path.isdir(os.path.join(native_path, n))]
-        fils = [n for n in all_names if not os.path.isdir(os.path.join(native_path, n))]
+        dirs, fils = [], []
+        for n in all_names:
+            (dirs if os.path.isdir(os.path.join(native_path, n)) else fils).append(n)
         return dirs, fils
 
     def listdir(self, pathmask):
@@ -778,10 +826,10 @@ class NameWrapper(object):
 class InternalDiskDevice(DiskDevice):
     """Internal disk device for special operations."""
 
-    def __init__(self, letter, path, cwd, codepage, utf8, universal):
+    def __init__(self, letter, path, cwd, codepage, utf8, universal, native_locks=False):
         """Initialise internal disk."""
         self._bound_files = {}
-        DiskDevice.__init__(self, letter, path, cwd, codepage, utf8, universal)
+        DiskDevice.__init__(self, letter, path, cwd, codepage, utf8, universal, native_locks)
 
     def bind(self, file_name_or_object, name=None):
         """Bind a native file name or object to an internal name."""
@@ -9,8 +9,16 @@ This file is released under the GNU GPL version 3 or later.
 import struct
 import string
 import ntpath
+import errno
+import logging
 from contextlib import contextmanager
 
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows
+    fcntl = None
+
 from ..base.bytestream import ByteStream
 from ..base import error
 from .devicebase import RawFile, TextFileBase, InputMixin, safe_io, TYPE_TO_MAGIC
@@ -68,6 +76,9 @@ class BinaryFile(RawFile):
 class TextFile(TextFileBase, InputMixin):
     """Text file on disk device."""
 
+    # read ahead in blocks rather than byte by byte
+    read_chunk = 4096
+
     def __init__(self, fhandle, filetype, number, mode, locks, universal):
         """Initialise text file object."""
         TextFileBase.__init__(self, fhandle, filetype, mode)
@@ -109,16 +120,37 @@ class TextFile(TextFileBase, InputMixin):
             c = b'\r'
         return c
 
+    def _plain_run(self, num):
+        """Count bytes other than CR, LF and EOF at the read position, up to num."""
+        self._fill(min(num, self.read_chunk))
+        stop = self._bufpos + min(num, self._buffered())
+        for sep in (b'\r', b'\n', b'\x1a'):
+            found = self._buffer.find(sep, self._bufpos, stop)
+            if found >= 0:
+                stop = found
+        return stop - self._bufpos
+
     def read_line(self):
         """Read line from text file, break on CR or CRLF (not LF, unless universal newlines)."""
         s = []
+        length = 0
         while True:
+            # take runs of ordinary characters in one go; line breaks and EOF one by one
+            run = self._plain_run(255 - length)
+            if run:
+                s.append(self.read(run))
+                length += run
+                if length == 255:
+                    c = b'\r' if self.peek(1) == b'\r' else None
+                    break
+                continue
             c = self.read_one()
             if not c or (c == b'\r' and self._previous != b'\n'):
                 # break on CR, CRLF but allow LF, LFCR to pass
                 break
             s.append(c)
-            if len(s) == 255:
+            length += 1
+            if length == 255:
                 c = b'\r' if self.peek(1) == b'\r' else None
                 break
         return b''.join(s), c
@@ -136,7 +168,7 @@ class TextFile(TextFileBase, InputMixin):
         """Get file pointer (LOC)."""
         with safe_io():
             if self.mode == b'I':
-                tell = self._fhandle.tell() - len(self._readahead)
+                tell = self._fhandle.tell() - self._buffered()
                 return max(1, (127+tell) // 128)
             return self._fhandle.tell() // 128
 
@@ -163,6 +195,9 @@ class TextFile(TextFileBase, InputMixin):
 class FieldFile(TextFile):
     """Text file on FIELD."""
 
+    # the FIELD buffer can change under us, don't read ahead
+    read_chunk = 1
+
     def __init__(self, field, reclen):
         """Initialise text file object."""
         # don't let the field file use device locks
@@ -179,7 +214,7 @@ class FieldFile(TextFile):
 
     def __getstate__(self):
         """Pickle."""
-        pickledict = self.__dict__
+        pickledict = self.__dict__.copy()
         pickledict['_pos'] = self._fhandle.tell()
         # can't pickle memoryview objects
         del pickledict['_fhandle']
@@ -190,7 +225,7 @@ class FieldFile(TextFile):
         pos = pickledict.pop('_pos')
         self. __dict__ = pickledict
         self._fhandle = ByteStream(self._field.view_buffer())
-        self.fhandle.seek(pos)
+        self._fhandle.seek(pos)
 
     def _switch_mode(self, new_mode):
         """Switch to input or output mode and fix readahaed buffer."""
@@ -198,15 +233,15 @@ class FieldFile(TextFile):
             self._fhandle.flush()
             self.mode = b'I'
         elif new_mode == b'O' and self.mode == b'I':
-            self._fhandle.seek(-len(self._readahead), 1)
-            self._readahead = []
+            self._fhandle.seek(-self._buffered(), 1)
+            self._buffer, self._bufpos = b'', 0
             self._previous, self._current = b'', b''
             self.mode = b'O'
 
     def _check_overflow(self):
         """Check for FIELD OVERFLOW."""
         # FIELD overflow happens if last byte in record has been read or written
-        if self._fhandle.tell() - len(self._readahead) >= self._reclen:
+        if self._fhandle.tell() - self._buffered() >= self._reclen:
             raise error.BASICError(error.FIELD_OVERFLOW)
 
     def set_buffer(self, contents):
@@ -247,6 +282,8 @@ class RandomFile(RawFile):
         # actually work on the FIELD buffer; the file stream itself is not
         # touched until PUT or GET.
         self._field_file = FieldFile(field, reclen)
+        # record locks may be applied to the native file
+        self._locks.set_record_stream(number, fhandle, reclen)
         # position at start of file
         self._recpos = 0
         self._fhandle.seek(0)
@@ -381,15 +418,23 @@ class LockingParameters(object):
         self.lock_type = lock_type
         self.access = access
         self.mode = mode
+        # native stream and record length, for native record locks
+        self.stream = None
+        self.reclen = None
 
 
 class Locks(object):
     """Lock management."""
 
-    def __init__(self):
+    def __init__(self, native=False):
         """Initialise locks."""
         # dict of LockingParameters objects, one for each open disk file, by file number
         self._locking_parameters = {}
+        # also hold record locks as byte-range locks on the native file,
+        # so that they apply between processes
+        if native and not fcntl:
+            logging.warning('Native file locks are not available on this platform.')
+        self.native = native and fcntl is not None
 
     def list_open(self, name, exclude_number=None):
         """Retrieve a list of files open on the same disk device."""
@@ -436,12 +481,28 @@ class Locks(object):
             access = b'RW'
         self._locking_parameters[number] = LockingParameters(name, mode, lock_type, access)
 
+    def set_record_stream(self, number, stream, reclen):
+        """Register the native stream of a random-access file for record locks."""
+        if self.native and number in self._locking_parameters:
+            this_file = self._locking_parameters[number]
+            this_file.stream, this_file.reclen = stream, reclen
+
     def close_file(self, number):
         """Deregister disk file."""
         try:
-            del self._locking_parameters[number]
+            closed_file = self._locking_parameters.pop(number)
         except KeyError:
-            pass
+            return
+        if self.native:
+            # closing any stream on a file drops all native locks this process holds on it
+            # so we need to restore those of the files that remain open
+            for f in self.list_open(closed_file.name):
+                # locks on text files are not applied natively
+                if not f.stream:
+                    continue
+                for start, stop in f.lock_set:
+                    if not self._native_lock(f, start, stop, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                        logging.warning('Record lock on %s taken by another process.', f.name)
 
     def try_access(self, number, access):
         """Attempt to access a file."""
@@ -461,6 +522,13 @@ class Locks(object):
         """Attempt to access a record."""
         self.try_access(number, access)
         self._try_record_lock(number, start, stop, allow_self=True, read_only=(access == b'R'))
+        this_file = self._locking_parameters[number]
+        # check for locks held by other processes, unless we hold the lock ourselves
+        if this_file.stream and not self._holds_record_lock(this_file.name, start, stop):
+            # a shared lock does not clash with other processes accessing the record
+            if not self._native_lock(this_file, start, stop, fcntl.LOCK_SH | fcntl.LOCK_NB):
+                raise error.BASICError(error.PERMISSION_DENIED)
+            self._native_lock(this_file, start, stop, fcntl.LOCK_UN)
 
     def _try_record_lock(self, number, start, stop, allow_self=True, read_only=False):
         """Attempt to access a record."""
@@ -488,6 +556,10 @@ class Locks(object):
         """Acquire a lock on a range of records."""
         self._try_record_lock(number, start, stop, allow_self=False)
         this_file = self._locking_parameters[number]
+        if this_file.stream:
+            if not self._native_lock(this_file, start, stop, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                # locked by another process
+                raise error.BASICError(error.PERMISSION_DENIED)
         this_file.lock_set.add((start, stop))
 
     def release_record_lock(self, number, start, stop):
@@ -498,3 +570,32 @@ class Locks(object):
             this_file.lock_set.remove((start, stop))
         except KeyError:
             raise error.BASICError(error.PERMISSION_DENIED)
+        if this_file.stream:
+            self._native_lock(this_file, start, stop, fcntl.LOCK_UN)
+
+    def _holds_record_lock(self, name, start, stop):
+        """Check if any of our open files has a lock covering a range of records."""
+        for f in self.list_open(name):
+            for start_1, stop_1 in f.lock_set:
+                if (start_1 is None and stop_1 is None) or (
+                        start is not None and
+                        min(start_1, stop_1) <= start and stop <= max(start_1, stop_1)):
+                    return True
+        return False
+
+    def _native_lock(self, this_file, start, stop, operation):
+        """Apply a lock operation to the native file for a range of records; False if refused."""
+        if start is None and stop is None:
+            # whole file, including any later extension
+            offset, length = 0, 0
+        else:
+            first, last = min(start, stop), max(start, stop)
+            offset, length = (first-1) * this_file.reclen, (last-first+1) * this_file.reclen
+        try:
+            fcntl.lockf(this_file.stream, operation, length, offset)
+        except EnvironmentError as e:
+            if e.errno in (errno.EACCES, errno.EAGAIN):
+                return False
+            logging.warning('Could not lock native file: %s', e)
+            raise error.BASICError(error.PERMISSION_DENIED)
+        return True
@@ -43,7 +43,7 @@ class Files(object):
             self, values, memory, queues, keyboard, display,
             max_files, max_reclen, serial_buffer_size,
             device_params, current_device, mount_dict,
-            utf8, universal
+            utf8, universal, native_locks
         ):
         """Initialise files."""
         # for wait() in files_
@@ -56,7 +56,7 @@ class Files(object):
         self._init_devices(
             values, queues, display, keyboard,
             device_params, current_device, mount_dict,
-            serial_buffer_size, utf8, universal
+            serial_buffer_size, utf8, universal, native_locks
         )
 
     ###########################################################################
@@ -126,7 +126,7 @@ class Files(object):
     def _init_devices(
             self, values, queues, display, keyboard,
             device_params, current_device, mount_dict,
-            serial_in_size, utf8, universal
+            serial_in_size, utf8, universal, native_locks
         ):
         """Initialise devices."""
         # screen device, for files_()
@@ -154,7 +154,9 @@ class Files(object):
         self.kybd_file = self._devices[b'KYBD:'].device_file
         self.lpt1_file = self._devices[b'LPT1:'].device_file
         # disks
-        self._init_disk_devices(mount_dict, current_device, codepage, utf8, universal)
+        self._init_disk_devices(
+            mount_dict, current_device, codepage, utf8, universal, native_locks
+        )
 
     def close_devices(self):
         """Close device master files."""
@@ -566,7 +568,7 @@ class Files(object):
 
     def _init_disk_devices(
             self, mount_dict, current_device,
-            codepage, utf8, universal
+            codepage, utf8, universal, native_locks
         ):
         """Initialise disk devices."""
         # use None to request default mounts, use {} for no mounts
@@ -582,7 +584,9 @@ class Files(object):
                 path, cwd = None, u''
             # treat device @: separately - internal disk
             disk_class = disk.InternalDiskDevice if letter == b'@' else disk.DiskDevice
-            self._devices[letter + b':'] = disk_class(letter, path, cwd, codepage, utf8, universal)
+            self._devices[letter + b':'] = disk_class(
+                letter, path, cwd, codepage, utf8, universal, native_locks
+            )
         # allow upper or lower case, unicode or str, with or without :
         if isinstance(current_device, unicode):
             current_device = current_device.encode('ascii')
@@ -310,6 +310,8 @@ class COMFile(TextFileBase, RealTimeInputMixin):
     def __init__(self, stream, field, linefeed, serial_in_size, queues):
         """Initialise COMn: file."""
         TextFileBase.__init__(self, stream, b'D', b'R')
+        # buffer for the separator character that broke the last INPUT# field
+        self._readahead = []
         self._queues = queues
         # create a FIELD for GET and PUT. no text file operations on COMn: FIELD
         self._field = field
@@ -192,6 +192,40 @@ class Drawing(object):
             self._queues.video.put(signals.Event(signals.VIDEO_PUT_PIXEL, (pagenum, x, y, index)))
             self.clear_text_at(x, y)
 
+    def put_points(self, points, index):
+        """Put a list of (x, y) pixels on the screen in horizontal spans; empty character buffer."""
+        vx0, vy0, vx1, vy1 = self.graph_view.get()
+        spans = []
+        # sort by row, then column; merge runs of adjacent pixels
+        for y, x in sorted(set((y, x) for x, y in points)):
+            if not (vx0 <= x <= vx1 and vy0 <= y <= vy1):
+                continue
+            if spans and spans[-1][2] == y and spans[-1][1] == x-1:
+                spans[-1][1] = x
+            else:
+                spans.append([x, x, y])
+        if not spans:
+            return
+        page = self._pixels.pages[self._apagenum]
+        font_width, font_height = self._mode.font_width, self._mode.font_height
+        cells = set()
+        for x0, x1, y in spans:
+            page.fill_interval(x0, x1, y, index)
+            row = 1 + y // font_height
+            cells.update((row, col) for col in xrange(1 + x0 // font_width, 2 + x1 // font_width))
+        self._queues.video.put(
+            signals.Event(signals.VIDEO_FILL_SPANS, (self._apagenum, spans, index))
+        )
+        # text-only interfaces need to be told about the cleared characters
+        fore, back, blink, underline = self._mode.split_attr(self._attr)
+        for row, col in sorted(cells):
+            if col <= self._mode.width and row <= self._mode.height:
+                self._text.put_char_attr(self._apagenum, row, col, b' ', self._attr)
+                self._queues.video.put(
+                    signals.Event(signals.VIDEO_PUT_GLYPH,
+                    (self._apagenum, row, col, u' ', False, fore, back, blink, underline))
+                )
+
     def get_pixel(self, x, y, pagenum=None):
         """Return the attribute a pixel on the screen."""
         if pagenum is None:
@@ -447,6 +481,10 @@ class Drawing(object):
 
     def draw_line(self, x0, y0, x1, y1, c, pattern=0xffff):
         """Draw a line between the given physical points."""
+        self.put_points(self._line_points(x0, y0, x1, y1, pattern), c)
+
+    def _line_points(self, x0, y0, x1, y1, pattern=0xffff):
+        """Get the pixels of a line between the given physical points."""
         # cut off any out-of-bound coordinates
         x0, y0 = self._mode.cutoff_coord(x0, y0)
         x1, y1 = self._mode.cutoff_coord(x1, y1)
@@ -464,12 +502,13 @@ class Drawing(object):
         mask = 0x8000
         line_error = dx // 2
         x, y = x0, y0
+        points = []
         for x in xrange(x0, x1+sx, sx):
             if pattern & mask != 0:
                 if steep:
-                    self.put_pixel(y, x, c)
+                    points.append((y, x))
                 else:
-                    self.put_pixel(x, y, c)
+                    points.append((x, y))
             mask >>= 1
             if mask == 0:
                 mask = 0x8000
@@ -477,6 +516,7 @@ class Drawing(object):
             if line_error < 0:
                 y += sy
                 line_error += dx
+        return points
 
     def draw_box_filled(self, x0, y0, x1, y1, c):
         """Draw a filled box between the given corner points."""
@@ -492,17 +532,19 @@ class Drawing(object):
         """Draw an empty box between the given corner points."""
         x0, y0 = self._mode.cutoff_coord(x0, y0)
         x1, y1 = self._mode.cutoff_coord(x1, y1)
+        points = []
         mask = 0x8000
-        mask = self.draw_straight(x1, y1, x0, y1, c, pattern, mask)
-        mask = self.draw_straight(x1, y0, x0, y0, c, pattern, mask)
+        mask = self._straight_points(x1, y1, x0, y1, pattern, mask, points)
+        mask = self._straight_points(x1, y0, x0, y0, pattern, mask, points)
         # verticals always drawn top to bottom
         if y0 < y1:
             y0, y1 = y1, y0
-        mask = self.draw_straight(x1, y1, x1, y0, c, pattern, mask)
-        mask = self.draw_straight(x0, y1, x0, y0, c, pattern, mask)
+        mask = self._straight_points(x1, y1, x1, y0, pattern, mask, points)
+        mask = self._straight_points(x0, y1, x0, y0, pattern, mask, points)
+        self.put_points(points, c)
 
-    def draw_straight(self, x0, y0, x1, y1, c, pattern, mask):
-        """Draw a horizontal or vertical line."""
+    def _straight_points(self, x0, y0, x1, y1, pattern, mask, points):
+        """Add the pixels of a horizontal or vertical line to a list; return the pattern mask."""
         if x0 == x1:
             p0, p1, q, direction = y0, y1, x0, 'y'
         else:
@@ -511,9 +553,9 @@ class Drawing(object):
         for p in range(p0, p1+sp, sp):
             if pattern & mask != 0:
                 if direction == 'x':
-                    self.put_pixel(p, q, c)
+                    points.append((p, q))
                 else:
-                    self.put_pixel(q, p, c)
+                    points.append((q, p))
             mask >>= 1
             if mask == 0:
                 mask = 0x8000
@@ -641,6 +683,7 @@ class Drawing(object):
         # ....|-----|... ; coo1 gte coo0: print if y in [coo0,coo1]
         x, y = r, 0
         bres_error = 1-r
+        points = []
         while x >= y:
             for octant in range(0,8):
                 if octant in hide_oct:
@@ -661,7 +704,7 @@ class Drawing(object):
                         # (don't draw if y is between coo's)
                         if _octant_gt(oct0, y, coo1) and _octant_gt(oct0, coo0, y):
                             continue
-                self.put_pixel(*_octant_coord(octant, x0, y0, x, y), index=c)
+                points.append(_octant_coord(octant, x0, y0, x, y))
             # remember endpoints for pie sectors
             if y == coo0:
                 coo0x = x
@@ -676,9 +719,10 @@ class Drawing(object):
                 bres_error += 2*(y-x+1)
         # draw pie-slice lines
         if line0:
-            self.draw_line(x0, y0, *_octant_coord(oct0, x0, y0, coo0x, coo0), c=c)
+            points += self._line_points(x0, y0, *_octant_coord(oct0, x0, y0, coo0x, coo0))
         if line1:
-            self.draw_line(x0, y0, *_octant_coord(oct1, x0, y0, coo1x, coo1), c=c)
+            points += self._line_points(x0, y0, *_octant_coord(oct1, x0, y0, coo1x, coo1))
+        self.put_points(points, c)
 
     def draw_ellipse(
             self, cx, cy, rx, ry, c,
@@ -702,6 +746,7 @@ class Drawing(object):
         # error for first step
         err = dx + dy
         x, y = rx, 0
+        points = []
         while True:
             for quadrant in range(0,4):
                 # skip invisible arc sectors
@@ -718,7 +763,7 @@ class Drawing(object):
                     else:
                         if _quadrant_gt(qua0, x, y, x1, y1) and _quadrant_gt(qua0, x0, y0, x, y):
                             continue
-                self.put_pixel(*_quadrant_coord(quadrant, cx, cy, x, y), index=c)
+                points.append(_quadrant_coord(quadrant, cx, cy, x, y))
             # bresenham error step
             e2 = 2 * err
             if (e2 <= dy):
@@ -735,14 +780,15 @@ class Drawing(object):
         # too early stop of flat vertical ellipses
         # finish tip of ellipse
         while (y < ry):
-            self.put_pixel(cx, cy+y, c)
-            self.put_pixel(cx, cy-y, c)
+            points.append((cx, cy+y))
+            points.append((cx, cy-y))
             y += 1
         # draw pie-slice lines
         if line0:
-            self.draw_line(cx, cy, *_quadrant_coord(qua0, cx, cy, x0, y0), c=c)
+            points += self._line_points(cx, cy, *_quadrant_coord(qua0, cx, cy, x0, y0))
         if line1:
-            self.draw_line(cx, cy, *_quadrant_coord(qua1, cx, cy, x1, y1), c=c)
+            points += self._line_points(cx, cy, *_quadrant_coord(qua1, cx, cy, x1, y1))
+        self.put_points(points, c)
 
     ### PAINT: Flood fill
 
@@ -806,48 +852,67 @@ class Drawing(object):
         # paint nothing if we start on border attrib
         if self.get_pixel(x,y) == border:
             return
-        while len(line_seed) > 0:
-            # consider next interval
-            x_start, x_stop, y, ydir = line_seed.pop()
-            # extend interval as far as it goes to left and right
-            x_left = x_start - len(self.get_until(x_start-1, bound_x0-1, y, border))
-            x_right = x_stop + len(self.get_until(x_stop+1, bound_x1+1, y, border))
-            # check next scanlines and add intervals to the list
-            if ydir == 0:
-                if y + 1 <= bound_y1:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y+1, c, tile, back, border, 1
-                    )
-                if y - 1 >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y-1, c, tile, back, border, -1
-                    )
-            else:
-                # check the same interval one scanline onward in the same direction
-                if y+ydir <= bound_y1 and y+ydir >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y+ydir, c, tile, back, border, ydir
-                    )
-                # check any bit of the interval that was extended one scanline backward
-                # this is where the flood fill goes around corners.
-                if y-ydir <= bound_y1 and y-ydir >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_start-1, y-ydir, c, tile, back, border, -ydir
-                    )
-                    line_seed = self.check_scanline(
-                        line_seed, x_stop+1, x_right, y-ydir, c, tile, back, border, -ydir
-                    )
-            # draw the pixels for the current interval
-            if solid:
-                self.fill_interval(x_left, x_right, y, tile[0][0])
-            else:
-                interval = tile_to_interval(x_left, x_right, y, tile)
-                self.put_interval(self._apagenum, x_left, y, interval)
-            # allow interrupting the paint
-            if y%4 == 0:
-                self._input_methods.wait()
+        # spans are scanned and filled directly on the page buffer
+        page = self._pixels.pages[self._apagenum]
+        painted = []
+        try:
+            while len(line_seed) > 0:
+                # consider next interval
+                x_start, x_stop, y, ydir = line_seed.pop()
+                # extend interval as far as it goes to left and right
+                x_left = x_start - page.count_until(x_start-1, bound_x0-1, y, border)
+                x_right = x_stop + page.count_until(x_stop+1, bound_x1+1, y, border)
+                # check next scanlines and add intervals to the list
+                if ydir == 0:
+                    if y + 1 <= bound_y1:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y+1, c, tile, back, border, 1
+                        )
+                    if y - 1 >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y-1, c, tile, back, border, -1
+                        )
+                else:
+                    # check the same interval one scanline onward in the same direction
+                    if y+ydir <= bound_y1 and y+ydir >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y+ydir, c, tile, back, border, ydir
+                        )
+                    # check any bit of the interval that was extended one scanline backward
+                    # this is where the flood fill goes around corners.
+                    if y-ydir <= bound_y1 and y-ydir >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_start-1, y-ydir, c, tile, back, border, -ydir
+                        )
+                        line_seed = self.check_scanline(
+                            line_seed, x_stop+1, x_right, y-ydir, c, tile, back, border, -ydir
+                        )
+                # draw the pixels for the current interval
+                page.fill_tile(x_left, x_right, y, tile[y % len(tile)])
+                painted.append((x_left, x_right, y))
+                # allow interrupting the paint
+                if y%4 == 0:
+                    self._input_methods.check_events()
+        finally:
+            self._show_painted(painted, solid)
         self.last_attr = c
 
+    def _show_painted(self, painted, solid):
+        """Clear text under the painted intervals and send the painted area to the screen."""
+        if not painted:
+            return
+        for x0, x1, y in painted:
+            # patterned intervals clear text one pixel further to the right
+            self.clear_text_area(x0, y, x1 if solid else x1+1, y)
+        x0 = min(_x0 for _x0, _, _ in painted)
+        x1 = max(_x1 for _, _x1, _ in painted)
+        y0 = min(_y for _, _, _y in painted)
+        y1 = max(_y for _, _, _y in painted)
+        rect = self._pixels.pages[self._apagenum].get_rect(x0, y0, x1, y1)
+        self._queues.video.put(
+            signals.Event(signals.VIDEO_PUT_RECT, (self._apagenum, x0, y0, x1, y1, rect))
+        )
+
     def check_scanline(
             self, line_seed, x_start, x_stop, y,
             c, tile, back, border, ydir
@@ -855,32 +920,17 @@ class Drawing(object):
         """Append all subintervals between border colours to the scanning stack."""
         if x_stop < x_start:
             return line_seed
-        x_start_next = x_start
-        x_stop_next = x_start_next-1
         rtile = tile[y%len(tile)]
-        if back:
-            rback = back[y%len(back)]
-        x = x_start
-        while x <= x_stop:
-            # scan horizontally until border colour found, then append interval & continue scanning
-            pattern = self.get_until(x, x_stop+1, y, border)
-            x_stop_next = x + len(pattern) - 1
-            x = x_stop_next + 1
-            # never match zero pattern (special case)
-            has_same_pattern = (rtile != [0]*8)
-            for pat_x in range(len(pattern)):
-                if not has_same_pattern:
-                    break
-                tile_x = (x_start_next + pat_x) % 8
-                has_same_pattern &= (pattern[pat_x] == rtile[tile_x])
-                has_same_pattern &= (not back or pattern[pat_x] != rback[tile_x])
-            # we've reached a border colour, append our interval & start a new one
-            # don't append if same fill colour/pattern,
-            # to avoid infinite loops over bits already painted (eg. 00 shape)
-            if x_stop_next >= x_start_next and not has_same_pattern:
-                line_seed.append([x_start_next, x_stop_next, y, ydir])
-            x_start_next = x + 1
-            x += 1
+        rback = back[y%len(back)] if back else None
+        spans = self._pixels.pages[self._apagenum].get_spans(
+            x_start, x_stop, y, border, rtile, rback
+        )
+        # don't append if same fill colour/pattern,
+        # to avoid infinite loops over bits already painted (eg. 00 shape)
+        line_seed.extend(
+            [x_start_next, x_stop_next, y, ydir]
+            for x_start_next, x_stop_next, is_tiled in spans if not is_tiled
+        )
         return line_seed
 
     ### PUT and GET: Sprite operations
@@ -1176,19 +1226,6 @@ class Drawing(object):
         return self._values.new_single().from_value(value)
 
 
-def tile_to_interval(x0, x1, y, tile):
-    """Convert a tile to a list of attributes."""
-    dx = x1 - x0 + 1
-    h = len(tile)
-    w = len(tile[0])
-    if numpy:
-        # fast method using numpy instead of loop
-        ntile = numpy.roll(numpy.array(tile).astype(int)[y % h], int(-x0 % 8))
-        return numpy.tile(ntile, (dx+w-1) // w)[:dx]
-    else:
-        return [tile[y % h][x % 8] for x in xrange(x0, x1+1)]
-
-
 ###############################################################################
 # octant logic for CIRCLE
 
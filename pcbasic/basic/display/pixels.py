@@ -161,6 +161,48 @@ class PixelPage(object):
                     arr = arr[found[0][-1]+1:]
             return list(arr.flatten())
 
+        def count_until(self, x0, x1, y, c):
+            """Get the length of the interval returned by get_until."""
+            if x0 == x1:
+                return 0
+            toright = x1 > x0
+            if not toright:
+                x0, x1 = x1+1, x0+1
+            found = numpy.flatnonzero(self.buffer[y, x0:x1] == c)
+            if not len(found):
+                return x1 - x0
+            elif toright:
+                return int(found[0])
+            else:
+                return x1 - x0 - 1 - int(found[-1])
+
+        def get_spans(self, x0, x1, y, c, tile_row, back_row=None):
+            """
+            Get the intervals in [x0, x1] that do not contain attribute c.
+            Returns a list of (start, stop, is_tiled) where is_tiled means that the interval
+            equals the tile row and differs from the background row at every pixel.
+            """
+            row = self.buffer[y, x0:x1+1]
+            inside = numpy.concatenate(([False], row != c, [False]))
+            edges = numpy.flatnonzero(inside[1:] != inside[:-1])
+            starts, stops = edges[::2], edges[1::2] - 1
+            # never match zero pattern (special case)
+            if any(tile_row):
+                tile_x = numpy.arange(x0, x1+1) % 8
+                match = row == numpy.array(tile_row)[tile_x]
+                if back_row is not None:
+                    match &= row != numpy.array(back_row)[tile_x]
+                # cumulative count of mismatches; an interval is tiled if it has none
+                misses = numpy.concatenate(([0], numpy.cumsum(~match)))
+                is_tiled = (misses[stops+1] == misses[starts]).tolist()
+            else:
+                is_tiled = [False] * len(starts)
+            return zip((starts + x0).tolist(), (stops + x0).tolist(), is_tiled)
+
+        def fill_tile(self, x0, x1, y, tile_row):
+            """Fill a scanline interval with a row of an 8-pixel wide tile."""
+            self.buffer[y, x0:x1+1] = numpy.array(tile_row)[numpy.arange(x0, x1+1) % 8]
+
     else:
         def init_operations(self):
             """Initialise operations closures."""
@@ -238,3 +280,34 @@ class PixelPage(object):
             except ValueError:
                 index = x1-x0
             return self.buffer[y][x0:x0+index]
+
+        def count_until(self, x0, x1, y, c):
+            """Get the length of the interval returned by get_until."""
+            return len(self.get_until(x0, x1, y, c))
+
+        def get_spans(self, x0, x1, y, c, tile_row, back_row=None):
+            """
+            Get the intervals in [x0, x1] that do not contain attribute c.
+            Returns a list of (start, stop, is_tiled) where is_tiled means that the interval
+            equals the tile row and differs from the background row at every pixel.
+            """
+            spans = []
+            row = self.buffer[y]
+            x = x0
+            while x <= x1:
+                start = x
+                while x <= x1 and row[x] != c:
+                    x += 1
+                if x > start:
+                    # never match zero pattern (special case)
+                    is_tiled = any(tile_row) and all(
+                        row[i] == tile_row[i%8] and (back_row is None or row[i] != back_row[i%8])
+                        for i in xrange(start, x)
+                    )
+                    spans.append((start, x-1, is_tiled))
+                x += 1
+            return spans
+
+        def fill_tile(self, x0, x1, y, tile_row):
+            """Fill a scanline interval with a row of an 8-pixel wide tile."""
+            self.buffer[y][x0:x1+1] = [tile_row[x%8] for x in xrange(x0, x1+1)]
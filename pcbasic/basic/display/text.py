@@ -29,36 +29,88 @@ class TextRow(object):
         self.double = [0] * self.width
         # last non-whitespace character
         self.end = 0
+        # DBCS converter state before each column; None if not known
+        self._states = None
 
     def clear_from(self, scol, attr):
         """Clear characters from given position till end of row."""
         self.buf = self.buf[:scol-1] + [(b' ', attr)] * (self.width - scol + 1)
         self.double = self.double[:scol-1] + [0] * (self.width - scol + 1)
         self.end = min(self.end, scol-1)
+        self._states = None
+
+    def buffer_changed(self):
+        """Note that buf has been changed directly; DBCS marking will be redone in full."""
+        self._states = None
 
     def put_char_attr(self, col, c, attr):
         """Put a byte to the screen, reinterpreting SBCS and DBCS as necessary."""
+        return self.put_chars(col, c, attr)
+
+    def put_chars(self, col, chars, attr):
+        """\
+            Put bytes to the screen from a given column, reinterpreting SBCS and DBCS as necessary.
+            Returns the first and last columns to be redrawn.
+        """
+        last = col + len(chars) - 1
         # update the screen buffer
-        self.buf[col-1] = (c, attr)
-        self.double[col-1] = 0
-        # for sbcs codepages we're done now
+        self.buf[col-1:last] = [(c, attr) for c in chars]
         if not self._dbcs_enabled:
-            return col, col
-        # mark out replaced char and changed following dbcs characters to be redrawn
-        sequences = self._conv.mark(b''.join(entry[0] for entry in self.buf), flush=True)
-        flags = ((0,) if len(seq) == 1 else (1, 2) for seq in sequences)
-        old_double = self.double
-        self.double = [entry for flag in flags for entry in flag]
+            self.double[col-1:last] = [0] * len(chars)
+            # for sbcs codepages we're done now
+            return col, last
+        # changed columns count as single-width before marking
+        old_double = self.double[:]
+        old_double[col-1:last] = [0] * len(chars)
+        # mark out replaced chars and changed following dbcs characters to be redrawn
+        lo, hi = self._mark(col-1, last)
         # find the first and last changed columns, to be able to redraw
-        diff = [old != new for old, new in zip(old_double, self.double)]
-        if True in diff:
-            start, stop = diff.index(True) + 1, len(diff) - diff[::-1].index(True)
+        diff = [_i for _i in xrange(lo, hi) if old_double[_i] != self.double[_i]]
+        if diff:
+            start, stop = diff[0] + 1, diff[-1] + 1
         else:
             start, stop = col, col
         # if the tail byte has changed, the lead byte needs to be redrawn as well
         if self.double[start-1] == 2:
             start -= 1
-        return min(col, start), max(col, stop)
+        return min(col, start), max(last, stop)
+
+    def _mark(self, first, last):
+        """\
+            Redo DBCS marking after bytes from index first up to last (exclusive) have changed.
+            Only the bytes whose marking may change are reconsidered: the converter is restarted
+            from its state before the first change and stopped once it gets back into step.
+            Returns the range of indices of which the marking has been redone.
+        """
+        if self._states is None:
+            # no states known, mark the whole row
+            self._states = [None] * (self.width + 1)
+            self._states[0] = self._conv.CLEAN_STATE
+            first = 0
+        conv, states, double = self._conv, self._states, self.double
+        conv.set_state(states[first])
+        # index of the first byte not yet marked; bytes held by the converter are redone too
+        lo = pos = first - len(states[first][0])
+        for i in xrange(first, self.width):
+            state = conv.get_state()
+            if i >= last and state == states[i]:
+                # back in step: marking from here on is unchanged
+                return lo, max(pos, last)
+            states[i] = state
+            for seq in conv.mark(self.buf[i][0]):
+                if len(seq) == 1:
+                    double[pos] = 0
+                else:
+                    double[pos:pos+2] = 1, 2
+                pos += len(seq)
+        states[self.width] = conv.get_state()
+        for seq in conv.mark(b'', flush=True):
+            if len(seq) == 1:
+                double[pos] = 0
+            else:
+                double[pos:pos+2] = 1, 2
+            pos += len(seq)
+        return lo, self.width
 
 
 class TextPage(object):
@@ -116,16 +168,22 @@ class TextBuffer(object):
             dstrow.buf[:] = srcrow.buf[:]
             dstrow.end = srcrow.end
             dstrow.wrap = srcrow.wrap
+            dstrow.buffer_changed()
 
     def clear_area(self, pagenum, row0, col0, row1, col1, attr):
         """Clear a rectangular area of the screen."""
         for r in range(row0-1, row1):
             self.pages[pagenum].row[r].buf[col0-1:col1] = [(b' ', attr)] * (col1 - col0 + 1)
+            self.pages[pagenum].row[r].buffer_changed()
 
     def put_char_attr(self, pagenum, row, col, c, attr):
         """Put a byte to the screen, reinterpreting SBCS and DBCS as necessary."""
         return self.pages[pagenum].row[row-1].put_char_attr(col, c, attr)
 
+    def put_chars(self, pagenum, row, col, chars, attr):
+        """Put bytes on a row of the screen, reinterpreting SBCS and DBCS as necessary."""
+        return self.pages[pagenum].row[row-1].put_chars(col, chars, attr)
+
     def scroll_up(self, pagenum, from_line, bottom, attr):
         """Scroll up."""
         self.pages[pagenum].row.insert(
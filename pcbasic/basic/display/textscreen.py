@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import logging
+import re
 
 from ..base import signals
 from ..base import error
@@ -20,6 +21,9 @@ from .textbase import BottomBar, Cursor, ScrollArea
 # mark bytes conversion explicitly
 int2byte = chr
 
+# control characters interpreted by write(); other characters are written in runs
+_CONTROL_SPLIT = re.compile(b'([\t\n\r\a\x0b\x0c\x1c-\x1f])')
+
 
 class TextScreen(object):
     """Text screen."""
@@ -140,7 +144,9 @@ class TextScreen(object):
         last = b''
         # if our line wrapped at the end before, it doesn't anymore
         self.text.pages[self.apagenum].row[self.current_row-1].wrap = False
-        for c in s:
+        for c in _CONTROL_SPLIT.split(s):
+            if not c:
+                continue
             row, col = self.current_row, self.current_col
             if c == b'\t':
                 # TAB
@@ -181,8 +187,8 @@ class TextScreen(object):
                 self.set_pos(row + 1, col, scroll_ok)
             else:
                 # includes \b, \0, and non-control chars
-                self.write_char(c)
-            last = c
+                self.write_chars(c)
+            last = c[-1]
 
     def write_line(self, s=b'', scroll_ok=True, do_echo=True):
         """Write a string to the screen and end with a newline."""
@@ -208,27 +214,36 @@ class TextScreen(object):
 
     def write_char(self, c, do_scroll_down=False):
         """Put one character at the current position."""
-        # check if scroll& repositioning needed
-        if self.overflow:
-            self.current_col += 1
-            self.overflow = False
-        # see if we need to wrap and scroll down
-        self._check_wrap(do_scroll_down)
-        # move cursor and see if we need to scroll up
-        self._check_pos(scroll_ok=True)
-        # put the character
-        self.put_char_attr(self.apagenum, self.current_row, self.current_col, c, self.attr)
-        # adjust end of line marker
-        if (self.current_col > self.text.pages[self.apagenum].row[self.current_row-1].end):
-            self.text.pages[self.apagenum].row[self.current_row-1].end = self.current_col
-        # move cursor. if on col 80, only move cursor to the next row
-        # when the char is printed
-        if self.current_col < self.mode.width:
-            self.current_col += 1
-        else:
-            self.overflow = True
-        # move cursor and see if we need to scroll up
-        self._check_pos(scroll_ok=True)
+        self.write_chars(c, do_scroll_down)
+
+    def write_chars(self, s, do_scroll_down=False):
+        """Put characters at the current position, as many at a time as fit on the row."""
+        while s:
+            # check if scroll& repositioning needed
+            if self.overflow:
+                self.current_col += 1
+                self.overflow = False
+            # see if we need to wrap and scroll down
+            self._check_wrap(do_scroll_down)
+            # move cursor and see if we need to scroll up
+            self._check_pos(scroll_ok=True)
+            # put the characters that fit
+            num = min(len(s), self.mode.width - self.current_col + 1)
+            self.put_chars(self.apagenum, self.current_row, self.current_col, s[:num], self.attr)
+            s = s[num:]
+            last_col = self.current_col + num - 1
+            # adjust end of line marker
+            if (last_col > self.text.pages[self.apagenum].row[self.current_row-1].end):
+                self.text.pages[self.apagenum].row[self.current_row-1].end = last_col
+            # move cursor. if on col 80, only move cursor to the next row
+            # when the char is printed
+            if last_col < self.mode.width:
+                self.current_col = last_col + 1
+            else:
+                self.current_col = last_col
+                self.overflow = True
+            # move cursor and see if we need to scroll up
+            self._check_pos(scroll_ok=True)
 
     def _check_wrap(self, do_scroll_down):
         """Wrap if we need to."""
@@ -362,6 +377,14 @@ class TextScreen(object):
         # update the screen
         self.refresh_range(pagenum, row, start, stop)
 
+    def put_chars(self, pagenum, row, col, chars, attr):
+        """Put bytes on a row of the screen, redrawing as necessary."""
+        if not self.mode.is_text_mode:
+            attr = attr & 0xf
+        start, stop = self.text.put_chars(pagenum, row, col, chars, attr)
+        # update the screen
+        self.refresh_range(pagenum, row, start, stop)
+
     ###########################################################################
 
     def refresh_range(self, pagenum, row, start, stop, text_only=False):
@@ -581,6 +604,7 @@ class TextScreen(object):
             while True:
                 therow = self.text.pages[self.apagenum].row[row-1]
                 therow.buf.insert(col-1, (c, attr))
+                therow.buffer_changed()
                 if therow.end < self.mode.width:
                     therow.buf.pop()
                     if therow.end > col-1:
@@ -94,11 +94,216 @@ class NullQueue(object):
         pass
 
 
+class BatchQueue(object):
+    """Queue wrapper that collects signals and sends them in batches."""
+
+    def __init__(self, queue, batch_type, max_batch=500):
+        """Wrap a queue; batches are sent as signals of the given type."""
+        self._queue = queue
+        self._batch_type = batch_type
+        self._max_batch = max_batch
+        self._batch = []
+        self._last_flush = time.time()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def empty(self):
+        return not self._batch and self._queue.empty()
+
+    def put(self, item, block=True, timeout=None):
+        """Add a signal to the batch; send the batch when it is full."""
+        self._batch.append(item)
+        if len(self._batch) >= self._max_batch:
+            self.flush()
+
+    def flush(self):
+        """Send the signals collected so far."""
+        self._last_flush = time.time()
+        if self._batch:
+            self._queue.put(signals.Event(self._batch_type, (self._batch,)))
+            self._batch = []
+
+    def flush_after(self, interval):
+        """Send the signals collected so far if the given time has passed since the last send."""
+        if self._batch and time.time() - self._last_flush >= interval:
+            self.flush()
+
+    def join(self):
+        """Send the batch and wait for the queue to be processed."""
+        self.flush()
+        self._queue.join()
+
+
+# signals that draw on the pixel pages
+# graphical interfaces draw glyphs only in text mode, where there are no pixel signals,
+# and text-only interfaces ignore pixel signals; so pixel and glyph signals can be reordered
+_PIXEL_SIGNALS = (
+    signals.VIDEO_PUT_PIXEL, signals.VIDEO_PUT_INTERVAL, signals.VIDEO_FILL_INTERVAL,
+    signals.VIDEO_FILL_SPANS, signals.VIDEO_PUT_RECT, signals.VIDEO_FILL_RECT,
+)
+
+
+class VideoBatchQueue(BatchQueue):
+    """Batch queue that merges runs of pixel and glyph signals."""
+
+    def __init__(self, queue, batch_type, max_batch=500):
+        """Wrap a queue; batches are sent as signals of the given type."""
+        BatchQueue.__init__(self, queue, batch_type, max_batch)
+        self._reset_runs()
+
+    def _reset_runs(self):
+        """Start new runs: signals already in the batch are not extended."""
+        # batch positions of the last pixel and glyph signal, which may be extended
+        self._pixels = None
+        self._glyphs = None
+        # batch position of the pixel signal before the last, which may be extended downwards
+        self._rows = None
+        # ids of the lists created by merging, which may be extended in place
+        self._own = set()
+
+    def put(self, item, block=True, timeout=None):
+        """Add a signal to the batch, merged into the last if possible; send a full batch."""
+        if item.event_type in _PIXEL_SIGNALS:
+            if self._pixels is None or not self._merge_pixels(item):
+                self._close_pixels()
+                self._pixels = len(self._batch)
+                self._batch.append(item)
+        elif item.event_type == signals.VIDEO_PUT_GLYPH:
+            if self._glyphs is None or not self._merge_glyph(item):
+                self._glyphs = len(self._batch)
+                self._batch.append(item)
+        else:
+            # other signals affect both pixels and glyphs
+            self._reset_runs()
+            self._batch.append(item)
+        if len(self._batch) >= self._max_batch:
+            self.flush()
+
+    def flush(self):
+        """Send the signals collected so far."""
+        self._close_pixels()
+        # remove the places of signals that have been merged into others
+        self._batch = [_item for _item in self._batch if _item]
+        BatchQueue.flush(self)
+        self._reset_runs()
+
+    def _extend(self, lst, items):
+        """Extend a list we own, or a copy of one we don't."""
+        if id(lst) not in self._own:
+            lst = list(lst)
+            self._own.add(id(lst))
+        lst.extend(items)
+        return lst
+
+    def _merge_pixels(self, item):
+        """Merge a pixel signal into the last; return True if successful."""
+        last = self._batch[self._pixels]
+        last_span, span = _as_put_interval(last), _as_put_interval(item)
+        if last_span and span:
+            pagenum, x, y, colours = last_span
+            if span[:3] == (pagenum, x + len(colours), y):
+                self._batch[self._pixels] = signals.Event(
+                    signals.VIDEO_PUT_INTERVAL, (pagenum, x, y, self._extend(colours, span[3]))
+                )
+                return True
+            return False
+        last_spans, spans = _as_fill_spans(last), _as_fill_spans(item)
+        if last_spans and spans and (last_spans[0], last_spans[2]) == (spans[0], spans[2]):
+            # fills in the same attribute may overlap
+            pagenum, last_spans, index = last_spans
+            self._batch[self._pixels] = signals.Event(
+                signals.VIDEO_FILL_SPANS, (pagenum, self._extend(last_spans, spans[1]), index)
+            )
+            return True
+        return False
+
+    def _close_pixels(self):
+        """End the run of the last pixel signal; merge it into the row above if possible."""
+        if self._pixels is None:
+            return
+        span = _as_put_interval(self._batch[self._pixels])
+        rect = self._rows is not None and self._as_rect(self._batch[self._rows])
+        if span and rect:
+            pagenum, x0, y0, x1, y1, rows = rect
+            if (span[0], span[1], span[1] + len(span[3]) - 1, span[2]) == (pagenum, x0, x1, y1+1):
+                rows.append(span[3])
+                self._own.add(id(rows))
+                self._batch[self._rows] = signals.Event(
+                    signals.VIDEO_PUT_RECT, (pagenum, x0, y0, x1, y1+1, rows)
+                )
+                self._batch[self._pixels] = None
+                return
+        self._rows = self._pixels
+
+    def _as_rect(self, item):
+        """Get (pagenum, x0, y0, x1, y1, rows) for a rect signal we can extend, or None."""
+        if item.event_type == signals.VIDEO_PUT_RECT:
+            if id(item.params[5]) in self._own:
+                return item.params
+            return None
+        span = _as_put_interval(item)
+        if span:
+            pagenum, x, y, colours = span
+            return pagenum, x, y, x + len(colours) - 1, y, [colours]
+        return None
+
+    def _merge_glyph(self, item):
+        """Merge a glyph signal into the last; return True if successful."""
+        last = self._batch[self._glyphs]
+        pagenum, row, col, char, is_fullwidth = item.params[:5]
+        attrs = item.params[5:]
+        if last.event_type == signals.VIDEO_PUT_GLYPH:
+            if last.params == item.params:
+                return True
+            last_col, last_char, last_fullwidth = last.params[2:5]
+            chars = [last_char] + [u''] * last_fullwidth
+        else:
+            last_col, chars = last.params[2:4]
+        if last.params[:2] != (pagenum, row) or last.params[-4:] != attrs:
+            return False
+        offset = col - last_col
+        if offset == len(chars):
+            self._batch[self._glyphs] = signals.Event(
+                signals.VIDEO_PUT_TEXT, (pagenum, row, last_col, self._extend(
+                    chars, [char] + [u''] * is_fullwidth
+                )) + attrs
+            )
+            return True
+        # a character already put in this run
+        return (
+            0 <= offset < len(chars) and chars[offset] == char
+            and (chars[offset+1:offset+2] == [u'']) == bool(is_fullwidth)
+        )
+
+
+def _as_put_interval(item):
+    """Get (pagenum, x, y, colours) for a signal that puts a single-row interval, or None."""
+    if item.event_type == signals.VIDEO_PUT_PIXEL:
+        pagenum, x, y, index = item.params
+        return pagenum, x, y, [index]
+    elif item.event_type == signals.VIDEO_PUT_INTERVAL:
+        return item.params
+    return None
+
+def _as_fill_spans(item):
+    """Get (pagenum, spans, index) for a signal that fills scanline intervals, or None."""
+    if item.event_type == signals.VIDEO_FILL_INTERVAL:
+        pagenum, x0, x1, y, index = item.params
+        return pagenum, [[x0, x1, y]], index
+    elif item.event_type == signals.VIDEO_FILL_SPANS:
+        return item.params
+    return None
+
+
 class EventQueues(object):
     """Manage interface queues."""
 
     tick = 0.006
-    max_video_qsize = 500
+    # video signals are sent in batches of up to this size, at least once per tick
+    max_video_batch = 500
+    # the video queue holds batches: this is a number of batches, not of signals
+    max_video_qsize = 20
     max_audio_qsize = 20
 
     def __init__(self, values, ctrl_c_is_break, inputs=None, video=None, audio=None):
@@ -112,12 +317,18 @@ class EventQueues(object):
         self._ctrl_c_is_break = ctrl_c_is_break
         # F12 replacement events
         self._f12_active = False
+        # periodic callback, its interval and next due time
+        self._timer = None
+        self._timer_interval = 0
+        self._timer_due = 0
         self.set(inputs, video, audio)
 
     def set(self, inputs=None, video=None, audio=None):
         """Set; default is NullQueues."""
         self.inputs = inputs or NullQueue()
-        self.video = video or NullQueue()
+        self.video = VideoBatchQueue(
+            video or NullQueue(), signals.VIDEO_BATCH, self.max_video_batch
+        )
         self.audio = audio or NullQueue()
 
     def __getstate__(self):
@@ -126,6 +337,8 @@ class EventQueues(object):
         pickle_dict['inputs'] = None
         pickle_dict['video'] = None
         pickle_dict['audio'] = None
+        # callbacks can't be pickled
+        pickle_dict['_timer'] = None
         return pickle_dict
 
     def __setstate__(self, pickle_dict):
@@ -137,8 +350,16 @@ class EventQueues(object):
         """Add an input handler."""
         self._handlers.append(handler)
 
+    def set_timer(self, callback, interval):
+        """Call a function from the event cycle every interval seconds; None to stop."""
+        self._timer = callback
+        self._timer_interval = interval
+        self._timer_due = time.time() + interval
+
     def wait(self):
         """Wait and check events."""
+        # make sure the screen is up to date while we wait
+        self.video.flush()
         time.sleep(self.tick)
         self.check_events()
 
@@ -148,6 +369,7 @@ class EventQueues(object):
         # and we have put a lot of work on the queue
         # this works because Interface will send KEYB_QUIT on termination
         self._check_input(event_check_input)
+        self.video.flush_after(self.tick)
         # avoid screen lockups if video queue fills up
         if self.video.qsize() > self.max_video_qsize:
             # note that this really slows down screen writing
@@ -155,6 +377,9 @@ class EventQueues(object):
             self.video.join()
         if self.audio.qsize() > self.max_audio_qsize:
             self.audio.join()
+        if self._timer and time.time() >= self._timer_due:
+            self._timer_due = time.time() + self._timer_interval
+            self._timer()
 
     def _check_input(self, event_check_input):
         """Handle input events."""
@@ -30,6 +30,7 @@ from . import dos
 from . import memory
 from . import machine
 from . import interpreter
+from . import profiler
 from . import sound
 from . import iostreams
 from . import codepage as cp
@@ -48,17 +49,18 @@ class Implementation(object):
     """Interpreter session, implementation class."""
 
     def __init__(
-            self, syntax=u'advanced', double=False, term=u'', shell=u'',
+            self, syntax=u'advanced', double=False, fast_math=False, term=u'', shell=u'',
             output_streams=sys.stdout, input_streams=sys.stdin,
             codepage=None, box_protect=True, font=None, text_width=80,
             video=u'cga', monitor=u'rgb', aspect_ratio=(4, 3), low_intensity=False,
             devices=None, current_device=u'Z:', mount=None, utf8=False, soft_linefeed=False,
+            native_locks=False,
             keys=u'', check_keybuffer_full=True, ctrl_c_is_break=True,
             hide_listing=None, hide_protected=False,
             peek_values=None, allow_code_poke=False, rebuild_offsets=True,
             max_memory=65534, reserved_memory=3429, video_memory=262144,
             serial_buffer_size=128, max_reclen=128, max_files=3,
-            extension=None, greeting=True,
+            extension=None, greeting=True, profile=u'',
         ):
         """Initialise the interpreter session."""
         ######################################################################
@@ -82,7 +84,7 @@ class Implementation(object):
         # set up variables and memory model state
         # initialise the data segment
         self.memory = memory.DataSegment(
-            max_memory, reserved_memory, max_reclen, max_files, double
+            max_memory, reserved_memory, max_reclen, max_files, double, fast_math
         )
         # values and variables
         self.strings = self.memory.strings
@@ -146,7 +148,7 @@ class Implementation(object):
         self.files = Files(
             self.values, self.memory, self.queues, self.keyboard, self.display,
             max_files, max_reclen, serial_buffer_size,
-            devices, current_device, mount, utf8, not soft_linefeed
+            devices, current_device, mount, utf8, not soft_linefeed, native_locks
         )
         # set up the SHELL command
         # Files needed for current disk device
@@ -193,11 +195,17 @@ class Implementation(object):
         # interpreter
         ######################################################################
         # initialise the parser
-        self.parser = parser.Parser(self.values, self.memory, syntax)
+        self.parser = parser.Parser(self.values, self.memory, self.program, syntax)
+        # statement profiler writes its report to the given file
+        if profile:
+            self.profiler = profiler.Profiler(self.program, token_keyword, profile)
+        else:
+            self.profiler = None
         # initialise the interpreter
         self.interpreter = interpreter.Interpreter(
             self.queues, self.screen, self.files, self.sound,
-            self.values, self.memory, self.program, self.parser, self.basic_events
+            self.values, self.memory, self.program, self.parser, self.basic_events,
+            self.profiler
         )
         ######################################################################
         # callbacks
@@ -250,6 +258,8 @@ class Implementation(object):
         with self._handle_exceptions():
             self._store_line(command)
             self.interpreter.loop()
+        # send outstanding screen updates to the interface
+        self.queues.video.flush()
 
     def evaluate(self, expression):
         """Evaluate a BASIC expression."""
@@ -301,9 +311,13 @@ class Implementation(object):
 
     def close(self):
         """Close the session."""
+        if self.profiler:
+            self.profiler.stop()
         # close files if we opened any
         self.files.close_all()
         self.files.close_devices()
+        # send outstanding screen updates before the interface takes over
+        self.queues.video.flush()
 
     def _show_prompt(self):
         """Show the Ok or EDIT prompt, unless suppressed."""
@@ -334,6 +348,8 @@ class Implementation(object):
             return True
         elif c != b'':
             # it is a command, go and execute
+            # any lines stored in a batch must be in place first
+            self.program.flush_batch()
             self.interpreter.set_parse_mode(True)
             return False
 
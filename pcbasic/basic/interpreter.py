@@ -23,7 +23,7 @@ class Interpreter(object):
     """BASIC interpreter."""
 
     def __init__(self, queues, screen, files, sound,
-                values, memory, program, parser, basic_events):
+                values, memory, program, parser, basic_events, profiler=None):
         """Initialise interpreter."""
         self._queues = queues
         self._basic_events = basic_events
@@ -41,6 +41,8 @@ class Interpreter(object):
         self.current_statement = 0
         # statement syntax parser
         self.parser = parser
+        # statement profiler, if enabled
+        self._profiler = profiler
         # line number tracing
         self.tron = False
         # pointer position: False for direct line, True for program
@@ -110,7 +112,13 @@ class Interpreter(object):
                 elif c not in (b':', tk.THEN, tk.ELSE, tk.GOTO):
                     # new statement or branch of an IF statement allowed, nothing else
                     raise error.BASICError(error.STX)
-                self.parser.parse_statement(ins)
+                if self.run_mode:
+                    if self._profiler:
+                        self._profiler.start_statement(ins, self.current_statement)
+                    # decoded statements are cached for the stored program only
+                    self.parser.parse_statement(ins, self._program.statement_cache)
+                else:
+                    self.parser.parse_statement(ins)
             except error.BASICError as e:
                 self.trap_error(e)
 
@@ -135,6 +143,9 @@ class Interpreter(object):
         """Enter or exit parse mode."""
         self._parse_mode = on
         self._screen.cursor.default_visible = not on
+        # control returns to the user: write the profile so far
+        if not on and self._profiler:
+            self._profiler.stop()
 
     def _handle_break(self, e):
         """Handle a Break event."""
@@ -396,6 +407,25 @@ class Interpreter(object):
     def _find_next(self, ins, varname):
         """Helper function for FOR: find matching NEXT."""
         endforpos = ins.tell()
+        # matching NEXT positions are remembered for the stored program
+        if self.run_mode and endforpos in self._program.jump_cache:
+            nextpos, comma, name = self._program.jump_cache[endforpos]
+            ins.seek(nextpos)
+        else:
+            nextpos, comma, name = self._scan_next(ins)
+            if self.run_mode:
+                self._program.jump_cache[endforpos] = nextpos, comma, name
+        # DEFtypes may have changed since the NEXT was found, so complete the name here
+        varname2 = self._memory.complete_name(name) if name is not None else None
+        if (comma or varname2) and varname2 != varname:
+            # NEXT without FOR marked with NEXT line number, while we're only at FOR
+            raise error.BASICError(error.NEXT_WITHOUT_FOR)
+        ins.seek(endforpos)
+        return endforpos, nextpos
+
+    def _scan_next(self, ins):
+        """Find the NEXT matching a FOR; return its position, comma flag and variable name."""
+        endforpos = ins.tell()
         ins.skip_block(tk.FOR, tk.NEXT, allow_comma=True)
         if ins.skip_blank() not in (tk.NEXT, b','):
             # FOR without NEXT marked with FOR line number
@@ -405,16 +435,11 @@ class Interpreter(object):
         # check var name for NEXT
         # no-var only allowed in standalone NEXT
         if ins.skip_blank() not in tk.END_STATEMENT:
-            varname2 = self._memory.complete_name(self.parser.parse_name(ins))
+            name = self.parser.parse_name(ins)
         else:
-            varname2 = None
+            name = None
         # get position and line number just after the matching variable in NEXT
-        nextpos = ins.tell()
-        if (comma or varname2) and varname2 != varname:
-            # NEXT without FOR marked with NEXT line number, while we're only at FOR
-            raise error.BASICError(error.NEXT_WITHOUT_FOR)
-        ins.seek(endforpos)
-        return endforpos, nextpos
+        return ins.tell(), comma, name
 
     def next_(self, args):
         """Iterate a loop (NEXT)."""
@@ -466,6 +491,9 @@ class Interpreter(object):
         """Helper function for WHILE: find matching WEND."""
         # just after WHILE token
         whilepos = ins.tell()
+        # matching WEND positions are remembered for the stored program
+        if self.run_mode and whilepos in self._program.jump_cache:
+            return whilepos, self._program.jump_cache[whilepos]
         ins.skip_block(tk.WHILE, tk.WEND)
         if ins.read(1) != tk.WEND:
             # WHILE without WEND
@@ -474,6 +502,8 @@ class Interpreter(object):
         ins.skip_to(tk.END_STATEMENT)
         wendpos = ins.tell()
         ins.seek(whilepos)
+        if self.run_mode:
+            self._program.jump_cache[whilepos] = wendpos
         return whilepos, wendpos
 
     def _check_while_condition(self, ins, whilepos):
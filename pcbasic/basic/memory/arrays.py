@@ -14,6 +14,10 @@ from .. import values
 from .scalars import get_name_in_memory
 
 
+# integer array elements are packed straight into the array buffer
+_INT_STRUCT = struct.Struct('<h')
+
+
 class Arrays(object):
 
     def __init__(self, memory, values):
@@ -32,6 +36,13 @@ class Arrays(object):
         """Return an iterable over all scalar names."""
         return self._dims.iterkeys()
 
+    def __getstate__(self):
+        """Pickle."""
+        pickle_dict = self.__dict__.copy()
+        # element views would be detached from the array buffers on unpickling
+        pickle_dict['_elements'] = dict((_name, {}) for _name in self._elements)
+        return pickle_dict
+
     def __str__(self):
         """Debugging representation of variable dictionary."""
         return b'\n'.join(
@@ -44,6 +55,8 @@ class Arrays(object):
         self._dims = {}
         self._buffers = {}
         self._cache = {}
+        # element value objects, by flat index; these are views on the array buffers
+        self._elements = {}
         self._array_memory = {}
         self.current = 0
 
@@ -62,6 +75,7 @@ class Arrays(object):
             del self._dims[name]
             del self._buffers[name]
             del self._cache[name]
+            del self._elements[name]
             del self._array_memory[name]
             # update memory model
             for name in self._array_memory:
@@ -72,12 +86,13 @@ class Arrays(object):
 
     def index(self, index, dimensions):
         """Return the flat index for a given dimensioned index."""
+        base = self._base
         bigindex = 0
         area = 1
-        for i in range(len(index)):
+        for i, d in zip(index, dimensions):
             # dimensions is the *maximum index number*, regardless of self._base
-            bigindex += area * (index[i] - self._base)
-            area *= dimensions[i] + 1 - self._base
+            bigindex += area * (i - base)
+            area *= d + 1 - base
         return bigindex
 
     def array_len(self, dimensions):
@@ -157,6 +172,7 @@ class Arrays(object):
         self._buffers[name] = bytearray(array_bytes)
         self._dims[name] = dimensions
         self._cache[name] = None
+        self._elements[name] = {}
 
     def check_dim(self, name, index):
         """
@@ -203,16 +219,35 @@ class Arrays(object):
 
     def get(self, name, index):
         """Retrieve a view of the value of an array element."""
+        dimensions, lst = self.check_dim(name, index)
+        bigindex = self.index(index, dimensions)
         # do not make a copy - we may end up with stale string pointers
         # due to garbage collection
-        return self._values.create(self.view_buffer(name, index))
+        # the view is created once per element and reused on later access
+        elements = self._elements[name]
+        try:
+            return elements[bigindex]
+        except KeyError:
+            bytesize = values.size_bytes(name)
+            element = self._values.create(
+                memoryview(lst)[bigindex*bytesize:(bigindex+1)*bytesize]
+            )
+            elements[bigindex] = element
+            return element
 
     def set(self, name, index, value):
         """Assign a value to an array element."""
         if isinstance(value, values.String):
             self._memory.strings.fix_temporaries()
-        # copy value into array
-        self.view_buffer(name, index)[:] = values.to_type(name[-1], value).to_bytes()
+        dimensions, lst = self.check_dim(name, index)
+        bytesize = values.size_bytes(name)
+        offset = self.index(index, dimensions) * bytesize
+        if name[-1] == values.INT:
+            # write integers in place, without creating an intermediate value
+            _INT_STRUCT.pack_into(lst, offset, _to_int16(value))
+        else:
+            # copy value into array
+            lst[offset:offset+bytesize] = values.to_type(name[-1], value).to_bytes()
         # drop cache
         self._cache[name] = None
 
@@ -277,13 +312,18 @@ class Arrays(object):
                 return data_rep[offset]
 
     def get_strings(self):
-        """Return a list of views of string array elements."""
-        return [
-            memoryview(buf)[i:i+3]
-            for name, buf in self._buffers.iteritems()
-            if name[-1] == values.STR
-            for i in range(0, len(buf), 3)
-        ]
+        """Return a list of string array element pointers as (length, address, buffer, offset)."""
+        string_ptrs = []
+        for name, buf in self._buffers.iteritems():
+            if name[-1] == values.STR:
+                # unpack all pointers at once; skip unset elements, which have address zero
+                count = len(buf) // 3
+                pointers = struct.unpack('<' + 'BH' * count, buf)
+                string_ptrs.extend(
+                    (pointers[2*i], pointers[2*i+1], buf, 3*i)
+                    for i in xrange(count) if pointers[2*i+1]
+                )
+        return string_ptrs
 
 
     ###########################################################################
@@ -291,38 +331,90 @@ class Arrays(object):
 
     def from_list(self, python_list, name):
         """Convert Python list to BASIC array."""
-        self._from_list(python_list, name, [])
+        elements = []
+        self._flatten(python_list, [], elements)
+        if name[-1] == values.STR:
+            # strings are allocated in string space one by one
+            for index, value in elements:
+                self.set(name, index, self._values.from_value(value, values.STR))
+            return
+        if not elements:
+            return
+        if name[-1] == values.INT:
+            # integers are set in the unpacked array and packed back in one go
+            dimensions, lst = self.check_dim(name, elements[0][0])
+            count = len(lst) // 2
+            flat = list(struct.unpack_from('<%dh' % (count,), lst))
+            for index, value in elements:
+                self.check_dim(name, index)
+                if not -0x8000 <= value <= 0x7fff:
+                    raise error.BASICError(error.OVERFLOW)
+                flat[self.index(index, dimensions)] = value
+            struct.pack_into('<%dh' % (count,), lst, 0, *flat)
+            self._cache[name] = None
+            return
+        # other numbers are converted and copied straight into the array buffer
+        bytesize = values.size_bytes(name)
+        for index, value in elements:
+            dimensions, lst = self.check_dim(name, index)
+            offset = self.index(index, dimensions) * bytesize
+            lst[offset:offset+bytesize] = self._values.from_value(value, name[-1]).to_bytes()
+        self._cache[name] = None
 
-    def _from_list(self, python_list, name, index):
-        """Convert Python list to BASIC array."""
+    def _flatten(self, python_list, index, elements):
+        """Collect (index, value) pairs from nested Python list."""
         if not python_list:
             return
         if isinstance(python_list[0], list):
             for i, v in enumerate(python_list):
-                self._from_list(v, name, index+[i+(self._base or 0)])
+                self._flatten(v, index+[i+(self._base or 0)], elements)
         else:
-            for i, v in enumerate(python_list):
-                self.set(name, index+[i+(self._base or 0)], self._values.from_value(v, name[-1]))
+            elements.extend(
+                (index+[i+(self._base or 0)], v) for i, v in enumerate(python_list)
+            )
 
     def to_list(self, name):
         """Convert BASIC array to Python list."""
-        if name in self._dims:
-            indices = self._dims[name]
-            return self._to_list(name, [], indices)
-        else:
+        if name not in self._dims:
             return []
-
-    def _to_list(self, name, index, remaining_dimensions):
-        """Convert BASIC array to Python list."""
+        dimensions = self._dims[name]
+        # decode the whole array buffer at once
+        buf = self._buffers[name]
+        if name[-1] == values.INT:
+            flat = struct.unpack('<%dh' % (len(buf) // 2,), bytes(buf))
+        else:
+            bytesize = values.size_bytes(name)
+            flat = [
+                self._values.create(buf[offset:offset+bytesize]).to_value()
+                for offset in xrange(0, len(buf), bytesize)
+            ]
+        # the first index runs fastest in the array buffer
+        strides = [1]
+        for d in dimensions[:-1]:
+            strides.append(strides[-1] * (d + 1 - self._base))
+        return self._to_list(flat, 0, dimensions, strides)
+
+    def _to_list(self, flat, offset, remaining_dimensions, strides):
+        """Convert flat list of element values to nested Python list."""
         if not remaining_dimensions:
             return []
         elif len(remaining_dimensions) == 1:
-            return [
-                self.get(name, index+[i+(self._base or 0)]).to_value()
-                for i in xrange(remaining_dimensions[0])
-            ]
+            return [flat[offset + i*strides[0]] for i in xrange(remaining_dimensions[0])]
         else:
             return [
-                self._to_list(name, index+[i+(self._base or 0)], remaining_dimensions[1:])
+                self._to_list(
+                    flat, offset + i*strides[0], remaining_dimensions[1:], strides[1:]
+                )
                 for i in xrange(remaining_dimensions[0])
             ]
+
+
+def _to_int16(value):
+    """Round a numeric value to a Python int in the range of Integer."""
+    if isinstance(value, values.String):
+        raise error.BASICError(error.TYPE_MISMATCH)
+    # Integer.to_int reads the value, Float.to_int rounds it
+    int_value = value.to_int()
+    if not -0x8000 <= int_value <= 0x7fff:
+        raise error.BASICError(error.OVERFLOW)
+    return int_value
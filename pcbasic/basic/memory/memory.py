@@ -88,7 +88,9 @@ class DataSegment(object):
     # protection flag
     protection_flag_addr = 1450
 
-    def __init__(self, total_memory, reserved_memory, max_reclen, max_files, double):
+    def __init__(
+            self, total_memory, reserved_memory, max_reclen, max_files, double, fast_math=False
+        ):
         """Initialise memory."""
         # BASIC stack (determined by CLEAR)
         # Initially, the stack space should be set to 512 bytes,
@@ -112,7 +114,7 @@ class DataSegment(object):
         # string space
         self.strings = values.StringSpace(self)
         # prepare string and number handler
-        self.values = values.Values(self.strings, double)
+        self.values = values.Values(self.strings, double, fast_math)
         # scalar space
         self.scalars = scalars.Scalars(self, self.values)
         # array space
@@ -268,7 +270,12 @@ class DataSegment(object):
         if not self._allow_collect:
             return
         # find all strings that are actually referenced
-        stack_strings = [value.view() for stack in self._stack for value in stack if isinstance(value, values.String)]
+        # live references are not tracked as they are written, so every collection walks all
+        # string pointers in scalars, arrays and the stack
+        stack_strings = [
+            value.to_pointer() + (value.view(), 0)
+            for stack in self._stack for value in stack if isinstance(value, values.String)
+        ]
         string_ptrs = self.scalars.get_strings() + self.arrays.get_strings() + stack_strings
         self.strings.collect_garbage(string_ptrs)
 
@@ -141,9 +141,10 @@ class Scalars(object):
             return get_name_in_memory(the_var, offset)
 
     def get_strings(self):
-        """Return a list of views of string scalars."""
+        """Return a list of string scalar pointers as (length, address, buffer, offset)."""
         return [
-            memoryview(value) for name, value in self._vars.iteritems() if name[-1] == values.STR
+            struct.unpack('<BH', value) + (value, 0)
+            for name, value in self._vars.iteritems() if name[-1] == values.STR
         ]
 
 
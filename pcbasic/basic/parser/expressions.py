@@ -26,14 +26,25 @@ DIGITS = string.digits
 LETTERS = string.ascii_letters
 
 
+def _constant(value):
+    """Argument plan entry for a value known at compile time."""
+    return value
+
+
+class _NotCompilable(Exception):
+    """Expression can't be compiled, it will be parsed on each evaluation."""
+
+
 class ExpressionParser(object):
     """Expression parser."""
 
-    def __init__(self, values, memory):
+    def __init__(self, values, memory, program):
         """Initialise empty expression."""
         self._values = values
         # for variable retrieval
         self._memory = memory
+        # stored program, for compiled expression cache
+        self._program = program
         # user-defined functions
         self.user_functions = userfunctions.UserFunctionManager(memory, values, self)
         # initialise syntax tables
@@ -138,6 +149,19 @@ class ExpressionParser(object):
             b'_': self._gen_parse_call_extension,
         }
         self._functions = set(self._complex.keys() + self._simple.keys())
+        # argument generators that can also compile their arguments
+        # INSTR and FN are not compiled as their syntax depends on run-time values
+        self._compilable = set((
+            self._no_argument,
+            self._gen_parse_arguments,
+            self._gen_parse_arguments_optional,
+            self._gen_parse_one_optional_argument,
+            self._gen_parse_call_extension,
+            self._gen_parse_ioctl,
+            self._gen_parse_input,
+            self._gen_parse_varptr_str,
+            self._gen_parse_varptr,
+        ))
 
     def init_functions(self, session):
         """Initialise function callbacks."""
@@ -228,6 +252,7 @@ class ExpressionParser(object):
         pickle_dict['_simple'] = None
         pickle_dict['_complex'] = None
         pickle_dict['_callbacks'] = None
+        pickle_dict['_compilable'] = None
         return pickle_dict
 
     def __setstate__(self, pickle_dict):
@@ -242,6 +267,22 @@ class ExpressionParser(object):
 
     def parse(self, ins):
         """Parse and evaluate tokenised (sub-)expression."""
+        if ins is not self._program.bytecode:
+            return self._parse(ins)
+        # expressions in the stored program are compiled once, keyed by code position
+        cache = self._program.expression_cache
+        pos = ins.tell()
+        try:
+            program, end = cache[pos]
+        except KeyError:
+            program, end = cache[pos] = self._compile_at(ins, pos)
+        if program is None:
+            return self._parse(ins)
+        ins.seek(end)
+        return self._evaluate(program)
+
+    def _parse(self, ins):
+        """Parse and evaluate tokenised (sub-)expression without compiling."""
         operations = deque()
         with self._memory.get_stack() as units:
             final = True
@@ -409,64 +450,83 @@ class ExpressionParser(object):
 
     ###########################################################################
     # argument generators
+    # these yield argument values or, if compiled is set, argument evaluators
+
+    def _argument(self, ins, compiled):
+        """Parse an argument, or compile it to an evaluator."""
+        if compiled:
+            return partial(self._evaluate, self._compile(ins))
+        return self.parse(ins)
+
+    def _indices(self, ins, compiled):
+        """Parse array indices, or compile them to an evaluator."""
+        if compiled:
+            return partial(self._evaluate_indices, self._compile_indices(ins))
+        return self.parse_indices(ins)
+
+    def _literal(self, value, compiled):
+        """Argument value known at parse time."""
+        if compiled:
+            return partial(_constant, value)
+        return value
 
-    def _no_argument(self, ins):
+    def _no_argument(self, ins, compiled=False):
         """No arguments to parse."""
         return
         yield
 
-    def _gen_parse_arguments(self, ins, length=1):
+    def _gen_parse_arguments(self, ins, length=1, compiled=False):
         """Parse a comma-separated list of arguments."""
         if not length:
             return
         ins.require_read((b'(',))
         for i in range(length-1):
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
             ins.require_read((b','),)
-        yield self.parse(ins)
+        yield self._argument(ins, compiled)
         ins.require_read((b')',))
 
-    def _gen_parse_arguments_optional(self, ins, length):
+    def _gen_parse_arguments_optional(self, ins, length, compiled=False):
         """Parse a comma-separated list of arguments, last one optional."""
         ins.require_read((b'(',))
-        yield self.parse(ins)
+        yield self._argument(ins, compiled)
         for _ in range(length-2):
             ins.require_read((b','),)
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
         if ins.skip_blank_read_if((b',',),):
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
         else:
-            yield None
+            yield self._literal(None, compiled)
         ins.require_read((b')',))
 
-    def _gen_parse_one_optional_argument(self, ins):
+    def _gen_parse_one_optional_argument(self, ins, compiled=False):
         """Parse a single, optional argument."""
         if ins.skip_blank_read_if((b'(',)):
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
             ins.require_read((b')',))
         else:
-            yield None
+            yield self._literal(None, compiled)
 
-    def _gen_parse_call_extension(self, ins):
+    def _gen_parse_call_extension(self, ins, compiled=False):
         """Parse an extension function."""
-        yield ins.read_name()
+        yield self._literal(ins.read_name(), compiled)
         if ins.skip_blank_read_if((b'(',)):
             while True:
-                yield self.parse(ins)
+                yield self._argument(ins, compiled)
                 if not ins.skip_blank_read_if((b',',)):
                     break
             ins.require_read((b')',))
         else:
-            yield None
+            yield self._literal(None, compiled)
 
     ###########################################################################
     # special cases
 
-    def _gen_parse_ioctl(self, ins):
+    def _gen_parse_ioctl(self, ins, compiled=False):
         """Parse IOCTL$ syntax."""
         ins.require_read((b'(',))
         ins.skip_blank_read_if((b'#',))
-        yield self.parse(ins)
+        yield self._argument(ins, compiled)
         ins.require_read((b')',))
 
     def _gen_parse_instr(self, ins):
@@ -482,30 +542,192 @@ class ExpressionParser(object):
         yield self.parse(ins)
         ins.require_read((b')',))
 
-    def _gen_parse_input(self, ins):
+    def _gen_parse_input(self, ins, compiled=False):
         """Parse INPUT$ syntax."""
         ins.require_read((b'(',))
-        yield self.parse(ins)
+        yield self._argument(ins, compiled)
         if ins.skip_blank_read_if((b',',)):
             ins.skip_blank_read_if((b'#',))
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
         else:
-            yield None
+            yield self._literal(None, compiled)
         ins.require_read((b')',))
 
-    def _gen_parse_varptr_str(self, ins):
+    def _gen_parse_varptr_str(self, ins, compiled=False):
         """Parse VARPTR$ syntax."""
         ins.require_read((b'(',))
-        yield ins.read_name()
-        yield self.parse_indices(ins)
+        yield self._literal(ins.read_name(), compiled)
+        yield self._indices(ins, compiled)
         ins.require_read((b')',))
 
-    def _gen_parse_varptr(self, ins):
+    def _gen_parse_varptr(self, ins, compiled=False):
         """Parse VARPTR syntax."""
         ins.require_read((b'(',))
         if ins.skip_blank_read_if((b'#',)):
-            yield self.parse(ins)
+            yield self._argument(ins, compiled)
         else:
-            yield ins.read_name()
-            yield self.parse_indices(ins)
+            yield self._literal(ins.read_name(), compiled)
+            yield self._indices(ins, compiled)
         ins.require_read((b')',))
+
+    ###########################################################################
+    # expression compiler
+    # compiled expressions are postfix programs: lists of (operation, number of operands)
+    # operations without operands push a unit, i.e. a literal, variable or function value
+
+    def _compile_at(self, ins, pos):
+        """Compile expression at the code position; return program and end position."""
+        try:
+            program = self._compile(ins)
+        except (_NotCompilable, error.BASICError):
+            # evaluate by parsing, to get errors and side effects in the right order
+            ins.seek(pos)
+            return None, pos
+        return program, ins.tell()
+
+    def _evaluate(self, program):
+        """Evaluate a compiled expression."""
+        with self._memory.get_stack() as units:
+            for oper, narity in program:
+                if narity == 2:
+                    right = units.pop()
+                    units.append(oper(units.pop(), right))
+                elif narity == 1:
+                    units.append(oper(units.pop()))
+                else:
+                    units.append(oper())
+            return units[0]
+
+    def _compile(self, ins):
+        """Compile tokenised (sub-)expression to postfix program."""
+        program, operations = [], []
+        # number of units on the stack at evaluation time
+        depth = 0
+        d = b''
+        while True:
+            last = d
+            ins.skip_blank()
+            d = ins.read_keyword_token()
+            ins.seek(-len(d), 1)
+            if d == tk.NOT and not (last in op.OPERATORS or last == b''):
+                break
+            elif d in op.OPERATORS:
+                ins.read(len(d))
+                prec = op.PRECEDENCE[d]
+                if d in op.COMBINABLE:
+                    nxt = ins.skip_blank()
+                    if nxt in op.COMBINABLE:
+                        d += ins.read(len(nxt))
+                if last in op.OPERATORS or last == b'' or d == tk.NOT:
+                    nargs = 1
+                    try:
+                        oper = op.UNARY[d]
+                    except KeyError:
+                        raise _NotCompilable()
+                else:
+                    nargs = 2
+                    try:
+                        oper = op.BINARY[d]
+                    except KeyError:
+                        raise _NotCompilable()
+                    depth = self._compile_drain(prec, operations, program, depth)
+                operations.append((oper, nargs, prec))
+                continue
+            elif not (last in op.OPERATORS or last == b''):
+                break
+            elif d == b'(':
+                ins.read(len(d))
+                unit = partial(self._evaluate, self._compile(ins))
+                ins.require_read((b')',))
+            elif d and d in LETTERS:
+                name = ins.read_name()
+                error.throw_if(not name, error.STX)
+                unit = partial(self._view_variable, name, self._compile_indices(ins))
+            elif d in self._functions:
+                unit = self._compile_function(ins, d)
+            elif d in tk.END_EXPRESSION:
+                break
+            elif d == b'"':
+                address = ins.tell_address()
+                value = ins.read_string().strip(b'"')
+                unit = partial(
+                    self._values.from_str_at, value, None if address is None else address + 1
+                )
+            else:
+                unit = self._compile_number_literal(ins)
+            program.append((unit, 0))
+            depth += 1
+        depth = self._compile_drain(0, operations, program, depth)
+        if depth < 1:
+            raise _NotCompilable()
+        return program
+
+    def _compile_drain(self, precedence, operations, program, depth):
+        """Move operators of higher precedence to the program, return new stack depth."""
+        while operations:
+            if precedence > operations[-1][2]:
+                break
+            oper, narity, _ = operations.pop()
+            if depth < narity:
+                raise _NotCompilable()
+            program.append((oper, narity))
+            depth += 1 - narity
+        return depth
+
+    def _compile_number_literal(self, ins):
+        """Compile a numeric literal (no leading blanks)."""
+        d = ins.peek()
+        if d in DIGITS:
+            return partial(self._values.from_repr, ins.read_number(), allow_nonnum=False)
+        elif d in tk.NUMBER:
+            return partial(self._values.from_token, ins.read_number_token())
+        elif d == tk.T_UINT:
+            return partial(self._uint_literal, struct.unpack('<bH', ins.read(3))[1])
+        raise _NotCompilable()
+
+    def _uint_literal(self, value):
+        """Unsigned integer (line number) literal, interpreted as single."""
+        return self._values.new_single().from_int(value)
+
+    def _compile_indices(self, ins):
+        """Compile array indices."""
+        indices = []
+        if ins.skip_blank_read_if((b'[', b'(')):
+            while True:
+                indices.append(self._compile(ins))
+                if not ins.skip_blank_read_if((b',',)):
+                    break
+            ins.require_read((b']', b')'))
+        return indices
+
+    def _evaluate_indices(self, indices):
+        """Evaluate compiled array indices."""
+        return [values.to_int(self._evaluate(index)) for index in indices]
+
+    def _view_variable(self, name, indices):
+        """Retrieve variable with compiled indices."""
+        return self._memory.view_or_create_variable(name, self._evaluate_indices(indices))
+
+    def _compile_function(self, ins, token):
+        """Compile a function starting with the given token."""
+        ins.read(len(token))
+        if token in self._simple:
+            parse_args = self._simple[token]
+        else:
+            fndict = self._complex[token]
+            presign = ins.skip_blank_read_if(fndict)
+            if presign:
+                token += presign
+            try:
+                parse_args = fndict[presign]
+            except KeyError:
+                raise _NotCompilable()
+        func = parse_args.func if isinstance(parse_args, partial) else parse_args
+        if func not in self._compilable:
+            raise _NotCompilable()
+        plan = list(parse_args(ins, compiled=True))
+        return partial(self._call_function, self._callbacks[token], plan)
+
+    def _call_function(self, fn, plan):
+        """Call a function with compiled arguments."""
+        return fn(arg() for arg in plan)
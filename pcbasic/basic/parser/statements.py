@@ -26,12 +26,12 @@ LETTERS = string.ascii_letters
 class Parser(object):
     """BASIC statement parser."""
 
-    def __init__(self, values, memory, syntax):
+    def __init__(self, values, memory, program, syntax):
         """Initialise statement context."""
         # re-execute current statement after Break
         self.redo_on_break = False
         # expression parser
-        self.expression_parser = expressions.ExpressionParser(values, memory)
+        self.expression_parser = expressions.ExpressionParser(values, memory, program)
         self.user_functions = self.expression_parser.user_functions
         # syntax: advanced, pcjr, tandy
         self._syntax = syntax
@@ -57,8 +57,27 @@ class Parser(object):
         self.init_statements(session)
         self.expression_parser.init_functions(session)
 
-    def parse_statement(self, ins):
-        """Parse and execute a single statement."""
+    def parse_statement(self, ins, cache=None):
+        """Parse and execute a single statement, optionally using a cache of decoded statements."""
+        if cache is None:
+            callback, parse_args = self._read_statement(ins)
+        else:
+            # the cache is keyed by code position and holds the callback, argument parser
+            # and code position after the keyword
+            pos = ins.tell()
+            statement = cache.get(pos)
+            if statement is None:
+                callback, parse_args = self._read_statement(ins)
+                cache[pos] = callback, parse_args, ins.tell()
+            else:
+                callback, parse_args, after_keyword = statement
+                ins.seek(after_keyword)
+        if callback is not None:
+            callback(parse_args(ins))
+        # end-of-statement is checked at start of next statement in interpreter loop
+
+    def _read_statement(self, ins):
+        """Read the statement keyword and return the callback and argument parser."""
         # read keyword token or one byte
         ins.skip_blank()
         c = ins.read_keyword_token()
@@ -81,10 +100,10 @@ class Parser(object):
                 c = tk.LET
                 parse_args = self._simple[tk.LET]
             else:
+                # empty statement
                 ins.require_end()
-                return
-        self._callbacks[c](parse_args(ins))
-        # end-of-statement is checked at start of next statement in interpreter loop
+                return None, None
+        return self._callbacks[c], parse_args
 
     def parse_name(self, ins):
         """Get scalar part of variable name from token stream."""
@@ -0,0 +1,269 @@
+"""
+PC-BASIC - pool.py
+Pool of ready-made sessions for running many short programs
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import io
+import time
+import threading
+import Queue
+import multiprocessing
+
+from .base import error
+from .base import signals
+from . import api
+
+
+# job outcomes
+OK = u'ok'
+TIMEOUT = u'timeout'
+OUTPUT_LIMIT = u'output limit'
+FAILED = u'failed'
+
+
+class JobResult(object):
+    """Outcome of a job run in a session pool."""
+
+    def __init__(self, output, status, seconds, message=u''):
+        """Record the job outcome."""
+        # screen output of the job, in the session codepage
+        self.output = output
+        # OK, TIMEOUT, OUTPUT_LIMIT or FAILED
+        self.status = status
+        # wall-clock run time of the job
+        self.seconds = seconds
+        # description of the exception if the job failed
+        self.message = message
+
+    def __repr__(self):
+        """Show the job outcome."""
+        return u'JobResult(status=%s, seconds=%.3f, output=%d bytes)' % (
+            self.status, self.seconds, len(self.output)
+        )
+
+
+class SessionPool(object):
+    """Pool of sessions, reset to a pristine snapshot between jobs."""
+
+    def __init__(
+            self, size=4, processes=False, timeout=None, max_output=None, **session_params
+        ):
+        """\
+            Build the pool.
+            size: number of sessions, each running one job at a time
+            processes: if True, run the sessions in worker processes
+            timeout: default maximum run time of a job, in seconds
+            max_output: default maximum number of output bytes of a job
+            Other keyword arguments are passed on to each Session.
+        """
+        self._size = size
+        self._timeout = timeout
+        self._max_output = max_output
+        # pooled sessions take their input and output from the jobs
+        session_params.update(input_streams=None, output_streams=None)
+        # initialise one session and keep a pickled copy to clone and restore from
+        pristine = _PooledSession(**session_params)
+        pristine.start()
+        self._snapshot = pickle.dumps(pristine, 2)
+        pristine.close()
+        if processes:
+            self._pool = multiprocessing.Pool(size, _init_worker, (self._snapshot,))
+            self._idle = None
+        else:
+            self._pool = None
+            self._idle = Queue.Queue()
+            for _ in range(size):
+                self._idle.put(_restore(self._snapshot))
+        # usage statistics
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(size)
+        self._start_time = time.time()
+        self._busy = 0
+        self._counts = {OK: 0, TIMEOUT: 0, OUTPUT_LIMIT: 0, FAILED: 0}
+        self._run_seconds = 0.
+        self._wait_seconds = 0.
+
+    def __enter__(self):
+        """Context guard."""
+        return self
+
+    def __exit__(self, ex_type, ex_val, tb):
+        """Context guard."""
+        self.close()
+
+    def run(self, program=b'', commands=None, input=u'', timeout=None, max_output=None):
+        """\
+            Run a job on a free session and return a JobResult; blocks until a session is free.
+            program: program text to store; it is run if no commands are given
+            commands: direct-mode statements to execute
+            input: text to feed to INPUT, LINE INPUT and INKEY$
+            timeout, max_output: override the pool's per-job limits
+        """
+        if commands is None:
+            commands = (b'RUN',) if program else ()
+        job = (
+            program, tuple(commands), input,
+            self._timeout if timeout is None else timeout,
+            self._max_output if max_output is None else max_output
+        )
+        wait_start = time.time()
+        self._slots.acquire()
+        try:
+            with self._lock:
+                self._wait_seconds += time.time() - wait_start
+                self._busy += 1
+            if self._pool:
+                result = self._pool.apply(_run_in_worker, job)
+            else:
+                session = self._idle.get()
+                try:
+                    result = session.run_job(*job)
+                finally:
+                    # discard the used session and put a pristine copy in its place
+                    session.close()
+                    self._idle.put(_restore(self._snapshot))
+            with self._lock:
+                self._counts[result.status] += 1
+                self._run_seconds += result.seconds
+            return result
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._slots.release()
+
+    def metrics(self):
+        """Report pool utilisation."""
+        with self._lock:
+            jobs = sum(self._counts.itervalues())
+            uptime = time.time() - self._start_time
+            return {
+                'size': self._size,
+                'busy': self._busy,
+                'idle': self._size - self._busy,
+                'jobs': jobs,
+                'ok': self._counts[OK],
+                'timeouts': self._counts[TIMEOUT],
+                'output_limited': self._counts[OUTPUT_LIMIT],
+                'failed': self._counts[FAILED],
+                'mean_run_seconds': self._run_seconds / jobs if jobs else 0.,
+                'mean_wait_seconds': self._wait_seconds / jobs if jobs else 0.,
+                # fraction of session time spent running jobs since the pool started
+                'utilisation': self._run_seconds / (self._size * uptime) if uptime else 0.,
+            }
+
+    def close(self):
+        """Close the pool and its sessions."""
+        if self._pool:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        elif self._idle:
+            while not self._idle.empty():
+                self._idle.get().close()
+            self._idle = None
+
+
+class _PooledSession(api.Session):
+    """Session that runs jobs under limits."""
+
+    def run_job(self, program, commands, input, timeout, max_output):
+        """Run a job; return a JobResult."""
+        self.start()
+        self._stop_reason = None
+        output = _JobOutput(max_output, self._stop)
+        self._impl.io_streams.toggle_echo(output)
+        # feed the input as a redirected stream that closes when exhausted
+        # so that the job stops rather than wait for input that never comes
+        if isinstance(input, bytes):
+            input = self._impl.codepage.str_to_unicode(input)
+        if input:
+            self._impl.queues.inputs.put(signals.Event(signals.STREAM_CHAR, (input,)))
+        self._impl.queues.inputs.put(signals.Event(signals.STREAM_CLOSED))
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._stop, (TIMEOUT,))
+            timer.daemon = True
+            timer.start()
+        start = time.time()
+        message = u''
+        try:
+            if program:
+                self.execute(program)
+            for cmd in commands:
+                self.execute(cmd)
+        except error.Exit:
+            # SYSTEM, end of input or stopped by a limit
+            pass
+        except Exception as e:
+            self._stop_reason = self._stop_reason or FAILED
+            message = u'%s: %s' % (type(e).__name__, e)
+        finally:
+            if timer:
+                timer.cancel()
+        return JobResult(
+            output.getvalue(), self._stop_reason or OK, time.time() - start, message
+        )
+
+    def _stop(self, reason=OUTPUT_LIMIT):
+        """Stop the running job."""
+        if not self._stop_reason:
+            self._stop_reason = reason
+            self._impl.queues.inputs.put(signals.Event(signals.KEYB_QUIT))
+
+
+class _JobOutput(object):
+    """Output buffer with a size limit."""
+
+    def __init__(self, max_output, on_overflow):
+        """Initialise the buffer."""
+        self._buffer = io.BytesIO()
+        self._max_output = max_output
+        self._on_overflow = on_overflow
+
+    def write(self, s):
+        """Write to the buffer, up to the limit."""
+        if self._max_output is not None and self._buffer.tell() + len(s) > self._max_output:
+            self._buffer.write(s[:max(0, self._max_output - self._buffer.tell())])
+            self._on_overflow()
+        else:
+            self._buffer.write(s)
+
+    def getvalue(self):
+        """Retrieve the output."""
+        return self._buffer.getvalue()
+
+
+def _restore(snapshot):
+    """Create a session from a pickled pristine session."""
+    return pickle.loads(snapshot).attach()
+
+
+###############################################################################
+# worker processes
+
+# snapshot and session of the current worker process
+_worker_snapshot = None
+_worker_session = None
+
+def _init_worker(snapshot):
+    """Build the session of a worker process."""
+    global _worker_snapshot, _worker_session
+    _worker_snapshot = snapshot
+    _worker_session = _restore(snapshot)
+
+def _run_in_worker(*job):
+    """Run a job in a worker process and reset its session."""
+    global _worker_session
+    try:
+        return _worker_session.run_job(*job)
+    finally:
+        _worker_session.close()
+        _worker_session = _restore(_worker_snapshot)
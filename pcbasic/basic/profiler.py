@@ -0,0 +1,109 @@
+"""
+PC-BASIC - profiler.py
+Statement-level profiler for BASIC programs
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import time
+import string
+import logging
+
+from .base import tokens as tk
+from ..metadata import VERSION
+
+
+LETTERS = string.ascii_letters
+
+
+class Profiler(object):
+    """Count and time the statements executed by a program."""
+
+    def __init__(self, program, token_keyword, path):
+        """Initialise the profiler."""
+        self._program = program
+        self._to_keyword = token_keyword.to_keyword
+        # report file; callgrind format if the file name starts with 'callgrind'
+        self._path = path
+        self._callgrind = os.path.basename(path).lower().startswith('callgrind')
+        # (line number, keyword) -> [count, seconds]
+        self._stats = {}
+        # statement being timed and its start time
+        self._current = None
+        self._start = 0.
+
+    def start_statement(self, ins, pos):
+        """Start timing the statement at the given position; stop timing the previous one."""
+        now = time.time()
+        if self._current:
+            self._stats[self._current][1] += now - self._start
+        # identify the statement by its keyword token, without moving the stream pointer
+        ins.skip_blank()
+        token = ins.read_keyword_token()
+        ins.seek(-len(token), 1)
+        if token in self._to_keyword:
+            keyword = self._to_keyword[token]
+        elif token and token in LETTERS:
+            keyword = tk.KW_LET
+        else:
+            keyword = b''
+        self._current = self._program.get_line_number(pos), keyword
+        try:
+            self._stats[self._current][0] += 1
+        except KeyError:
+            self._stats[self._current] = [1, 0.]
+        self._start = time.time()
+
+    def stop(self):
+        """Stop timing and write the report."""
+        if not self._current:
+            return
+        self._stats[self._current][1] += time.time() - self._start
+        self._current = None
+        try:
+            with open(self._path, 'wb') as f:
+                if self._callgrind:
+                    self._write_callgrind(f)
+                else:
+                    self._write_report(f)
+        except EnvironmentError as e:
+            logging.warning('Could not write profile to %s: %s', self._path, e)
+
+    def _totals(self, field):
+        """Sum counts and times by line number (field 0) or keyword (field 1)."""
+        totals = {}
+        for key, (count, seconds) in self._stats.iteritems():
+            total = totals.setdefault(key[field], [0, 0.])
+            total[0] += count
+            total[1] += seconds
+        # most time-consuming first
+        return sorted(totals.iteritems(), key=lambda _item: -_item[1][1])
+
+    def _write_report(self, f):
+        """Write a text report sorted by time spent."""
+        grand_total = sum(_seconds for _, _seconds in self._stats.itervalues()) or 1.
+        for title, field in ((b'line', 0), (b'keyword', 1)):
+            f.write(b'%-10s %10s %12s %12s %7s\n' % (
+                title, b'count', b'seconds', b'us/call', b'%'
+            ))
+            for key, (count, seconds) in self._totals(field):
+                f.write(b'%-10s %10d %12.6f %12.1f %7.2f\n' % (
+                    key, count, seconds, 1e6 * seconds / count, 100. * seconds / grand_total
+                ))
+            f.write(b'\n')
+
+    def _write_callgrind(self, f):
+        """Write a callgrind-compatible profile; keywords are functions, costs are per line."""
+        f.write(b'# callgrind format\n')
+        f.write(b'version: 1\n')
+        f.write(b'creator: PC-BASIC %s\n' % (VERSION,))
+        f.write(b'positions: line\n')
+        f.write(b'events: Microseconds Count\n')
+        f.write(b'fl=BASIC program\n')
+        for keyword, _ in self._totals(1):
+            f.write(b'fn=%s\n' % (keyword or b'(empty)',))
+            for (line, kw), (count, seconds) in sorted(self._stats.iteritems()):
+                if kw == keyword:
+                    f.write(b'%d %d %d\n' % (max(0, line), int(1e6 * seconds), count))
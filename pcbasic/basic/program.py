@@ -10,6 +10,8 @@ import binascii
 import logging
 import struct
 import io
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 
 from .base import error
 from .base import tokens as tk
@@ -30,6 +32,14 @@ class Program(object):
         self._memory = memory
         # program bytecode buffer
         self.bytecode = bytecode
+        # decoded statements, compiled expressions and matching NEXT and WEND positions,
+        # keyed by code position; cleared whenever the code changes
+        self.statement_cache = {}
+        self.expression_cache = {}
+        self.jump_cache = {}
+        # lines stored but not yet written to bytecode while batching edits
+        self._batching = False
+        self._pending = None
         self.erase()
         self.max_list_line = hide_listing if hide_listing else 65535
         self.allow_protect = allow_protect
@@ -41,6 +51,15 @@ class Program(object):
         self.tokeniser = tokeniser
         self.lister = lister
 
+    def __getstate__(self):
+        """Pickle."""
+        pickle_dict = self.__dict__.copy()
+        # decoded statements and expressions hold callbacks, which can't be pickled
+        pickle_dict['statement_cache'] = {}
+        pickle_dict['expression_cache'] = {}
+        pickle_dict['jump_cache'] = {}
+        return pickle_dict
+
     def __str__(self):
         """Return a marked-up hex dump of the program (for debugging)."""
         code = self.bytecode.getvalue()
@@ -74,13 +93,22 @@ class Program(object):
 
     def erase(self):
         """Erase the program from memory."""
+        self._clear_caches()
+        self._pending = None
         self.bytecode.seek(0)
         self.bytecode.write(b'\0\0\0')
         self.protected = False
         self.line_numbers = {65536: 0}
+        self._index_lines()
         self.last_stored = None
         self.code_size = self.bytecode.tell()
 
+    def _clear_caches(self):
+        """Forget decoded code after the program has changed."""
+        self.statement_cache.clear()
+        self.expression_cache.clear()
+        self.jump_cache.clear()
+
     def truncate(self, rest=b''):
         """Write bytecode and cut the program of beyond the current position."""
         self.bytecode.write(rest if rest else b'\0\0\0')
@@ -94,15 +122,21 @@ class Program(object):
 
     def get_line_number(self, pos):
         """Get line number for stream position."""
-        pre = -1
-        for linum in self.line_numbers:
-            linum_pos = self.line_numbers[linum]
-            if linum_pos <= pos and linum > pre:
-                pre = linum
-        return pre
+        index = bisect_right(self._line_offsets, pos)
+        if not index:
+            return -1
+        return self._line_order[index-1]
+
+    def _index_lines(self):
+        """Build the position-ordered index of the line number dictionary."""
+        # offsets of line starts in ascending order, and the line numbers found there
+        self._line_offsets = sorted(self.line_numbers.itervalues())
+        position_to_line = dict((pos, num) for num, pos in self.line_numbers.iteritems())
+        self._line_order = [position_to_line[pos] for pos in self._line_offsets]
 
     def rebuild_line_dict(self):
         """Preparse to build line number dictionary."""
+        self._clear_caches()
         self.line_numbers, offsets = {}, []
         self.bytecode.seek(0)
         scanline, scanpos, last = 0, 0, 0
@@ -121,6 +155,7 @@ class Program(object):
             scanpos = self.bytecode.tell()
             offsets.append(scanpos)
         self.line_numbers[65536] = scanpos
+        self._index_lines()
         # rebuild offsets
         if self._rebuild_offsets:
             self.bytecode.seek(0)
@@ -154,6 +189,11 @@ class Program(object):
             del self.line_numbers[key]
         for key in beyond:
             self.line_numbers[key] += length
+        # update the index: drop the replaced lines and shift the ones after them
+        start = bisect_left(self._line_offsets, pos)
+        after = bisect_left(self._line_offsets, afterpos)
+        self._line_offsets[start:] = [_pos + length for _pos in self._line_offsets[after:]]
+        self._line_order[start:] = self._line_order[after:]
 
     def check_number_start(self, linebuf):
         """Check if the given line buffer starts with a line number."""
@@ -168,10 +208,61 @@ class Program(object):
             raise error.BASICError(error.STX)
         return empty, scanline
 
+    @contextmanager
+    def store_batch(self):
+        """Collect lines stored in this block and write them to the bytecode at the end."""
+        outer = self._batching
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = outer
+            self.flush_batch()
+
+    def flush_batch(self):
+        """Write lines collected in a batch to the bytecode."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, None
+        self._clear_caches()
+        code, self.line_numbers = batch.build(self.code_start)
+        self.bytecode.seek(0)
+        self.bytecode.write(code)
+        self.bytecode.truncate()
+        self.code_size = self.bytecode.tell()
+        self._index_lines()
+
+    def _store_batched(self, linebuf):
+        """Store the given line buffer in the current batch."""
+        if self._pending is None:
+            self._pending = _LineBatch.from_program(self)
+            if self._pending is None:
+                # lines are not in memory order; edit the bytecode directly
+                self._batching = False
+                return self.store_line(linebuf)
+        linebuf.seek(1)
+        scanline = self.lister.detokenise_line_number(linebuf)
+        if linebuf.skip_blank_read() in tk.END_LINE:
+            if scanline not in self._pending.lines:
+                raise error.BASICError(error.UNDEFINED_LINE_NUMBER)
+            self._pending.delete(scanline)
+        else:
+            line = linebuf.getvalue()
+            # check for free memory; unlike store_line, this counts the lines after the new one
+            if (self.code_start + 1 + self._pending.size_with(scanline, len(line))
+                    > self._memory.stack_start()):
+                raise error.BASICError(error.OUT_OF_MEMORY)
+            # keep line number and tokens, but not \x00\xC0\xDE
+            self._pending.store(scanline, line[3:])
+        self.last_stored = scanline
+
     def store_line(self, linebuf):
         """Store the given line buffer."""
         if self.protected:
             raise error.BASICError(error.IFC)
+        if self._batching:
+            return self._store_batched(linebuf)
+        self._clear_caches()
         # get the new line number
         linebuf.seek(1)
         scanline = self.lister.detokenise_line_number(linebuf)
@@ -204,6 +295,9 @@ class Program(object):
         self.update_line_dict(pos, afterpos, length, deleteable, beyond)
         if not empty:
             self.line_numbers[scanline] = pos
+            index = bisect_left(self._line_offsets, pos)
+            self._line_offsets.insert(index, pos)
+            self._line_order.insert(index, scanline)
         self.last_stored = scanline
 
     def find_pos_line_dict(self, fromline, toline):
@@ -228,6 +322,7 @@ class Program(object):
         if not deleteable:
             # no lines selected
             raise error.BASICError(error.IFC)
+        self._clear_caches()
         # do the delete
         self.bytecode.seek(afterpos)
         rest = self.bytecode.read()
@@ -285,6 +380,7 @@ class Program(object):
             old_to_new[old_line] = new_line
             self.last_stored = new_line
             new_line += step
+        self._clear_caches()
         # write the new numbers
         for old_line in old_to_new:
             self.bytecode.seek(self.line_numbers[old_line])
@@ -323,6 +419,7 @@ class Program(object):
             new_lines[old_to_new[old_line]] = self.line_numbers[old_line]
             del self.line_numbers[old_line]
         self.line_numbers.update(new_lines)
+        self._index_lines()
         return old_to_new
 
     def load(self, g):
@@ -354,15 +451,12 @@ class Program(object):
 
     def merge(self, g):
         """Merge program from ascii or utf8 (if utf8_files is True) stream."""
-        while True:
-            line, cr = g.read_line()
-            if not line and not cr:
-                # end of file
-                break
-            elif cr is None:
-                # line > 255 chars
-                raise error.BASICError(error.LINE_BUFFER_OVERFLOW)
-            linebuf = self.tokeniser.tokenise_line(line)
+        with self.store_batch():
+            self._merge_lines(g)
+
+    def _merge_lines(self, g):
+        """Store the lines in an ascii or utf8 stream."""
+        for linebuf in self.tokeniser.tokenise_file(g):
             if linebuf.read(1) == b'\0':
                 # line starts with a number, add to program memory; store_line seeks to 1 first
                 self.store_line(linebuf)
@@ -451,3 +545,66 @@ class Program(object):
             self.rebuild_line_dict()
             # restore program pointer
             self.bytecode.seek(loc)
+
+
+class _LineBatch(object):
+    """Program lines held apart from the bytecode, for fast bulk editing."""
+
+    def __init__(self, lines, tail):
+        """Initialise from a dict of line number to line record and the program tail."""
+        # line number and tokens for each line, without the \x00 and next-line offset
+        self.lines = lines
+        self._order = sorted(lines)
+        self._size = sum(len(_line) + 3 for _line in lines.itervalues())
+        # end-of-program marker and anything beyond
+        self._tail = tail
+
+    @classmethod
+    def from_program(cls, program):
+        """Split the stored program into lines; None if they are not in memory order."""
+        order = program._line_order[:-1]
+        if program._line_order[-1] != 65536 or order != sorted(order):
+            return None
+        code = program.bytecode.getvalue()
+        offsets = program._line_offsets
+        lines = dict(
+            (_num, code[offsets[_i]+3:offsets[_i+1]]) for _i, _num in enumerate(order)
+        )
+        return cls(lines, code[offsets[-1]:])
+
+    def size_with(self, line_number, length):
+        """Size of the program lines if a line record of given length were stored."""
+        if line_number in self.lines:
+            return self._size - len(self.lines[line_number]) - 3 + length
+        return self._size + length
+
+    def store(self, line_number, line):
+        """Add or replace a line."""
+        if line_number in self.lines:
+            self._size -= len(self.lines[line_number])
+        else:
+            self._size += 3
+            if self._order and line_number > self._order[-1]:
+                self._order.append(line_number)
+            else:
+                self._order.insert(bisect_left(self._order, line_number), line_number)
+        self.lines[line_number] = line
+        self._size += len(line)
+
+    def delete(self, line_number):
+        """Remove a line."""
+        self._size -= len(self.lines.pop(line_number)) + 3
+        del self._order[bisect_left(self._order, line_number)]
+
+    def build(self, code_start):
+        """Get the program bytecode and line number dictionary."""
+        output, line_numbers = [], {}
+        pos = 0
+        for num in self._order:
+            line = self.lines[num]
+            line_numbers[num] = pos
+            pos += len(line) + 3
+            output.append(struct.pack('<BH', 0, code_start + 1 + pos) + line)
+        line_numbers[65536] = pos
+        output.append(self._tail)
+        return b''.join(output), line_numbers
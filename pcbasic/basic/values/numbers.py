@@ -72,13 +72,15 @@ class Value(object):
 
     def __getstate__(self):
         # can't pickle memoryview
-        self._buffer = bytearray(self._buffer)
-        return self.__dict__
+        # don't detach the live value from its buffer, we may be pickled while running
+        pickle_dict = self.__dict__.copy()
+        pickle_dict['_buffer'] = bytes(self._buffer)
+        return pickle_dict
 
     def __setstate__(self, pickle_dict):
         # can't pickle memoryview
         self.__dict__ = pickle_dict
-        self._buffer = memoryview(self._buffer)
+        self._buffer = memoryview(bytearray(self._buffer))
 
     def to_value(self):
         """Convert to Python value."""
@@ -579,15 +581,22 @@ class Float(Number):
 
     def iadd(self, right):
         """Add in-place."""
+        if self._values.fast_math:
+            return self._pack(*self._add_den(self._unpack(), right._unpack()))
         return self._normalise(*self._add_den(self._denormalise(), right._denormalise()))
 
     def isub(self, right):
         """Subtract in-place."""
+        if self._values.fast_math:
+            rexp, rman, rneg = right._unpack()
+            return self._pack(*self._add_den(self._unpack(), (rexp, rman, not rneg)))
         rexp, rman, rneg = right._denormalise()
         return self._normalise(*self._add_den(self._denormalise(), (rexp, rman, not rneg)))
 
     def imul(self, right_in):
         """Multiply in-place."""
+        if self._values.fast_math:
+            return self._imul_unpacked(right_in)
         if self.is_zero() or right_in.is_zero():
             # set any zeroes to standard zero
             self._buffer[:] = b'\0' * self.size
@@ -616,6 +625,8 @@ class Float(Number):
             raise ZeroDivisionError(self)
         if self.is_zero():
             return self
+        if self._values.fast_math and self._fast_div:
+            return self._pack(*self._div_den(self._unpack(), right_in._unpack()))
         lexp, lman, lneg = self._div_den(self._denormalise(), right_in._denormalise())
         # normalise and return
         return self._normalise(lexp, lman, lneg)
@@ -1041,6 +1052,101 @@ class Float(Number):
         return lexp, lman, lneg
 
 
+    ##########################################################################
+    # implementation: unpacked fast path
+    # these produce the same bytes as _denormalise, _normalise and _bring_to_range
+    # but read and write the buffer in a single struct call
+    # and replace bit-by-bit shifting loops with shifts computed from bit lengths
+
+    _expshift = None
+    # whether division gains from the fast path; the long division loop dominates for doubles
+    _fast_div = True
+
+    def _unpack(self):
+        """Denormalise to shifted mantissa, exp, sign."""
+        word, = struct.unpack_from(self._intformat, self._buffer)
+        # the exponent must be an int; arithmetic on a double's long word is slower
+        return (
+            int(word >> self._expshift),
+            ((word & self._mask) << 8) | self._den_mask,
+            (word & self._signmask) != 0
+        )
+
+    def _pack(self, exp, man, neg):
+        """Normalise from shifted mantissa, exp, sign."""
+        # zero denormalised mantissa -> make zero
+        if man == 0 or exp <= 0:
+            self._buffer[:] = b'\0' * self.size
+            return self
+        # shift left if subnormal
+        if man < self._den_mask - 1:
+            shift = self._expshift + 7 - man.bit_length()
+            if shift > 0:
+                man <<= shift
+                exp -= shift
+            if man < self._den_mask - 1:
+                exp -= 1
+                man <<= 1
+        # round to nearest; halves to even (Gaussian rounding)
+        if (man & 0xff > 0x80) or (man & 0x1ff == 0x180):
+            man = (man & self._carrymask) + 0x100
+        else:
+            man &= self._carrymask
+        if man >= self._den_upper:
+            exp += 1
+            man >>= 1
+        if exp > 255:
+            self._buffer[:] = self.neg_max if neg else self.pos_max
+            raise OverflowError(self)
+        elif exp < 0:
+            # set to zero, but leave mantissa as is
+            exp = 0
+        struct.pack_into(
+            self._intformat, self._buffer, 0,
+            (exp << self._expshift) | ((man >> 8) & (self._mask if neg else self._posmask))
+        )
+        return self
+
+    def _shift_to_range(self, man, exp, lower, upper):
+        """Bring positive mantissa to range (lower, upper]."""
+        if man <= lower:
+            shift = lower.bit_length() - man.bit_length()
+            man <<= shift
+            exp -= shift
+            if man <= lower:
+                exp -= 1
+                man <<= 1
+        if man > upper:
+            shift = man.bit_length() - upper.bit_length()
+            man >>= shift
+            exp += shift
+            if man > upper:
+                exp += 1
+                man >>= 1
+        return man, exp
+
+    def _imul_unpacked(self, right_in):
+        """Multiply in-place."""
+        if self._buffer[-1] == b'\0' or right_in._buffer[-1] == b'\0':
+            # set any zeroes to standard zero
+            self._buffer[:] = b'\0' * self.size
+            return self
+        lexp, lman, lneg = self._unpack()
+        rexp, rman, rneg = right_in._unpack()
+        lexp += rexp - right_in._bias - 8
+        if lexp < -31:
+            self._buffer[:] = b'\0' * self.size
+            return self
+        # drop some precision
+        lman, lexp = self._shift_to_range(
+            lman * rman, lexp, self._den_mask>>4, self._den_upper>>4
+        )
+        # rounding quirk
+        if lman & 0xf == 0x9:
+            lman &= (self._carrymask + 0xfe)
+        return self._pack(lexp, lman, lneg != rneg)
+
+
 ##############################################################################
 # single-precision floating-point number
 
@@ -1057,6 +1163,7 @@ class Single(Float):
     neg_max = b'\xff\xff\xff\xff'
 
     _intformat = '<L'
+    _expshift = 24
 
     _bias = 128 + 24
     _shift = _bias - 129
@@ -1114,6 +1221,8 @@ class Double(Float):
     neg_max = b'\xff\xff\xff\xff\xff\xff\xff\xff'
 
     _intformat = '<Q'
+    _expshift = 56
+    _fast_div = False
 
     _bias = 128 + 56
     _shift = _bias - 129
@@ -245,38 +245,53 @@ class StringSpace(object):
 
     def collect_garbage(self, string_ptrs):
         """Re-store the strings referenced in string_ptrs, delete the rest."""
-        # string_ptrs should be a list of memoryviews to the original pointers
-        # retrieve addresses and copy strings
-        string_list = []
+        # string_ptrs should be a sequence of (length, address, buffer, offset) tuples
+        # where buffer[offset:offset+3] holds the original pointer
+        var_start = self._memory.var_start()
+        stack_start = self._memory.stack_start()
+        # exclude empty elements of string arrays (len==0 and addr==0)
+        # exclude strings is not located in memory (FIELD or code strings)
+        string_list = [
+            (_length, _addr, _buf, _offset, self._retrieve(_length, _addr))
+            for _length, _addr, _buf, _offset in string_ptrs if _addr >= var_start
+        ]
         # find last non-temporary string
-        last_permanent = self._memory.stack_start()
-        last_perm_view = None
-        for view in string_ptrs:
-            length, addr = struct.unpack('<BH', view.tobytes())
-            # exclude empty elements of string arrays (len==0 and addr==0)
-            # exclude strings is not located in memory (FIELD or code strings)
-            if addr >= self._memory.var_start():
-                string_list.append((view, addr, self._retrieve(length, addr)))
+        last_permanent, last_perm_ptr = stack_start, None
+        if self._temp is not None:
+            for ptr in string_list:
+                length, addr = ptr[:2]
                 # set sentinel string (lowest-address permanent string)
                 # don't use zero-length strings as sentinel:
                 # they share an address with allocated strings and may get swapped on sorting
                 # in which case the allocated permanent string ends up below the sentinel
-                if self._temp is not None and length > 0:
-                    if addr > self._temp and addr < last_permanent:
-                        last_permanent, last_perm_view = addr, view
+                if length > 0 and addr > self._temp and addr < last_permanent:
+                    last_permanent, last_perm_ptr = addr, ptr
         # sort by address, largest first (maintain order of storage)
         string_list.sort(key=itemgetter(1), reverse=True)
-        # clear the string buffer and re-store all referenced strings
-        self.clear()
-        for view, _, string in string_list:
-            # re-allocate string space
-            # update the original pointers supplied (these are memoryviews)
-            view[:] = struct.pack('<BH', *self.store(string, check_free=False))
+        # compact string space from the top down
+        # strings that are already in place keep their buffer and their pointers are left alone
+        self._strings = {}
+        kept = set()
+        current = stack_start
+        for length, addr, buf, offset, string in string_list:
+            current -= length
+            new_addr = current + 1
+            if length > 0:
+                if addr in kept:
+                    # doubly referenced string gets a copy of its own
+                    string = bytearray(string)
+                kept.add(addr)
+                self._strings[new_addr] = string
+            if new_addr != addr:
+                # update the original pointer
+                struct.pack_into('<BH', buf, offset, length, new_addr)
+        self.current = current
         # readdress  start of temporary strings
-        if last_perm_view is None:
+        if last_perm_ptr is None:
             self._temp = None
-        elif self._temp is not None and self._temp != self._memory.stack_start():
-            self._temp = -1 + struct.unpack_from('<H', last_perm_view.tobytes(), 1)[0]
+        elif self._temp != stack_start:
+            _, _, buf, offset, _ = last_perm_ptr
+            self._temp = -1 + struct.unpack_from('<H', buf, offset + 1)[0]
 
     def get_memory(self, address):
         """Retrieve data from data memory: string space """
@@ -190,11 +190,13 @@ class FloatErrorHandler(object):
 class Values(object):
     """Handles BASIC strings and numbers."""
 
-    def __init__(self, string_space, double_math):
+    def __init__(self, string_space, double_math, fast_math=False):
         """Setup values."""
         self.stringspace = string_space
         # double-precision EXP, SIN, COS, TAN, ATN, LOG
         self.double_math = double_math
+        # unpacked fast path for floating-point arithmetic
+        self.fast_math = fast_math
 
     def set_handler(self, handler):
         """Initialise the error message screen."""
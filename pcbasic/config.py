@@ -42,6 +42,9 @@ STATE_PATH = os.path.join(USER_DATA_HOME, BASENAME)
 # @: target drive for bundled programs
 PROGRAM_PATH = os.path.join(STATE_PATH, u'bundled_programs')
 
+# binary cache of the fonts used with each codepage
+FONT_CACHE_PATH = os.path.join(STATE_PATH, u'font_cache')
+
 # format for log files
 LOGGING_FORMAT = u'[%(asctime)s.%(msecs)04d] %(levelname)s: %(message)s'
 LOGGING_FORMATTER = logging.Formatter(fmt=LOGGING_FORMAT, datefmt=u'%H:%M:%S')
@@ -230,11 +233,14 @@ class Settings(object):
         u'load': {u'type': u'string', u'default': u'', },
         u'run': {u'type': u'string', u'default': u'',  },
         u'convert': {u'type': u'string', u'default': u'', },
+        u'batch': {u'type': u'string', u'list': u'*', u'default': [], },
+        u'batch-dir': {u'type': u'string', u'default': u'', },
         u'help': {u'type': u'bool', u'default': False, },
         u'keys': {u'type': u'string', u'default': u'', },
         u'exec': {u'type': u'string', u'default': u'', },
         u'quit': {u'type': u'bool', u'default': False,},
         u'double': {u'type': u'bool', u'default': False,},
+        u'fast-math': {u'type': u'bool', u'default': False,},
         u'max-files': {u'type': u'int', u'default': 3,},
         u'max-reclen': {u'type': u'int', u'default': 128,},
         u'serial-buffer-size': {u'type': u'int', u'default': 256,},
@@ -253,9 +259,11 @@ class Settings(object):
         u'fullscreen': {u'type': u'bool', u'default': False,},
         u'prevent-close': {u'type': u'bool', u'default': False,},
         u'debug': {u'type': u'bool', u'default': False,},
+        u'profile': {u'type': u'string', u'default': u'',},
         u'hide-listing': {u'type': u'int', u'default': 65535,},
         u'hide-protected': {u'type': u'bool', u'default': False,},
         u'mount': {u'type': u'string', u'list': u'*', u'default': [],},
+        u'native-locks': {u'type': u'bool', u'default': False,},
         u'resume': {u'type': u'bool', u'default': False,},
         u'soft-linefeed': {u'type': u'bool', u'default': False,},
         u'syntax': {
@@ -271,6 +279,7 @@ class Settings(object):
         u'border': {u'type': u'int', u'default': 5,},
         u'mouse-clipboard': {u'type': u'bool', u'default': True,},
         u'state': {u'type': u'string', u'default': u'',},
+        u'checkpoint': {u'type': u'int', u'default': 0,},
         u'monitor': {
             u'type': u'string',
             u'choices': (u'rgb', u'composite', u'green', u'amber', u'grey', u'mono'),
@@ -505,7 +514,9 @@ class Settings(object):
             'text_width': self.get('text-width'),
             'video_memory': self.get('video-memory'),
             'low_intensity': cga_low,
-            'font': data.read_fonts(codepage_dict, self.get('font'), warn=self.get('debug')),
+            'font': data.read_fonts(
+                codepage_dict, self.get('font'), warn=self.get('debug'), cache_dir=FONT_CACHE_PATH
+            ),
             # inserted keystrokes
             'keys': self.get('keys').encode('utf-8', 'replace')
                         .decode('string_escape').decode('utf-8', 'replace'),
@@ -513,11 +524,13 @@ class Settings(object):
             'term': self.get('term'),
             'shell': self.get('shell'),
             'double': self.get('double'),
+            'fast_math': self.get('fast-math'),
             # device settings
             'devices': device_params,
             'current_device': current_device,
             'mount': mount_dict,
             'serial_buffer_size': self.get('serial-buffer-size'),
+            'native_locks': self.get('native-locks'),
             # text file parameters
             'utf8': self.get('utf8'),
             'soft_linefeed': self.get('soft-linefeed'),
@@ -528,6 +541,7 @@ class Settings(object):
             'hide_protected': self.get('hide-protected'),
             'allow_code_poke': self.get('allow-code-poke'),
             'rebuild_offsets': not self.get('convert'),
+            'profile': self.get('profile'),
             # max available memory to BASIC (set by /m)
             'max_memory': min(max_list) or 65534,
             # maximum record length (-s)
@@ -620,6 +634,7 @@ class Settings(object):
             'prog': self.get('run') or self.get('load') or self.get(0),
             'resume': self.get('resume'),
             'state_file': self._get_state_file(),
+            'checkpoint': self.get('checkpoint'),
             'commands': commands,
             'debug': self.get('debug'),
             }
@@ -711,6 +726,27 @@ class Settings(object):
         name_out = self.get(1)
         return mode, name_in, name_out
 
+    @property
+    def batch_params(self):
+        """Get parameters for batch file conversion."""
+        mode = self.get('convert')[:1].upper()
+        # tokenised unless plain text or protected is requested
+        mode = mode if mode in (u'A', u'P') else u'B'
+        return mode, self.get('batch'), self.get('batch-dir')
+
+    @property
+    def converter_params(self):
+        """Get parameters for the batch file converter."""
+        session_params = self.session_params
+        return {
+            key: session_params[key]
+            for key in (
+                'syntax', 'codepage', 'box_protect', 'utf8', 'soft_linefeed',
+                'hide_listing', 'hide_protected', 'max_memory', 'reserved_memory',
+                'max_reclen', 'max_files', 'double'
+            )
+        }
+
     @property
     def version(self):
         """Version operating mode."""
@@ -726,6 +762,11 @@ class Settings(object):
         """Converter operating mode."""
         return self.get('convert')
 
+    @property
+    def batch(self):
+        """Batch converter operating mode."""
+        return self.get('convert') and self.get('batch')
+
     @property
     def debug(self):
         """Debugging mode."""
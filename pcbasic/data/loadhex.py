@@ -6,12 +6,17 @@ HEX font loader
 This file is released under the GNU GPL version 3 or later.
 """
 
+import os
 import sys
+import mmap
+import struct
+import hashlib
 import pkg_resources
 import logging
 import binascii
 
 from ..basic.codepage import PRINTABLE_ASCII
+from ..metadata import VERSION
 from .resources import get_data, ResourceFailed
 
 FONT_DIR = u'fonts'
@@ -22,9 +27,32 @@ FONTS = sorted(
     if name.lower().endswith(u'.hex'))
 )
 
+# binary font cache: header, then a glyph index per height, then the glyph data
+CACHE_PATTERN = u'fonts-{0}.bin'
+CACHE_MAGIC = b'PCBASIC-FONTS\x1a\x01'
+# magic, file size, number of heights
+CACHE_HEADER = struct.Struct('<15sIB')
+# height, number of glyphs
+CACHE_HEIGHT = struct.Struct('<BI')
+# codepage character, its length, glyph length, glyph offset in file
+CACHE_ENTRY = '2sBHI'
+CACHE_ENTRY_SIZE = struct.calcsize('<' + CACHE_ENTRY)
 
-def read_fonts(codepage_dict, font_families, warn):
-    """Load font typefaces."""
+
+def read_fonts(codepage_dict, font_families, warn, cache_dir=None):
+    """Load font typefaces, from the binary font cache if available."""
+    if not cache_dir:
+        return _parse_fonts(codepage_dict, font_families, warn)
+    cache_path = os.path.join(cache_dir, _get_cache_name(codepage_dict, font_families))
+    # in debug mode, parse the font files so that missing glyphs get reported
+    fonts = None if warn else _read_cache(cache_path)
+    if not fonts:
+        fonts = _parse_fonts(codepage_dict, font_families, warn)
+        _write_cache(cache_path, fonts)
+    return fonts
+
+def _parse_fonts(codepage_dict, font_families, warn):
+    """Load font typefaces from the Unifont .hex files."""
     # load the graphics fonts, including the 8-pixel RAM font
     # use set() for speed - lookup is O(1) rather than O(n) for list
     unicode_needed = set(codepage_dict.itervalues())
@@ -72,6 +100,81 @@ def read_fonts(codepage_dict, font_families, warn):
     return {height: font for height, font in fonts.iteritems()}
 
 
+###############################################################################
+# binary font cache
+
+def _get_cache_name(codepage_dict, font_families):
+    """Cache file name, unique for the font families, codepage and version."""
+    key = repr((VERSION, list(font_families), sorted(codepage_dict.iteritems())))
+    return CACHE_PATTERN.format(hashlib.sha1(key).hexdigest())
+
+def _read_cache(cache_path):
+    """Read fonts from the binary font cache; return None if not available."""
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cache = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (EnvironmentError, ValueError):
+        # ValueError: can't map an empty file
+        return None
+    try:
+        magic, size, n_heights = CACHE_HEADER.unpack_from(cache, 0)
+        if magic != CACHE_MAGIC or size != len(cache):
+            return None
+        offset = CACHE_HEADER.size
+        fonts = {}
+        for _ in range(n_heights):
+            height, count = CACHE_HEIGHT.unpack_from(cache, offset)
+            offset += CACHE_HEIGHT.size
+            index = struct.unpack_from('<' + CACHE_ENTRY * count, cache, offset)
+            offset += CACHE_ENTRY_SIZE * count
+            fonts[height] = {
+                char[:char_len]: cache[start:start+length]
+                for char, char_len, length, start in zip(*[iter(index)]*4)
+            }
+    except struct.error as e:
+        logging.debug('Could not read font cache %s: %s', cache_path, e)
+        return None
+    finally:
+        cache.close()
+    if 8 in fonts:
+        fonts[9] = fonts[8]
+    return fonts
+
+def _write_cache(cache_path, fonts):
+    """Write fonts to the binary font cache."""
+    # the 9-pixel font is the 8-pixel font
+    heights = sorted(height for height in fonts if height != 9)
+    if any(len(char) > 2 for height in heights for char in fonts[height]):
+        return
+    index, glyphs = [], []
+    offset = CACHE_HEADER.size + sum(
+        CACHE_HEIGHT.size + CACHE_ENTRY_SIZE * len(fonts[height]) for height in heights
+    )
+    for height in heights:
+        index.append(CACHE_HEIGHT.pack(height, len(fonts[height])))
+        for char, glyph in sorted(fonts[height].iteritems()):
+            index.append(struct.pack('<' + CACHE_ENTRY, char, len(char), len(glyph), offset))
+            glyphs.append(glyph)
+            offset += len(glyph)
+    # write to a temporary file first so that readers never see a partial cache
+    temp_path = u'{0}.{1}'.format(cache_path, os.getpid())
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(temp_path, 'wb') as cache_file:
+            cache_file.write(CACHE_HEADER.pack(CACHE_MAGIC, offset, len(heights)))
+            cache_file.write(b''.join(index))
+            cache_file.write(b''.join(glyphs))
+        os.rename(temp_path, cache_path)
+    except EnvironmentError as e:
+        logging.debug('Could not write font cache %s: %s', cache_path, e)
+        try:
+            os.remove(temp_path)
+        except EnvironmentError:
+            pass
+
+
 class FontLoader(object):
     """Single-height bitfont."""
 
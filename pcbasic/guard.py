@@ -176,4 +176,6 @@ class ExceptionGuard(object):
             f.write(crashlog.encode('utf-8', 'replace'))
         # put on clipboard
         impl.queues.video.put(signals.Event(signals.VIDEO_SET_CLIPBOARD_TEXT, (crashlog, False)))
+        # send the batched video signals, as we won't go through the event cycle again
+        impl.queues.video.flush()
         return True
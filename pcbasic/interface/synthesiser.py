@@ -7,6 +7,8 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 from math import ceil
+from fractions import gcd
+from collections import OrderedDict
 
 try:
     import numpy
@@ -27,6 +29,11 @@ FEEDBACK_PERIODIC = 0x4000
 # square wave feedback mask
 FEEDBACK_TONE = 0x2
 
+# resolution for averaging: number of sub-samples per sample
+RESOLUTION = 20
+# number of tone periods to keep in the waveform cache
+TONE_CACHE_SIZE = 64
+
 # The SN76489 attenuates the volume by 2dB for each step in the volume register.
 # see http://www.smspower.org/Development/SN76489
 MAX_AMPLITUDE = (1 << (SAMPLE_BITS-1)) - 1
@@ -94,36 +101,21 @@ class SoundGenerator(object):
             chunk = numpy.zeros(length, numpy.int16)
         else:
             half_wavelength = SAMPLE_RATE / (2.*self.frequency)
-            # resolution for averaging
-            resolution = 20
             # generate first half-wave so as to complete the last one played
             if self.signal_source.phase:
                 bit = -self.amplitude if self.signal_source.bit else self.amplitude
                 first_length = int(half_wavelength * self.signal_source.phase)
-                matrix = numpy.repeat(numpy.array([bit], numpy.int16), first_length * resolution)
+                first = numpy.repeat(numpy.array([bit], numpy.int16), first_length)
                 length -= first_length
                 self.signal_source.phase = 0.
             else:
-                matrix = numpy.array([], numpy.int16)
+                first = numpy.array([], numpy.int16)
             num_half_waves = int(ceil(length / half_wavelength))
-            # generate bits
-            bits = [
-                -self.amplitude if self.signal_source.next() else self.amplitude
-                for _ in xrange(num_half_waves)
-            ]
-            # do sampling by averaging the signal over bins of given resolution
-            # this allows to use numpy all the way
-            # which is *much* faster than looping over an array
-            # stretch array by half_wavelength * resolution
-            matrix = numpy.append(
-                matrix,
-                numpy.repeat(numpy.array(bits, numpy.int16), int(half_wavelength * resolution))
-            )
-            # cut off on round number of resolution blocks
-            matrix = matrix[:len(matrix)-(len(matrix)%resolution)]
-            # average over blocks
-            matrix = matrix.reshape((len(matrix)//resolution, resolution))
-            chunk = numpy.int16(numpy.mean(matrix, axis=1))
+            if self.feedback == FEEDBACK_TONE:
+                chunk = self._tile_tone(num_half_waves, half_wavelength)
+            else:
+                chunk = self._sample_bits(num_half_waves, half_wavelength)
+            chunk = numpy.append(first, chunk)
         if not self.loop:
             # last chunk is shorter
             if self.count_samples + len(chunk) < self.num_samples:
@@ -142,6 +134,73 @@ class SoundGenerator(object):
         # if loop, attach one chunk to loop, do not increment count
         return chunk
 
+    def _sample_bits(self, num_half_waves, half_wavelength):
+        """Generate samples from the signal source, one sample bit per half-wave."""
+        bits = [
+            -self.amplitude if self.signal_source.next() else self.amplitude
+            for _ in xrange(num_half_waves)
+        ]
+        return _average(bits, int(half_wavelength * RESOLUTION))
+
+    def _tile_tone(self, num_half_waves, half_wavelength):
+        """Assemble square-wave samples from a cached tone period."""
+        stretch = int(half_wavelength * RESOLUTION)
+        if num_half_waves <= 0 or not stretch:
+            return numpy.array([], numpy.int16)
+        # the tone source alternates sample bits, so we only need to know the first
+        first_bit = self.signal_source.lfsr & 1
+        period = _tone_cache.get(stretch, self.amplitude, first_bit)
+        # keep the signal source in the state it would have had after generating the bits
+        if num_half_waves % 2:
+            self.signal_source.next()
+        else:
+            self.signal_source.next()
+            self.signal_source.next()
+        return numpy.resize(period, (num_half_waves * stretch) // RESOLUTION)
+
+
+def _average(bits, stretch):
+    """Sample a square wave of sample bits, stretch sub-samples each."""
+    # do sampling by averaging the signal over bins of given resolution
+    # this allows to use numpy all the way
+    # which is *much* faster than looping over an array
+    matrix = numpy.repeat(numpy.array(bits, numpy.int16), stretch)
+    # cut off on round number of resolution blocks
+    matrix = matrix[:len(matrix)-(len(matrix)%RESOLUTION)]
+    # average over blocks
+    matrix = matrix.reshape((len(matrix)//RESOLUTION, RESOLUTION))
+    return numpy.int16(numpy.mean(matrix, axis=1))
+
+
+class _ToneCache(object):
+    """Least-recently-used cache of sampled square-wave periods."""
+
+    def __init__(self, size):
+        """Initialise the cache."""
+        self._size = size
+        self._periods = OrderedDict()
+
+    def get(self, stretch, amplitude, first_bit):
+        """Get the samples of a tone, repeating at whole samples and starting at a given bit."""
+        key = stretch, int(amplitude), first_bit
+        try:
+            period = self._periods.pop(key)
+        except KeyError:
+            # number of half-waves after which the half-waves and the samples line up again
+            num_half_waves = 2 * RESOLUTION // gcd(2 * stretch, RESOLUTION)
+            bits = [
+                -amplitude if (first_bit + i) % 2 else amplitude
+                for i in xrange(num_half_waves)
+            ]
+            period = _average(bits, stretch)
+            if len(self._periods) >= self._size:
+                self._periods.popitem(last=False)
+        self._periods[key] = period
+        return period
+
+
+_tone_cache = _ToneCache(TONE_CACHE_SIZE)
+
 
 def get_signal_sources():
     """Return three tone voices plus a noise source."""
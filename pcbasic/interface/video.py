@@ -24,6 +24,7 @@ class VideoPlugin(object):
         self._handlers = {
             signals.VIDEO_SET_MODE: self.set_mode,
             signals.VIDEO_PUT_GLYPH: self.put_glyph,
+            signals.VIDEO_PUT_TEXT: self.put_text,
             signals.VIDEO_CLEAR_ROWS: self.clear_rows,
             signals.VIDEO_SCROLL_UP: self.scroll_up,
             signals.VIDEO_SCROLL_DOWN: self.scroll_down,
@@ -42,6 +43,7 @@ class VideoPlugin(object):
             signals.VIDEO_FILL_INTERVAL: self.fill_interval,
             signals.VIDEO_PUT_RECT: self.put_rect,
             signals.VIDEO_FILL_RECT: self.fill_rect,
+            signals.VIDEO_FILL_SPANS: self.fill_spans,
             signals.VIDEO_SET_CAPTION: self.set_caption_message,
             signals.VIDEO_SET_CLIPBOARD_TEXT: self.set_clipboard_text,
         }
@@ -71,14 +73,23 @@ class VideoPlugin(object):
                 return True
             # putting task_done before the execution avoids hanging on join() after an exception
             self._video_queue.task_done()
-            if signal.event_type == signals.VIDEO_QUIT:
-                # close thread
-                self.alive = False
+            if signal.event_type == signals.VIDEO_BATCH:
+                signal_list, = signal.params
+                for signal in signal_list:
+                    self._handle_signal(signal)
             else:
-                try:
-                    self._handlers[signal.event_type](*signal.params)
-                except KeyError:
-                    pass
+                self._handle_signal(signal)
+
+    def _handle_signal(self, signal):
+        """Execute a single signal."""
+        if signal.event_type == signals.VIDEO_QUIT:
+            # close thread
+            self.alive = False
+        else:
+            try:
+                self._handlers[signal.event_type](*signal.params)
+            except KeyError:
+                pass
 
     # plugin overrides
 
@@ -142,6 +153,15 @@ class VideoPlugin(object):
     def put_glyph(self, pagenum, row, col, char, is_fullwidth, fore, back, blink, underline):
         """Put a character at a given position."""
 
+    def put_text(self, pagenum, row, col, chars, fore, back, blink, underline):
+        """Put a run of characters at a given position; fullwidth characters are followed by u''."""
+        for i, char in enumerate(chars):
+            if char:
+                is_fullwidth = chars[i+1:i+2] == [u'']
+                self.put_glyph(
+                    pagenum, row, col+i, char, is_fullwidth, fore, back, blink, underline
+                )
+
     def build_glyphs(self, new_dict):
         """Build a dict of glyphs for use in text mode."""
 
@@ -157,6 +177,11 @@ class VideoPlugin(object):
     def fill_interval(self, pagenum, x0, x1, y, index):
         """Fill a scanline interval in a solid attribute."""
 
+    def fill_spans(self, pagenum, spans, index):
+        """Fill a list of [x0, x1, y] scanline intervals in a solid attribute."""
+        for x0, x1, y in spans:
+            self.fill_interval(pagenum, x0, x1, y, index)
+
     def put_interval(self, pagenum, x, y, colours):
         """Write a list of attributes to a scanline interval."""
 
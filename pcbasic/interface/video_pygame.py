@@ -90,6 +90,8 @@ class VideoPygame(VideoPlugin):
         # display palettes for blink states 0, 1
         self._palette = [None, None]
         self._saved_palette = [None, None]
+        # attributes that change colour with the blink state
+        self._blink_attrs = None
         # text attributes supported
         self.mode_has_blink = True
         # update cycle
@@ -98,6 +100,14 @@ class VideoPygame(VideoPlugin):
         # refresh cycle parameters
         self._cycle = 0
         self.last_cycle = 0
+        # changed area of the visible page
+        self._damage = window.DamageTracker()
+        # screen surface (canvas plus border), kept between flips
+        self._screen = None
+        # blink state, cursor area and clipboard feedback as last drawn
+        self._last_blink_state = 0
+        self._cursor_area = None
+        self._feedback_shown = False
         # cursor
         # cursor shape
         self.cursor = None
@@ -340,6 +350,9 @@ class VideoPygame(VideoPlugin):
             self.blink_state = 0 if self._cycle < BLINK_CYCLES * 2 else 1
             if self._cycle % BLINK_CYCLES == 0:
                 self.busy = True
+        if self.blink_state != self._last_blink_state:
+            self._last_blink_state = self.blink_state
+            self._damage_blink()
         if self.cursor_visible and (
                 (self.cursor_row != self.last_row) or (self.cursor_col != self.last_col)):
             self.busy = True
@@ -353,40 +366,86 @@ class VideoPygame(VideoPlugin):
             self._do_flip()
             self.busy = False
 
+    def _damage_blink(self):
+        """Mark the parts of the visible page that change colour with the blink state."""
+        if self._blink_attrs[self.border_attr % self.num_fore_attrs]:
+            self._damage.add_all()
+            return
+        area = window.find_attributes(
+            pygame.surfarray.pixels2d(self.canvas[self.vpagenum]), self._blink_attrs
+        )
+        if area:
+            self._damage.add(*area)
+
     def _do_flip(self):
-        """Draw the canvas to the screen."""
-        # create the screen that will be stretched onto the display
+        """Draw the changed part of the canvas to the screen."""
         border_x, border_y = self._window_sizer.border_start()
-        # surface depth and flags match those of canvas
-        # pylint: disable=E1121,E1123
-        screen = pygame.Surface(
-            (self.size[0] + 2*border_x, self.size[1] + 2*border_y),
-            0, self.canvas[self.vpagenum])
+        screen_size = self.size[0] + 2*border_x, self.size[1] + 2*border_y
+        if not self._screen or self._screen.get_size() != screen_size:
+            # surface depth and flags match those of canvas
+            # pylint: disable=E1121,E1123
+            self._screen = pygame.Surface(screen_size, 0, self.canvas[self.vpagenum])
+            self._damage.add_all()
+        # the cursor is drawn on the screen, not the canvas: redraw where it was and where it goes
+        if self._cursor_area:
+            self._damage.add(*self._cursor_area)
+        self._damage.add(
+            (self.cursor_col-1) * self.font_width, (self.cursor_row-1) * self.font_height,
+            self.cursor_width, self.font_height
+        )
+        # composite artifacts and selection feedback are applied to the whole screen
+        # smooth scaling blends across the edges of a changed area, so is always done in full
+        feedback = self.clipboard.active()
+        if self._composite or self._smooth or feedback or self._feedback_shown:
+            self._damage.add_all()
+        self._feedback_shown = feedback
+        full, area = self._damage.pop(*self.size)
+        if not full and not area:
+            return
+        screen = self._screen
         screen.set_palette(self.work_palette)
-        # border colour
-        border_colour = pygame.Color(0, 0, self.border_attr % self.num_fore_attrs)
-        screen.fill(border_colour)
-        screen.blit(self.canvas[self.vpagenum], (border_x, border_y))
+        if full:
+            # border colour
+            border_colour = pygame.Color(0, 0, self.border_attr % self.num_fore_attrs)
+            screen.fill(border_colour)
+            screen.blit(self.canvas[self.vpagenum], (border_x, border_y))
+        else:
+            screen.blit(self.canvas[self.vpagenum], (border_x + area[0], border_y + area[1]), area)
         # subsurface referencing the canvas area
         workscreen = screen.subsurface((border_x, border_y, self.size[0], self.size[1]))
         self._draw_cursor(workscreen)
-        if self.clipboard.active():
+        if feedback:
             create_feedback(workscreen, self.clipboard.selection_rect)
         if self._composite:
             screen = apply_composite_artifacts(screen, 4//self.bitsperpixel)
         screen.set_palette(self._palette[self.blink_state])
         if self._smooth:
-            pygame.transform.smoothscale(screen.convert(self.display),
-                                         self.display.get_size(), self.display)
+            pygame.transform.smoothscale(
+                screen.convert(self.display), self.display.get_size(), self.display
+            )
+            pygame.display.flip()
+            return
+        # scale tile by tile, so that a redrawn area matches its surroundings
+        tiles = self._window_sizer.scale_tiles(None if full else area)
+        for source, target in tiles:
+            pygame.transform.scale(
+                screen.subsurface(source).convert(self.display), target[2:],
+                self.display.subsurface(target)
+            )
+        if full:
+            pygame.display.flip()
         else:
-            pygame.transform.scale(screen.convert(self.display),
-                                   self.display.get_size(), self.display)
-        pygame.display.flip()
+            pygame.display.update([_target for _, _target in tiles])
 
     def _draw_cursor(self, screen):
         """Draw the cursor on the surface provided."""
+        self._cursor_area = None
         if not self.cursor_visible or self.vpagenum != self.apagenum:
             return
+        self._cursor_area = (
+            (self.cursor_col-1) * self.font_width, (self.cursor_row-1) * self.font_height,
+            self.cursor_width, self.font_height
+        )
         # copy screen under cursor
         self.under_top_left = (
                 (self.cursor_col-1) * self.font_width, (self.cursor_row-1) * self.font_height)
@@ -424,8 +483,15 @@ class VideoPygame(VideoPlugin):
         self.display = pygame.display.set_mode((width, height), flags)
         self._window_sizer.window_size = width, height
         # load display if requested
+        self._damage.add_all()
         self.busy = True
 
+    def _damage_page(self, pagenum, x, y, width, height):
+        """Mark an area of a screen page as changed; update the screen if the page is visible."""
+        if pagenum == self.vpagenum:
+            self._damage.add(x, y, width, height)
+            self.busy = True
+
 
     ###########################################################################
     # signal handlers
@@ -456,6 +522,7 @@ class VideoPygame(VideoPlugin):
         self.clipboard = clipboard.ClipboardInterface(
                 self.clipboard_handler, self._input_queue,
                 mode_info.width, mode_info.height, self.font_width, self.font_height, self.size)
+        self._damage.add_all()
         self.busy = True
         self._has_window = True
 
@@ -481,11 +548,14 @@ class VideoPygame(VideoPlugin):
         for b in rgb_palette_1[:self.num_back_attrs] * (
                     128 // self.num_fore_attrs // self.num_back_attrs):
             self._palette[1] += [b]*self.num_fore_attrs
+        self._blink_attrs = window.blink_attributes(*self._palette)
+        self._damage.add_all()
         self.busy = True
 
     def set_border_attr(self, attr):
         """Change the border attribute."""
         self.border_attr = attr
+        self._damage.add_all()
         self.busy = True
 
     def set_composite(self, on, composite_colors):
@@ -495,6 +565,7 @@ class VideoPygame(VideoPlugin):
         if on:
             self._palette = [composite_colors] * 2
         self._composite = on
+        self._damage.add_all()
         self.busy = True
 
     def clear_rows(self, back_attr, start, stop):
@@ -503,17 +574,18 @@ class VideoPygame(VideoPlugin):
         scroll_area = pygame.Rect(
                 0, (start-1)*self.font_height, self.size[0], (stop-start+1)*self.font_height)
         self.canvas[self.apagenum].fill(bg, scroll_area)
-        self.busy = True
+        self._damage_page(self.apagenum, *scroll_area)
 
     def set_page(self, vpage, apage):
         """Set the visible and active page."""
         self.vpagenum, self.apagenum = vpage, apage
+        self._damage.add_all()
         self.busy = True
 
     def copy_page(self, src, dst):
         """Copy source to destination page."""
         self.canvas[dst].blit(self.canvas[src], (0, 0))
-        self.busy = True
+        self._damage_page(dst, 0, 0, self.size[0], self.size[1])
 
     def show_cursor(self, cursor_on):
         """Change visibility of cursor."""
@@ -544,7 +616,7 @@ class VideoPygame(VideoPlugin):
             bg, (0, (scroll_height-1) * self.font_height, self.size[0], self.font_height)
         )
         self.canvas[self.apagenum].set_clip(None)
-        self.busy = True
+        self._damage_page(self.apagenum, *temp_scroll_area)
 
     def scroll_down(self, from_line, scroll_height, back_attr):
         """Scroll the screen down between from_line and scroll_height."""
@@ -560,7 +632,7 @@ class VideoPygame(VideoPlugin):
             bg, (0, (from_line-1) * self.font_height, self.size[0], self.font_height)
         )
         self.canvas[self.apagenum].set_clip(None)
-        self.busy = True
+        self._damage_page(self.apagenum, *temp_scroll_area)
 
     def put_glyph(self, pagenum, row, col, cp, is_fullwidth, fore, back, blink, underline):
         """Put a single-byte character at a given position."""
@@ -589,7 +661,9 @@ class VideoPygame(VideoPlugin):
             self.canvas[pagenum].blit(glyph, (x0, y0))
         if underline:
             self.canvas[pagenum].fill(color, (x0, y0 + self.font_height - 1, self.font_width, 1))
-        self.busy = True
+        self._damage_page(
+            pagenum, x0, y0, self.font_width * (2 if is_fullwidth else 1), self.font_height
+        )
 
     def build_glyphs(self, new_dict):
         """Build a dict of glyphs for use in text mode."""
@@ -610,26 +684,35 @@ class VideoPygame(VideoPlugin):
     def put_pixel(self, pagenum, x, y, index):
         """Put a pixel on the screen; callback to empty character buffer."""
         self.canvas[pagenum].set_at((x,y), index)
-        self.busy = True
+        self._damage_page(pagenum, x, y, 1, 1)
 
     def fill_rect(self, pagenum, x0, y0, x1, y1, index):
         """Fill a rectangle in a solid attribute."""
         rect = pygame.Rect(x0, y0, x1-x0+1, y1-y0+1)
         self.canvas[pagenum].fill(index, rect)
-        self.busy = True
+        self._damage_page(pagenum, *rect)
 
     def fill_interval(self, pagenum, x0, x1, y, index):
         """Fill a scanline interval in a solid attribute."""
         dx = x1 - x0 + 1
         self.canvas[pagenum].fill(index, (x0, y, dx, 1))
-        self.busy = True
+        self._damage_page(pagenum, x0, y, dx, 1)
+
+    def fill_spans(self, pagenum, spans, index):
+        """Fill a list of [x0, x1, y] scanline intervals in a solid attribute."""
+        canvas = self.canvas[pagenum]
+        for x0, x1, y in spans:
+            canvas.fill(index, (x0, y, x1-x0+1, 1))
+        x0, x1 = min(_span[0] for _span in spans), max(_span[1] for _span in spans)
+        y0, y1 = min(_span[2] for _span in spans), max(_span[2] for _span in spans)
+        self._damage_page(pagenum, x0, y0, x1-x0+1, y1-y0+1)
 
     def put_interval(self, pagenum, x, y, colours):
         """Write a list of attributes to a scanline interval."""
         # reference the interval on the canvas
         pygame.surfarray.pixels2d(self.canvas[pagenum]
                 )[x:x+len(colours), y] = numpy.array(colours).astype(int)
-        self.busy = True
+        self._damage_page(pagenum, x, y, len(colours), 1)
 
     def put_rect(self, pagenum, x0, y0, x1, y1, array):
         """Apply numpy array [y][x] of attribytes to an area."""
@@ -638,7 +721,7 @@ class VideoPygame(VideoPlugin):
         # reference the destination area
         pygame.surfarray.pixels2d(self.canvas[pagenum].subsurface(
             pygame.Rect(x0, y0, x1-x0+1, y1-y0+1)))[:] = numpy.array(array).T
-        self.busy = True
+        self._damage_page(pagenum, x0, y0, x1-x0+1, y1-y0+1)
 
 
 ###############################################################################
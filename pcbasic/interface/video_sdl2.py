@@ -421,9 +421,19 @@ class VideoSDL2(VideoPlugin):
         # palette and colours
         # composite colour artifacts are active
         self._composite = False
+        # attributes that change colour with the blink state
+        self._blink_attrs = None
         # update cycle
         self._cycle = 0
         self._last_tick = 0
+        # changed area of the visible page
+        self._damage = window.DamageTracker()
+        # work surface converted to display format, kept between flips
+        self._converted = None
+        # blink state, cursor area and clipboard feedback as last drawn
+        self._last_blink_state = 0
+        self._cursor_area = None
+        self._feedback_shown = False
         # cursor
         # current cursor location
         self._last_row, self._last_col = 1, 1
@@ -517,6 +527,7 @@ class VideoSDL2(VideoPlugin):
             for s in self.canvas:
                 sdl2.SDL_FreeSurface(s)
             sdl2.SDL_FreeSurface(self._work_surface)
+            sdl2.SDL_FreeSurface(self._converted)
             sdl2.SDL_FreeSurface(self.overlay)
             # free palettes
             for p in self._palette + self._saved_palette:
@@ -554,6 +565,7 @@ class VideoSDL2(VideoPlugin):
         self._set_icon()
         self._display_surface = sdl2.SDL_GetWindowSurface(self._display)
         self._window_sizer.window_size = width, height
+        self._damage.add_all()
         self.busy = True
 
 
@@ -776,6 +788,9 @@ class VideoSDL2(VideoPlugin):
             self.blink_state = 0 if self._cycle < BLINK_CYCLES * 2 else 1
             if self._cycle % BLINK_CYCLES == 0:
                 self.busy = True
+        if self.blink_state != self._last_blink_state:
+            self._last_blink_state = self.blink_state
+            self._damage_blink()
         if self._cursor_visible and (
                 (self.cursor_row != self._last_row) or (self.cursor_col != self._last_col)):
             self.busy = True
@@ -789,8 +804,38 @@ class VideoSDL2(VideoPlugin):
                 self._do_flip()
                 self.busy = False
 
+    def _damage_blink(self):
+        """Mark the parts of the visible page that change colour with the blink state."""
+        if self._blink_attrs[self._border_attr]:
+            self._damage.add_all()
+            return
+        area = window.find_attributes(self.pixels[self.vpagenum], self._blink_attrs)
+        if area:
+            self._damage.add(*area)
+
     def _do_flip(self):
-        """Draw the canvas to the screen."""
+        """Draw the changed part of the canvas to the screen."""
+        # the cursor is drawn on the work surface: redraw where it was and where it goes
+        if self._cursor_area:
+            self._damage.add(*self._cursor_area)
+        self._damage.add(
+            (self.cursor_col-1) * self.font_width, (self.cursor_row-1) * self.font_height,
+            self.cursor_width, self.font_height
+        )
+        # composite artifacts and selection feedback are applied to the whole screen
+        # smooth scaling blends across the edges of a changed area, so is always done in full
+        feedback = self._clipboard_interface.active()
+        if self._composite or self._smooth or feedback or self._feedback_shown:
+            self._damage.add_all()
+        self._feedback_shown = feedback
+        full, area = self._damage.pop(*self.size)
+        if full:
+            self._draw_all(feedback)
+        elif area:
+            self._draw_area(*area)
+
+    def _draw_all(self, feedback):
+        """Draw the canvas and border to the screen."""
         sdl2.SDL_FillRect(self._work_surface, None, self._border_attr)
         if self._composite:
             self._work_pixels[:] = window.apply_composite_artifacts(
@@ -802,11 +847,15 @@ class VideoSDL2(VideoPlugin):
         # apply cursor to work surface
         self._show_cursor(True)
         # convert 8-bit work surface to (usually) 32-bit display surface format
+        # keep the converted surface so that later changes can be blitted onto it
         pixelformat = self._display_surface.contents.format
-        conv = sdl2.SDL_ConvertSurface(self._work_surface, pixelformat, 0)
+        sdl2.SDL_FreeSurface(self._converted)
+        self._converted = sdl2.SDL_ConvertSurface(self._work_surface, pixelformat, 0)
+        conv = self._converted
         # scale converted surface and blit onto display
         if not self._smooth:
-            sdl2.SDL_BlitScaled(conv, None, self._display_surface, None)
+            # scale tile by tile, so that a redrawn area matches its surroundings
+            self._blit_tiles(self._window_sizer.scale_tiles())
         else:
             # smooth-scale converted surface
             scalex, scaley = self._window_sizer.scale()
@@ -819,7 +868,7 @@ class VideoSDL2(VideoPlugin):
             # blit onto display
             sdl2.SDL_BlitSurface(self.zoomed, None, self._display_surface, None)
         # create clipboard feedback
-        if self._clipboard_interface.active():
+        if feedback:
             rects = (
                 sdl2.SDL_Rect(r[0]+self.border_x, r[1]+self.border_y, r[2], r[3])
                 for r in self._clipboard_interface.selection_rect
@@ -832,17 +881,41 @@ class VideoSDL2(VideoPlugin):
             sdl2.SDL_BlitScaled(self.overlay, None, self._display_surface, None)
         # flip the display
         sdl2.SDL_UpdateWindowSurface(self._display)
-        # destroy the temporary surface
-        sdl2.SDL_FreeSurface(conv)
+
+    def _draw_area(self, x, y, width, height):
+        """Draw a changed area of the canvas to the screen."""
+        self._work_pixels[x:x+width, y:y+height] = (
+            self.pixels[self.vpagenum][x:x+width, y:y+height]
+        )
+        sdl2.SDL_SetSurfacePalette(self._work_surface, self._palette[self.blink_state])
+        self._show_cursor(True)
+        # convert the changed area onto the display-format copy of the work surface
+        work_rect = sdl2.SDL_Rect(self.border_x + x, self.border_y + y, width, height)
+        sdl2.SDL_BlitSurface(self._work_surface, work_rect, self._converted, work_rect)
+        # rescale the tiles covering the area; the rest of them is up to date on the copy
+        tiles = self._window_sizer.scale_tiles((x, y, width, height))
+        self._blit_tiles(tiles)
+        rects = (sdl2.SDL_Rect * len(tiles))(*(sdl2.SDL_Rect(*_target) for _, _target in tiles))
+        sdl2.SDL_UpdateWindowSurfaceRects(self._display, rects, len(tiles))
+
+    def _blit_tiles(self, tiles):
+        """Scale tiles of the converted surface onto the display."""
+        for source, target in tiles:
+            sdl2.SDL_BlitScaled(
+                self._converted, sdl2.SDL_Rect(*source),
+                self._display_surface, sdl2.SDL_Rect(*target)
+            )
 
     def _show_cursor(self, do_show):
         """Draw or remove the cursor on the visible page."""
+        self._cursor_area = None
         if not self._cursor_visible or self.vpagenum != self.apagenum:
             return
         screen = self._work_surface
         pixels = self._work_pixels
         top = (self.cursor_row-1) * self.font_height
         left = (self.cursor_col-1) * self.font_width
+        self._cursor_area = left, top, self.cursor_width, self.font_height
         if not do_show:
             pixels[left:left+self.font_width, top:top+self.font_height] = self.under_cursor
             return
@@ -890,8 +963,15 @@ class VideoSDL2(VideoPlugin):
         sdl2.SDL_GetWindowSize(self._display, ctypes.byref(w), ctypes.byref(h))
         self._window_sizer.window_size = w.value, h.value
         self._display_surface = sdl2.SDL_GetWindowSurface(self._display)
+        self._damage.add_all()
         self.busy = True
 
+    def _damage_page(self, pagenum, x, y, width, height):
+        """Mark an area of a screen page as changed; update the screen if the page is visible."""
+        if pagenum == self.vpagenum:
+            self._damage.add(x, y, width, height)
+            self.busy = True
+
 
     ###########################################################################
     # signal handlers
@@ -941,6 +1021,7 @@ class VideoSDL2(VideoPlugin):
             self._clipboard_handler, self._input_queue,
             mode_info.width, mode_info.height, self.font_width, self.font_height, self.size
         )
+        self._damage.add_all()
         self.busy = True
         self._has_window = True
 
@@ -978,11 +1059,14 @@ class VideoSDL2(VideoPlugin):
         )
         sdl2.SDL_SetPaletteColors(self._palette[0], colors_0, 0, 256)
         sdl2.SDL_SetPaletteColors(self._palette[1], colors_1, 0, 256)
+        self._blink_attrs = window.blink_attributes(show_palette_0, show_palette_1)
+        self._damage.add_all()
         self.busy = True
 
     def set_border_attr(self, attr):
         """Change the border attribute."""
         self._border_attr = attr
+        self._damage.add_all()
         self.busy = True
 
     def set_composite(self, on, composite_colors):
@@ -997,6 +1081,7 @@ class VideoSDL2(VideoPlugin):
             sdl2.SDL_SetPaletteColors(self._palette[0], colors, 0, 256)
             sdl2.SDL_SetPaletteColors(self._palette[1], colors, 0, 256)
         self._composite = on
+        self._damage.add_all()
         self.busy = True
 
     def clear_rows(self, back_attr, start, stop):
@@ -1005,11 +1090,14 @@ class VideoSDL2(VideoPlugin):
             0, (start-1)*self.font_height, self.size[0], (stop-start+1)*self.font_height
         )
         sdl2.SDL_FillRect(self.canvas[self.apagenum], scroll_area, back_attr)
-        self.busy = True
+        self._damage_page(
+            self.apagenum, scroll_area.x, scroll_area.y, scroll_area.w, scroll_area.h
+        )
 
     def set_page(self, vpage, apage):
         """Set the visible and active page."""
         self.vpagenum, self.apagenum = vpage, apage
+        self._damage.add_all()
         self.busy = True
 
     def copy_page(self, src, dst):
@@ -1017,7 +1105,7 @@ class VideoSDL2(VideoPlugin):
         self.pixels[dst][:] = self.pixels[src][:]
         # alternative:
         # sdl2.SDL_BlitSurface(self.canvas[src], None, self.canvas[dst], None)
-        self.busy = True
+        self._damage_page(dst, 0, 0, self.size[0], self.size[1])
 
     def show_cursor(self, cursor_on):
         """Change visibility of cursor."""
@@ -1041,7 +1129,7 @@ class VideoSDL2(VideoPlugin):
         old_y0, old_y1 = from_line*self.font_height, scroll_height*self.font_height
         pixels[x0:x1, new_y0:new_y1] = pixels[x0:x1, old_y0:old_y1]
         pixels[x0:x1, new_y1:old_y1] = numpy.full((x1-x0, old_y1-new_y1), back_attr, dtype=int)
-        self.busy = True
+        self._damage_page(self.apagenum, x0, new_y0, x1-x0, old_y1-new_y0)
 
     def scroll_down(self, from_line, scroll_height, back_attr):
         """Scroll the screen down between from_line and scroll_height."""
@@ -1052,7 +1140,7 @@ class VideoSDL2(VideoPlugin):
         new_y0, new_y1 = from_line*self.font_height, scroll_height*self.font_height
         pixels[x0:x1, new_y0:new_y1] = pixels[x0:x1, old_y0:old_y1]
         pixels[x0:x1, old_y0:new_y0] = numpy.full((x1-x0, new_y0-old_y0), back_attr, dtype=int)
-        self.busy = True
+        self._damage_page(self.apagenum, x0, old_y0, x1-x0, new_y1-old_y0)
 
     def put_glyph(self, pagenum, row, col, cp, is_fullwidth, fore, back, blink, underline):
         """Put a character at a given position."""
@@ -1085,7 +1173,7 @@ class VideoSDL2(VideoPlugin):
                 sdl2.SDL_Rect(x0, y0 + self.font_height - 1, glyph_width, 1),
                 attr
             )
-        self.busy = True
+        self._damage_page(pagenum, x0, y0, glyph_width, self.font_height)
 
     def build_glyphs(self, new_dict):
         """Build a dict of glyphs for use in text mode."""
@@ -1103,25 +1191,34 @@ class VideoSDL2(VideoPlugin):
     def put_pixel(self, pagenum, x, y, index):
         """Put a pixel on the screen; callback to empty character buffer."""
         self.pixels[pagenum][x, y] = index
-        self.busy = True
+        self._damage_page(pagenum, x, y, 1, 1)
 
     def fill_rect(self, pagenum, x0, y0, x1, y1, index):
         """Fill a rectangle in a solid attribute."""
         rect = sdl2.SDL_Rect(x0, y0, x1-x0+1, y1-y0+1)
         sdl2.SDL_FillRect(self.canvas[pagenum], rect, index)
-        self.busy = True
+        self._damage_page(pagenum, x0, y0, x1-x0+1, y1-y0+1)
 
     def fill_interval(self, pagenum, x0, x1, y, index):
         """Fill a scanline interval in a solid attribute."""
         rect = sdl2.SDL_Rect(x0, y, x1-x0+1, 1)
         sdl2.SDL_FillRect(self.canvas[pagenum], rect, index)
-        self.busy = True
+        self._damage_page(pagenum, x0, y, x1-x0+1, 1)
+
+    def fill_spans(self, pagenum, spans, index):
+        """Fill a list of [x0, x1, y] scanline intervals in a solid attribute."""
+        pixels = self.pixels[pagenum]
+        for x0, x1, y in spans:
+            pixels[x0:x1+1, y] = index
+        x0, x1 = min(_span[0] for _span in spans), max(_span[1] for _span in spans)
+        y0, y1 = min(_span[2] for _span in spans), max(_span[2] for _span in spans)
+        self._damage_page(pagenum, x0, y0, x1-x0+1, y1-y0+1)
 
     def put_interval(self, pagenum, x, y, colours):
         """Write a list of attributes to a scanline interval."""
         # reference the interval on the canvas
         self.pixels[pagenum][x:x+len(colours), y] = numpy.array(colours).astype(int)
-        self.busy = True
+        self._damage_page(pagenum, x, y, len(colours), 1)
 
     def put_rect(self, pagenum, x0, y0, x1, y1, array):
         """Apply numpy array [y][x] of attribytes to an area."""
@@ -1129,4 +1226,4 @@ class VideoSDL2(VideoPlugin):
             return
         # reference the destination area
         self.pixels[pagenum][x0:x1+1, y0:y1+1] = numpy.array(array).T
-        self.busy = True
+        self._damage_page(pagenum, x0, y0, x1-x0+1, y1-y0+1)
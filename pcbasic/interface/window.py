@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import sys
+from fractions import gcd
 
 try:
     import numpy
@@ -21,6 +22,10 @@ set_dpi_aware()
 
 # percentage of the screen to leave unused for window decorations etc.
 DISPLAY_SLACK = 15
+# fraction of the canvas above which a change is drawn as a full redraw
+FULL_REDRAW_FRACTION = 0.5
+# minimum length of the tiles of the screen that are scaled separately
+TILE_SIZE = 64
 
 
 def apply_composite_artifacts(src_array, pixels=4):
@@ -34,6 +39,86 @@ def apply_composite_artifacts(src_array, pixels=4):
     return numpy.repeat(s[0], pixels, axis=0)
 
 
+def blink_attributes(palette_0, palette_1):
+    """Get a lookup table of the attributes that change colour with the blink state."""
+    return numpy.array([_rgb_0 != _rgb_1 for _rgb_0, _rgb_1 in zip(palette_0, palette_1)])
+
+
+def find_attributes(pixels, attributes):
+    """Get the bounding box (x, y, width, height) of pixels with attributes in a lookup table."""
+    found = attributes[pixels]
+    columns = numpy.flatnonzero(found.any(axis=1))
+    if not len(columns):
+        return None
+    rows = numpy.flatnonzero(found.any(axis=0))
+    return (
+        int(columns[0]), int(rows[0]),
+        int(columns[-1] - columns[0]) + 1, int(rows[-1] - rows[0]) + 1
+    )
+
+
+class DamageTracker(object):
+    """Keep track of the changed area of the visible screen page."""
+
+    def __init__(self):
+        """Start with the whole screen to be drawn."""
+        self._full = True
+        # bounding box (x0, y0, x1, y1) of changes, bounds exclusive
+        self._area = None
+
+    def add(self, x, y, width, height):
+        """Mark a rectangle of the canvas as changed."""
+        if self._full or width <= 0 or height <= 0:
+            return
+        if self._area is None:
+            self._area = x, y, x + width, y + height
+        else:
+            x0, y0, x1, y1 = self._area
+            self._area = min(x0, x), min(y0, y), max(x1, x + width), max(y1, y + height)
+
+    def add_all(self):
+        """Mark the whole screen, including the border, as changed."""
+        self._full = True
+        self._area = None
+
+    def pop(self, width, height):
+        """\
+            Get the changed area of a canvas of the given size and start afresh.
+            Returns (True, None) if the whole screen is to be redrawn,
+            (False, (x, y, width, height)) if part of the canvas has changed,
+            or (False, None) if nothing has changed.
+        """
+        full, area = self._full, self._area
+        self._full, self._area = False, None
+        if full:
+            return True, None
+        if area is None:
+            return False, None
+        x0, y0 = max(0, area[0]), max(0, area[1])
+        x1, y1 = min(width, area[2]), min(height, area[3])
+        if x1 <= x0 or y1 <= y0:
+            return False, None
+        # scaling many small pieces is no cheaper than scaling the whole
+        if (x1-x0) * (y1-y0) > FULL_REDRAW_FRACTION * width * height:
+            return True, None
+        return False, (x0, y0, x1-x0, y1-y0)
+
+
+def _tile_spans(start, stop, screen_length, window_length):
+    """Get (start, length) of the tiles covering a screen interval and of their scaled images."""
+    # length of the shortest runs of screen pixels that scale to whole window pixels
+    step = screen_length // gcd(screen_length, window_length)
+    tile = step * -(-TILE_SIZE // step)
+    spans = []
+    for tile_start in range(start // tile * tile, stop, tile):
+        tile_stop = min(screen_length, tile_start + tile)
+        # these divisions are exact as the bounds are multiples of the step
+        window_start = tile_start * window_length // screen_length
+        window_stop = tile_stop * window_length // screen_length
+        spans.append((tile_start, tile_stop-tile_start, window_start, window_stop-window_start))
+    return spans
+
+
 class WindowSizer(object):
     """Graphical video plugin, base class."""
 
@@ -122,6 +207,29 @@ class WindowSizer(object):
             self.window_size[0] / (self.size[0] + 2.0*border_x),
             self.window_size[1] / (self.size[1] + 2.0*border_y))
 
+    def scale_tiles(self, area=None):
+        """\
+            Map an area of the canvas, or the whole screen if None, to the window in tiles.
+            Each tile is scaled separately and covers a whole number of window pixels,
+            so that it scales the same whether it is redrawn on its own or with the screen.
+            Returns a list of (source, target) pairs of the screen (canvas plus border) area
+            and the window area it scales to, each as (x, y, width, height).
+        """
+        border_x, border_y = self.border_start()
+        screen_width, screen_height = self.size[0] + 2*border_x, self.size[1] + 2*border_y
+        if area is None:
+            x, y, width, height = 0, 0, screen_width, screen_height
+        else:
+            x, y, width, height = area
+            x, y = x + border_x, y + border_y
+        columns = _tile_spans(x, x + width, screen_width, self.window_size[0])
+        rows = _tile_spans(y, y + height, screen_height, self.window_size[1])
+        return [
+            ((sx, sy, sw, sh), (wx, wy, ww, wh))
+            for sy, sh, wy, wh in rows
+            for sx, sw, wx, ww in columns
+        ]
+
     def border_start(self):
         """Top left physical coordinates of canvas."""
         return (
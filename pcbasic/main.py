@@ -54,6 +54,9 @@ def run(*arguments):
         elif settings.help:
             # print usage and exit
             show_usage()
+        elif settings.batch:
+            # convert many files and exit
+            convert_batch(settings)
         elif settings.convert:
             # convert and exit
             convert(settings)
@@ -85,6 +88,43 @@ def convert(settings):
             mode_suffix = b',%s' % (mode,) if mode.upper() in (b'A', b'P') else b''
             session.execute(b'SAVE "%s"%s' % (outfile, mode_suffix))
 
+def convert_batch(settings):
+    """Perform file format conversion on many files in parallel."""
+    mode, in_paths, out_dir = settings.batch_params
+    if not out_dir:
+        logging.error(u'Batch conversion requires an output directory, set with --batch-dir')
+        return
+    jobs = list(_find_batch_jobs(in_paths, out_dir, mode))
+    encoding = sys.stdout.encoding or 'utf-8'
+    for in_name, out_name, success, messages in basic.convert_files(
+            jobs, **settings.converter_params
+        ):
+        status = u'; '.join(_msg.decode('ascii', 'replace') for _msg in messages)
+        if success:
+            status = u'OK' + (u' (%s)' % (status,) if status else u'')
+        report = u'%s -> %s: %s\n' % (in_name, out_name, status)
+        sys.stdout.write(report.encode(encoding, 'replace'))
+        sys.stdout.flush()
+
+def _find_batch_jobs(in_paths, out_dir, mode):
+    """Generate conversion jobs for files and for .BAS files in directory trees."""
+    for in_path in in_paths:
+        if os.path.isdir(in_path):
+            for root, _, files in os.walk(in_path):
+                names = [_name for _name in files if _name.upper().endswith(u'.BAS')]
+                if not names:
+                    continue
+                out_root = os.path.normpath(os.path.join(out_dir, os.path.relpath(root, in_path)))
+                # create output directories here, not in the worker processes
+                if not os.path.isdir(out_root):
+                    os.makedirs(out_root)
+                for name in sorted(names):
+                    yield os.path.join(root, name), os.path.join(out_root, name), mode
+        else:
+            if not os.path.isdir(out_dir):
+                os.makedirs(out_dir)
+            yield in_path, os.path.join(out_dir, os.path.basename(in_path)), mode
+
 def launch_session(settings):
     """Start an interactive interpreter session."""
     guard = ExceptionGuard(**settings.guard_params)
@@ -95,12 +135,12 @@ def launch_session(settings):
 
 def run_session(
         interface=None, guard=NOGUARD,
-        resume=False, debug=False, state_file=None,
+        resume=False, debug=False, state_file=None, checkpoint=0,
         prog=None, commands=(), **session_params):
     """Run an interactive BASIC session."""
     Session = basic.DebugSession if debug else basic.Session
     with Session(interface, **session_params) as s:
-        with state.manage_state(s, state_file, resume) as session:
+        with state.manage_state(s, state_file, resume, checkpoint) as session:
             with guard.protect(interface, session):
                 if prog:
                     with session.bind_file(prog) as progfile:
@@ -6,10 +6,11 @@ Support for pickling emulator state
 This file is released under the GNU GPL version 3 or later.
 """
 
+import pickle as pypickle
 try:
     import cPickle as pickle
 except ImportError:
-    import pickle
+    pickle = pypickle
 
 import copy_reg
 import os
@@ -17,18 +18,35 @@ import io
 import logging
 import zlib
 import sys
+import hashlib
+import threading
 from contextlib import contextmanager
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# buffers of at least this many bytes are stored in separate chunk files
+CHUNK_THRESHOLD = 1024
+# first element of a state file that refers to chunk files
+CHUNKED_MAGIC = b'PCBASIC-STATE\x01'
+
 
 @contextmanager
-def manage_state(session, state_file, do_resume):
-    """Resume a session if requested; save upon exit"""
+def manage_state(session, state_file, do_resume, checkpoint=0):
+    """Resume a session if requested; save upon exit and every checkpoint seconds if nonzero."""
     if do_resume:
         session = zunpickle(state_file).attach(session.interface)
+    checkpointer = Checkpointer(state_file)
+    if checkpoint:
+        session.set_timer(lambda: checkpointer.save(session, background=True), checkpoint)
     try:
         yield session
     finally:
-        zpickle(session, state_file)
+        checkpointer.save(session)
+        checkpointer.close()
 
 
 def unpickle_file(name, mode, pos):
@@ -76,15 +94,241 @@ def zunpickle(state_file):
         try:
             with open(state_file, 'rb') as f:
                 s = zlib.decompress(f.read())
-                return pickle.loads(s)
+            obj = pickle.loads(s)
+            if isinstance(obj, tuple) and obj and obj[0] == CHUNKED_MAGIC:
+                _, manifest, body = obj
+                return _ChunkLoader(_ChunkStore(state_file), manifest).load(body)
+            # state file without chunks
+            return obj
         except EnvironmentError:
             logging.error('Could not read from %s', state_file)
 
 def zpickle(obj, state_file):
-    """Retuen a compressed pickle string."""
-    if state_file:
+    """Write a compressed pickle string and chunk files."""
+    checkpointer = Checkpointer(state_file)
+    checkpointer.save(obj)
+    checkpointer.close()
+
+
+###############################################################################
+# chunked snapshots
+
+class Checkpointer(object):
+    """Save snapshots of a session to a state file, optionally in the background."""
+
+    def __init__(self, state_file):
+        """Initialise the checkpointer."""
+        self._state_file = state_file
+        self._store = _ChunkStore(state_file) if state_file else None
+        self._thread = None
+        # chunks of the last snapshot, by key used in persistent ids
+        self._chunks = {}
+
+    def save(self, obj, background=False):
+        """\
+            Take a snapshot and write it to the state file.
+            If background is True, write it in a separate thread; skip the snapshot
+            if the previous one is still being written.
+        """
+        if not self._state_file:
+            return
+        if self._thread and self._thread.is_alive():
+            if background:
+                return
+            self._thread.join()
+        # the object graph is pickled and changed buffers copied on the calling thread
+        # so that the snapshot is consistent
+        # hashing, compression and disk access happen on the writer thread
+        snapshot = _Snapshot(obj, self._chunks)
+        self._chunks = snapshot.chunks
+        if background:
+            self._thread = threading.Thread(target=self._write, args=(snapshot,))
+            self._thread.start()
+        else:
+            self._write(snapshot)
+
+    def close(self):
+        """Wait for outstanding writes."""
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _write(self, snapshot):
+        """Write a snapshot."""
         try:
-            with open(state_file, 'wb') as f:
-                f.write(zlib.compress(pickle.dumps(obj, 2)))
+            snapshot.write(self._state_file, self._store)
         except EnvironmentError:
-            logging.error('Could not write to %s', state_file)
+            logging.error('Could not write to %s', self._state_file)
+
+
+class _Snapshot(object):
+    """Pickled object graph with its large buffers taken out."""
+
+    def __init__(self, obj, previous_chunks):
+        """Pickle the object, then copy out the large buffers that have changed."""
+        # large buffers, by key used in persistent ids
+        self._buffers = {}
+        stream = io.BytesIO()
+        _create_pickler(stream, self._persistent_id).dump(obj)
+        self._body = stream.getvalue()
+        self.chunks = {}
+        for key, buf in self._buffers.iteritems():
+            chunk = previous_chunks.get(key)
+            if not chunk or not chunk.is_copy_of(buf):
+                chunk = _Chunk(buf)
+            self.chunks[key] = chunk
+
+    def _persistent_id(self, obj):
+        """Take out a large buffer; return None for other objects."""
+        # the object id keeps shared buffers shared when loading
+        key = id(obj)
+        if isinstance(obj, bytearray) and len(obj) >= CHUNK_THRESHOLD:
+            self._buffers[key] = obj
+            return b'bytearray', key
+        elif numpy and isinstance(obj, numpy.ndarray) and obj.nbytes >= CHUNK_THRESHOLD:
+            self._buffers[key] = obj
+            return b'ndarray', key, obj.dtype.str, obj.shape
+        elif isinstance(obj, io.BytesIO):
+            # program code streams; their contents are taken out as an immutable copy
+            value, pos, attrs = obj.__getstate__()
+            if len(value) >= CHUNK_THRESHOLD:
+                self._buffers[key] = value
+                return b'bytesio', key, type(obj), pos, attrs
+        return None
+
+    def write(self, state_file, store):
+        """Write the chunks that have changed, then the state file."""
+        manifest = {}
+        for key, chunk in self.chunks.iteritems():
+            if chunk.name is None:
+                chunk.name = store.put(chunk.data)
+            manifest[key] = chunk.name
+        data = zlib.compress(pickle.dumps((CHUNKED_MAGIC, manifest, self._body), 2))
+        temp_name = state_file + u'.new'
+        with open(temp_name, 'wb') as f:
+            f.write(data)
+        if os.path.exists(state_file) and sys.platform == 'win32':
+            os.remove(state_file)
+        os.rename(temp_name, state_file)
+        store.collect(set(manifest.itervalues()))
+
+
+class _Chunk(object):
+    """Copy of the contents of a large buffer."""
+
+    def __init__(self, buf):
+        """Copy the buffer."""
+        if isinstance(buf, bytes):
+            self.data = buf
+        elif isinstance(buf, bytearray):
+            self.data = bytes(buf)
+        else:
+            self.data = buf.tobytes()
+        # name in the chunk store; set once the chunk has been stored
+        self.name = None
+
+    def is_copy_of(self, buf):
+        """The chunk holds the current contents of the buffer."""
+        if isinstance(buf, (bytes, bytearray)):
+            # compare without copying
+            return buf == self.data
+        # numpy arrays
+        return buf.flags.c_contiguous and buffer(buf) == buffer(self.data)
+
+
+def _create_pickler(stream, persistent_id):
+    """Create a pickler that takes persistent ids for objects that are not of core types."""
+    if pickle is pypickle:
+        return _PersistentPickler(stream, persistent_id)
+    pickler = pickle.Pickler(stream, 2)
+    # cPickle calls this for objects that are not of the common built-in types
+    pickler.inst_persistent_id = persistent_id
+    return pickler
+
+
+class _PersistentPickler(pypickle.Pickler):
+    """Pure-Python pickler with persistent ids."""
+
+    def __init__(self, stream, persistent_id):
+        """Initialise the pickler."""
+        pypickle.Pickler.__init__(self, stream, 2)
+        self._persistent_id = persistent_id
+
+    def persistent_id(self, obj):
+        """Persistent id for an object, or None to pickle it."""
+        return self._persistent_id(obj)
+
+
+class _ChunkLoader(object):
+    """Rebuild an object graph from a pickle and its chunk files."""
+
+    def __init__(self, store, manifest):
+        """Initialise the loader."""
+        self._store = store
+        self._manifest = manifest
+        self._objects = {}
+
+    def load(self, body):
+        """Unpickle the object graph."""
+        unpickler = pickle.Unpickler(io.BytesIO(body))
+        unpickler.persistent_load = self._persistent_load
+        return unpickler.load()
+
+    def _persistent_load(self, pid):
+        """Rebuild a buffer from its chunk."""
+        kind, key = pid[:2]
+        if key in self._objects:
+            return self._objects[key]
+        data = self._store.get(self._manifest[key])
+        if kind == b'bytearray':
+            obj = bytearray(data)
+        elif kind == b'ndarray':
+            _, _, dtype, shape = pid
+            obj = numpy.frombuffer(data, dtype=dtype).reshape(shape).copy()
+        elif kind == b'bytesio':
+            _, _, cls, pos, attrs = pid
+            obj = cls.__new__(cls)
+            obj.__setstate__((data, pos, attrs))
+        else:
+            raise pickle.UnpicklingError('Unknown chunk type %r' % (kind,))
+        self._objects[key] = obj
+        return obj
+
+
+class _ChunkStore(object):
+    """Compressed chunk files named by the hash of their contents."""
+
+    def __init__(self, state_file):
+        """Initialise the chunk directory."""
+        self._path = state_file + u'.chunks'
+        # names of chunks known to be on disk
+        self._known = set()
+
+    def put(self, data):
+        """Store a chunk if it isn't already; return its name."""
+        name = hashlib.sha1(data).hexdigest()
+        if name not in self._known:
+            if not os.path.isdir(self._path):
+                os.makedirs(self._path)
+            path = os.path.join(self._path, name)
+            if not os.path.exists(path):
+                with open(path + u'.new', 'wb') as f:
+                    f.write(zlib.compress(data))
+                os.rename(path + u'.new', path)
+            self._known.add(name)
+        return name
+
+    def get(self, name):
+        """Retrieve a chunk."""
+        with open(os.path.join(self._path, name), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def collect(self, in_use):
+        """Remove chunks that are no longer used."""
+        for name in os.listdir(self._path) if os.path.isdir(self._path) else ():
+            if name not in in_use:
+                try:
+                    os.remove(os.path.join(self._path, name))
+                except EnvironmentError:
+                    pass
+        self._known &= in_use
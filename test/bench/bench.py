@@ -0,0 +1,135 @@
+#!/usr/bin/env python2
+
+""" PC-BASIC benchmark script
+
+Runs BASIC programs headlessly through the Session API and reports their throughput as JSON.
+
+usage: bench.py [--repeat=N] [--output=FILE] [--compare=FILE] [--tolerance=FRACTION] [name ...]
+
+--repeat        run each program N times and report the fastest run (default: 3)
+--output        write the JSON report to FILE instead of standard output
+--compare       compare with a report stored earlier; exit with an error on regressions
+--tolerance     fraction by which a rate may fall below the stored one (default: 0.2)
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import platform
+import time
+import json
+
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import pcbasic
+
+
+# name, program, unit, units of work per run
+BENCHMARKS = (
+    ('for-loop', 'FORLOOP.BAS', 'statements', 40000),
+    ('expressions', 'EXPR.BAS', 'expressions', 5000),
+    ('string-concat', 'STRCAT.BAS', 'concatenations', 5000),
+    ('array-sort', 'SORT.BAS', 'elements', 500),
+    ('graphics', 'GRAPHICS.BAS', 'figures', 350),
+    ('paint', 'PAINT.BAS', 'fills', 15),
+    ('print', 'PRINT.BAS', 'bytes', 62000),
+    ('sequential-file', 'SEQFILE.BAS', 'bytes', 124000),
+    ('random-file', 'RANDFILE.BAS', 'bytes', 64000),
+)
+
+benchdir = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_benchmark(program):
+    """Run a program once; return wall-clock time of the run and time spent collecting garbage."""
+    # mount the scratch directory explicitly; the default Z: is the working directory at import
+    with pcbasic.Session(
+            input_streams=None, output_streams=None, mount={b'Z': (os.getcwdu(), u'')}
+        ) as s:
+        s.execute(b'LOAD "%s"' % (program,))
+        # measure string space garbage collection
+        memory = s._impl.memory
+        collect_garbage = memory._collect_garbage
+        gc_time = [0.]
+        def timed_collect_garbage():
+            start = time.time()
+            collect_garbage()
+            gc_time[0] += time.time() - start
+        memory._collect_garbage = timed_collect_garbage
+        start = time.time()
+        s.execute(b'RUN')
+        return time.time() - start, gc_time[0]
+
+def run_all(names, repeat):
+    """Run the selected benchmarks in a scratch directory and build the report."""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='pcbasic-bench-')
+    startdir = os.getcwd()
+    try:
+        os.chdir(workdir)
+        for name, program, unit, units in BENCHMARKS:
+            if names and name not in names:
+                continue
+            shutil.copy(os.path.join(benchdir, program), program)
+            sys.stderr.write('Running benchmark %s .. ' % (name,))
+            timings = [run_benchmark(program) for _ in range(repeat)]
+            seconds, gc_seconds = min(timings)
+            results[name] = {
+                'program': program,
+                'seconds': seconds,
+                'gc_seconds': gc_seconds,
+                'unit': unit,
+                'rate': units / seconds,
+            }
+            sys.stderr.write('%.3fs, %.0f %s/s\n' % (seconds, units / seconds, unit))
+    finally:
+        os.chdir(startdir)
+        shutil.rmtree(workdir)
+    return {
+        'version': pcbasic.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare(report, baseline, tolerance):
+    """Compare rates with a baseline report; return list of regressions."""
+    regressions = []
+    for name, result in sorted(report['results'].items()):
+        try:
+            base_rate = baseline['results'][name]['rate']
+        except KeyError:
+            continue
+        change = result['rate'] / base_rate - 1.
+        sys.stderr.write('%-16s %+6.1f%%\n' % (name, 100. * change))
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    options = dict(arg[2:].split('=', 1) for arg in args if arg.startswith('--') and '=' in arg)
+    names = [arg for arg in args if not arg.startswith('--')]
+    report = run_all(names, int(options.get('repeat', 3)))
+    output = json.dumps(report, indent=4, sort_keys=True)
+    if 'output' in options:
+        with open(options['output'], 'w') as f:
+            f.write(output + '\n')
+    else:
+        print output
+    if 'compare' in options:
+        with open(options['compare']) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, float(options.get('tolerance', 0.2)))
+        if regressions:
+            sys.stderr.write(
+                '\033[01;31mPerformance regression in: %s\033[00m\n' % (' '.join(regressions),)
+            )
+            sys.exit(1)
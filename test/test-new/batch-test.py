@@ -0,0 +1,96 @@
+import random
+import Queue
+
+from pcbasic.basic import eventcycle
+from pcbasic.basic.base import signals
+from pcbasic.interface.video import VideoPlugin
+
+
+class RecordingPlugin(VideoPlugin):
+    """Keep the pixels and glyphs drawn, and count the signals received."""
+
+    def __init__(self, video_queue):
+        VideoPlugin.__init__(self, None, video_queue)
+        self.pixels, self.glyphs, self.count = {}, {}, 0
+
+    def _handle_signal(self, signal):
+        self.count += 1
+        VideoPlugin._handle_signal(self, signal)
+
+    def put_pixel(self, pagenum, x, y, index):
+        self.pixels[pagenum, x, y] = index
+
+    def put_interval(self, pagenum, x, y, colours):
+        for i, index in enumerate(colours):
+            self.pixels[pagenum, x+i, y] = index
+
+    def fill_interval(self, pagenum, x0, x1, y, index):
+        self.put_interval(pagenum, x0, y, [index] * (x1-x0+1))
+
+    def put_rect(self, pagenum, x0, y0, x1, y1, array):
+        assert len(array) == y1-y0+1
+        for i, colours in enumerate(array):
+            assert len(colours) == x1-x0+1
+            self.put_interval(pagenum, x0, y0+i, colours)
+
+    def put_glyph(self, pagenum, row, col, char, is_fullwidth, fore, back, blink, underline):
+        self.glyphs[pagenum, row, col] = char, is_fullwidth, fore, back, blink, underline
+
+    def clear_rows(self, back_attr, start, stop):
+        self.pixels.clear()
+        self.glyphs.clear()
+
+
+def random_signals(count):
+    """Generate runs of pixels and glyphs as PSET would, mixed with other signals."""
+    out = []
+    x, y = 0, 0
+    for _ in range(count):
+        pagenum = random.choice((0, 0, 1))
+        kind = random.random()
+        if kind < 0.4:
+            x += 1
+            if x > 20 or random.random() < 0.05:
+                x, y = random.randrange(3), (y + 1) % 30
+            out.append(signals.Event(signals.VIDEO_PUT_PIXEL, (pagenum, x, y, (x+y) % 4)))
+            out.append(signals.Event(signals.VIDEO_PUT_GLYPH, (
+                pagenum, 1 + y // 8, 1 + x // 8, u' ', False, 3, 0, False, False
+            )))
+        elif kind < 0.5:
+            x0 = random.randrange(20)
+            out.append(signals.Event(signals.VIDEO_FILL_INTERVAL, (
+                pagenum, x0, x0 + random.randrange(5), random.randrange(30), random.randrange(2)
+            )))
+        elif kind < 0.6:
+            out.append(signals.Event(signals.VIDEO_PUT_INTERVAL, (
+                pagenum, random.randrange(20), random.randrange(30), [1, 2, 3]
+            )))
+        elif kind < 0.95:
+            out.append(signals.Event(signals.VIDEO_PUT_GLYPH, (
+                pagenum, random.randrange(3), random.randrange(10), random.choice(u'ab'),
+                random.random() < 0.1, random.randrange(2), 0, False, False
+            )))
+        else:
+            out.append(signals.Event(signals.VIDEO_CLEAR_ROWS, (0, 1, 25)))
+    return out
+
+# merged signals draw the same as the signals sent one by one
+random.seed(0)
+sent, received = 0, 0
+for _ in range(100):
+    signal_list = random_signals(random.randrange(1, 600))
+    single_queue, batch_queue = Queue.Queue(), Queue.Queue()
+    batches = eventcycle.VideoBatchQueue(batch_queue, signals.VIDEO_BATCH)
+    for signal in signal_list:
+        single_queue.put(signal)
+        batches.put(signal)
+    batches.flush()
+    single, batched = RecordingPlugin(single_queue), RecordingPlugin(batch_queue)
+    single._drain_queue()
+    batched._drain_queue()
+    assert single.pixels == batched.pixels
+    assert single.glyphs == batched.glyphs
+    sent += single.count
+    received += batched.count
+assert received < sent
+print 'merged', sent, 'signals into', received
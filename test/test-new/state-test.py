@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+
+import pcbasic
+from pcbasic import Session, state
+
+# run a program while checkpointing in the background, then resume from the state file
+tempdir = tempfile.mkdtemp()
+state_file = os.path.join(tempdir, u'STATE.SAV')
+try:
+    with Session(input_streams=None, output_streams=None) as s:
+        with state.manage_state(s, state_file, False, checkpoint=1) as session:
+            session.execute('10 FOR I=1 TO 30000: A=A+1: NEXT')
+            session.execute('20 B$="done"')
+            session.execute('RUN')
+            print session.get_variable('A!'), session.get_variable('B$')
+    with Session(input_streams=None, output_streams=None) as s:
+        with state.manage_state(s, state_file, True) as session:
+            print session.get_variable('A!'), session.get_variable('B$')
+            session.execute('RUN')
+            print session.get_variable('A!'), session.get_variable('B$')
+finally:
+    shutil.rmtree(tempdir)
+
+# unchanged buffers are not copied again; changed ones are
+tempdir = tempfile.mkdtemp()
+state_file = os.path.join(tempdir, u'STATE.SAV')
+try:
+    with Session(input_streams=None, output_streams=None) as s:
+        s.execute('SCREEN 1: DIM A%(1000): PSET (10, 10)')
+        checkpointer = state.Checkpointer(state_file)
+        checkpointer.save(s)
+        first = dict(checkpointer._chunks)
+        checkpointer.save(s)
+        assert checkpointer._chunks == first
+        s.execute('A%(5) = 1')
+        checkpointer.save(s)
+        changed = [_key for _key in first if checkpointer._chunks[_key] is not first[_key]]
+        assert len(changed) == 1
+        checkpointer.close()
+    with Session(input_streams=None, output_streams=None) as s:
+        with state.manage_state(s, state_file, True) as session:
+            print session.evaluate('A%(5)'), session.evaluate('POINT(10, 10)')
+finally:
+    shutil.rmtree(tempdir)
+
+# persistent ids also work with the pure-Python pickle module
+tempdir = tempfile.mkdtemp()
+state_file = os.path.join(tempdir, u'STATE.SAV')
+fast_pickle, state.pickle = state.pickle, state.pypickle
+try:
+    with Session(input_streams=None, output_streams=None) as s:
+        s.execute('DIM A%(1000): A%(7) = 42')
+        state.zpickle(s, state_file)
+    assert os.listdir(state_file + u'.chunks')
+    with Session(input_streams=None, output_streams=None) as s:
+        with state.manage_state(s, state_file, True) as session:
+            print session.evaluate('A%(7)')
+finally:
+    state.pickle = fast_pickle
+    shutil.rmtree(tempdir)
@@ -0,0 +1,74 @@
+from pcbasic.interface import window
+
+# changed areas are clipped to the canvas and merged into their bounding box
+damage = window.DamageTracker()
+assert damage.pop(640, 200) == (True, None)
+assert damage.pop(640, 200) == (False, None)
+damage.add(8, 16, 8, 8)
+damage.add(100, 4, 2, 1)
+assert damage.pop(640, 200) == (False, (8, 4, 94, 20))
+damage.add(-4, 196, 8, 8)
+assert damage.pop(640, 200) == (False, (0, 196, 4, 4))
+damage.add(700, 0, 8, 8)
+damage.add(0, 0, 0, 8)
+assert damage.pop(640, 200) == (False, None)
+damage.add(0, 0, 640, 101)
+assert damage.pop(640, 200) == (True, None)
+damage.add_all()
+damage.add(0, 0, 8, 8)
+assert damage.pop(640, 200) == (True, None)
+print 'DamageTracker ok'
+
+def check_tiles(sizer, area):
+    """Check the tiles cover the area and scale by the window's exact ratio."""
+    border_x, border_y = sizer.border_start()
+    screen_width, screen_height = sizer.size[0] + 2*border_x, sizer.size[1] + 2*border_y
+    window_width, window_height = sizer.window_size
+    tiles = sizer.scale_tiles(area)
+    if area is None:
+        area = -border_x, -border_y, screen_width, screen_height
+    x, y, width, height = area
+    covered = set()
+    for (sx, sy, sw, sh), (wx, wy, ww, wh) in tiles:
+        assert 0 <= sx and sx + sw <= screen_width and 0 <= sy and sy + sh <= screen_height
+        assert sx * window_width == wx * screen_width
+        assert sy * window_height == wy * screen_height
+        assert sw * window_width == ww * screen_width
+        assert sh * window_height == wh * screen_height
+        covered |= set((_x, _y) for _x in range(sx, sx+sw) for _y in range(sy, sy+sh))
+    wanted = set(
+        (_x, _y)
+        for _x in range(x + border_x, x + border_x + width)
+        for _y in range(y + border_y, y + border_y + height)
+    )
+    assert wanted <= covered
+    return tiles
+
+for window_size, border in (
+        ((640, 200), 0), ((1280, 800), 0), ((1000, 700), 0), ((1000, 700), 5), ((1037, 713), 5)
+    ):
+    sizer = window.WindowSizer(1920, 1080, border_width=border)
+    sizer.size = 640, 200
+    sizer.window_size = window_size
+    check_tiles(sizer, None)
+    for area in ((0, 0, 1, 1), (639, 199, 1, 1), (100, 50, 30, 20), (0, 0, 640, 200)):
+        check_tiles(sizer, area)
+# tiles of the same part of the screen are the same, whatever else is redrawn
+sizer = window.WindowSizer(1920, 1080, border_width=5)
+sizer.size = 640, 200
+sizer.window_size = 1000, 700
+whole = sizer.scale_tiles()
+for area in ((0, 0, 1, 1), (300, 100, 64, 50)):
+    assert set(sizer.scale_tiles(area)) <= set(whole)
+assert len(sizer.scale_tiles((0, 0, 1, 1))) == 1
+print 'WindowSizer.scale_tiles ok'
+
+# only the attributes whose colour differs between the blink palettes are looked for
+blink = window.blink_attributes([(0, 0, 0), (255, 255, 255), (0, 0, 255)], [(0, 0, 0)] * 3)
+assert list(blink) == [False, True, True]
+pixels = window.numpy.zeros((640, 200), dtype=window.numpy.uint8)
+assert window.find_attributes(pixels, blink) is None
+pixels[10, 20] = 1
+pixels[12:15, 30] = 2
+assert window.find_attributes(pixels, blink) == (10, 20, 5, 11)
+print 'find_attributes ok'
@@ -0,0 +1,92 @@
+"""
+PC-BASIC - fastmath-test.py
+Compare the unpacked fast path for floating-point arithmetic with the default implementation
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import sys
+import os
+import random
+import time
+from binascii import hexlify
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from pcbasic.basic.values import values, numbers
+
+
+# mark bytes conversion explicitly
+int2byte = chr
+
+OPERATIONS = ('iadd', 'isub', 'imul', 'idiv')
+
+
+def random_operands(cls, count, seed=0):
+    """Generate pairs of random byte representations, biased to exercise rounding."""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in xrange(count):
+        pair = []
+        for _ in range(2):
+            buf = bytearray(rng.getrandbits(8) for _ in range(cls.size))
+            # keep exponents close together in most cases so that mantissas interact
+            if rng.random() < 0.9:
+                buf[-1] = rng.randint(0x70, 0x90)
+            # short mantissas are where the rounding quirks live
+            if rng.random() < 0.3:
+                buf[:-2] = b'\0' * (cls.size - 2)
+            pair.append(bytes(buf))
+        pairs.append(pair)
+    return pairs
+
+def file_operands(name, size):
+    """Read consecutive pairs of values from a test input file."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input', name)
+    with open(path, 'rb') as f:
+        data = f.read()
+    words = [data[i:i+size] for i in range(0, len(data) - size + 1, size)]
+    return zip(words[:-1], words[1:])
+
+def apply(vm, cls, oper, left, right):
+    """Apply an operation and return the resulting bytes or the exception raised."""
+    lhs = cls(bytearray(left), vm)
+    rhs = cls(bytearray(right), vm)
+    try:
+        getattr(lhs, oper)(rhs)
+    except (OverflowError, ZeroDivisionError) as e:
+        return e.__class__.__name__, bytes(lhs.to_bytes())
+    return bytes(lhs.to_bytes())
+
+def compare(cls, pairs):
+    """Compare both implementations on the operand pairs; return number of differences."""
+    slow, fast = values.Values(None, False, False), values.Values(None, False, True)
+    slow.set_handler(None)
+    fast.set_handler(None)
+    failures = 0
+    for oper in OPERATIONS:
+        timings = []
+        results = []
+        for vm in (slow, fast):
+            start = time.clock()
+            results.append([apply(vm, cls, oper, l, r) for l, r in pairs])
+            timings.append(time.clock() - start)
+        for (l, r), want, got in zip(pairs, *results):
+            if want != got:
+                failures += 1
+                print '%s %s %s %s: %r != %r' % (
+                    cls.__name__, oper, hexlify(l), hexlify(r), want, got)
+        print '%-6s %-4s %6d ops   default %6.3fs   fast %6.3fs   speedup %4.2fx' % (
+            cls.__name__, oper, len(pairs), timings[0], timings[1], timings[0] / timings[1])
+    return failures
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    failures = 0
+    failures += compare(numbers.Single, file_operands('BYTES.DAT', 4))
+    failures += compare(numbers.Single, file_operands('BIGBYTES.DAT', 4))
+    failures += compare(numbers.Single, random_operands(numbers.Single, count))
+    failures += compare(numbers.Double, random_operands(numbers.Double, count))
+    print '%d differences' % failures
+    sys.exit(1 if failures else 0)
@@ -66,6 +66,10 @@ if '--coverage' in args:
 else:
     cov = None
 
+# any other options are passed on to PC-BASIC, e.g. --fast-math
+options = [arg for arg in args if arg.startswith('--') and arg != '--all']
+args = [arg for arg in args if arg not in options]
+
 if not args or '--all' in args:
     args = [f for f in sorted(os.listdir(basedir))
             if os.path.isdir(os.path.join(basedir, f)) and os.path.isdir(os.path.join(basedir, f, 'model'))]
@@ -115,7 +119,7 @@ for name in args:
     with suppress_stdio(do_suppress):
         crash = None
         try:
-            pcbasic.run('--interface=none')
+            pcbasic.run('--interface=none', *options)
         except Exception as e:
             crash = e
     # -----------------------------------------------------------